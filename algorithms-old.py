@@ -1,30 +1,32 @@
 import pandas as pd
+from season_store import default_store
+from teams import TeamRegistry
 
 def get_season_data(season_file):
     """
     Load season data from a CSV file.
 
     Parameters:
-    - season_file (str): Path to the season data file.
+    - season_file (str): Path to the season data file (a DataFrame is returned as is).
 
     Returns:
     - pd.DataFrame: The loaded season data.
     """
+    if isinstance(season_file, pd.DataFrame):
+        return season_file
     try:
-        season_data = pd.read_csv(season_file)
-        return season_data
+        # Parsed once into the season store, reloaded only when the file changes
+        return default_store().load_path(season_file).to_frame()
     except FileNotFoundError:
         raise FileNotFoundError(f"File '{season_file}' not found.")
-    except pd.errors.EmptyDataError:
-        raise ValueError(f"File '{season_file}' is empty or invalid.")
+    except ValueError:
+        raise
     except Exception as e:
         raise ValueError(f"An error occurred while loading the file: {e}")
 
 def get_team_stats(team_name, season_data):
-    team_stats = season_data[season_data['Team'].str.strip().str.lower() == team_name.strip().lower()]
-    if team_stats.empty:
-        raise ValueError(f"Team '{team_name}' not found in the dataset.")
-    return team_stats.iloc[0]
+    # Indexed lookup (normalized names and aliases), built once per season
+    return season_data.iloc[TeamRegistry.for_frame(season_data).id(team_name)]
 
 def calculate_probabilities(home_stats, away_stats):
     """
@@ -154,8 +156,8 @@ def generate_odds_with_home_away_adjustment(home_team, away_team, season_data, h
 
 
 def generate_combined_odds(home_team, away_team, season_file_1, season_file_2, weight_current_season=0.6):
-    season_1_data = pd.read_csv(season_file_1)
-    season_2_data = pd.read_csv(season_file_2)
+    season_1_data = get_season_data(season_file_1)
+    season_2_data = get_season_data(season_file_2)
 
     home_stats_1 = get_team_stats(home_team, season_1_data)
     away_stats_1 = get_team_stats(away_team, season_1_data)
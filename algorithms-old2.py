@@ -1,3 +1,5 @@
+from core import calc_prob_from_ranking  # implémentation unique (core.py)
+
 def calc_forces(stats):
     """
     stats : dict { equipe: { 'buts_pour': int, 'buts_contre': int, 'matchs': int } }
@@ -57,39 +59,6 @@ forces = calc_forces(stats)
 cotes = calc_prob("PSG", "Marseille", forces)
 print(cotes)
 
-def calc_prob_from_ranking(home, away, classement, bonus_home=1.1):
-    """
-    home, away : noms des équipes
-    classement : dict {equipe: points}
-    bonus_home : multiplicateur pour l’avantage domicile
-    """
-    points_home = classement[home]
-    points_away = classement[away]
-
-    # Force basée sur les points
-    score_home = points_home * bonus_home
-    score_away = points_away
-
-    # Probabilités brutes (sans nul)
-    p_home = score_home / (score_home + score_away)
-    p_away = 1 - p_home
-
-    # Probabilité du nul (fixe, ex: 25% du total)
-    p_draw = 0.25
-    # On réduit home/away proportionnellement pour faire de la place
-    p_home *= (1 - p_draw)
-    p_away *= (1 - p_draw)
-
-    # Cotes = inverse probabilité
-    return {
-        "prob_home": round(p_home, 3),
-        "prob_draw": round(p_draw, 3),
-        "prob_away": round(p_away, 3),
-        "odds_home": round(1/p_home, 2),
-        "odds_draw": round(1/p_draw, 2),
-        "odds_away": round(1/p_away, 2)
-    }
-
 # ---- Exemple fictif avec le classement final 2024-2025 ----
 classement = {
     "PSG": 84,
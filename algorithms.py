@@ -1,41 +1,185 @@
 import random
+import numpy as np
 import pandas as pd
+from core import (  # noqa: F401 (fonctions scalaires réexportées)
+    adjust_probs_for_home_away, calc_prob_from_ranking, calculate_odds, calculate_probabilities,
+    compute_odds_from_strengths, generate_combined_odds_with_home_away_adjustment, generate_odds,
+    generate_odds_with_home_away_adjustment, get_team_stats,
+)
+from instrumentation import timed
+from season_store import default_store
+from teams import TeamRegistry
 
-def generate_odds(teamA_name, teamB_name, data):
+@timed("strength")
+def team_strengths(data, ratings=None):
     """
-    Génère les cotes 1X2 pour un match entre teamA et teamB.
-    
-    teamA_name, teamB_name : noms des équipes (chaînes)
+    Score de force basé sur les points et la différence de buts.
+
+    data : DataFrame du classement (doit contenir 'Team', 'PTS', 'Diff')
+    ratings : source de force alternative (par ex. ratings.EloRatings),
+              utilisée à la place de PTS + 0.3*Diff si fournie
+    """
+    if ratings is not None:
+        return ratings.strengths(data["Team"].tolist())
+    return data["PTS"].to_numpy(dtype=int) + data["Diff"].to_numpy(dtype=int) * 0.3
+
+def generate_odds_matrix(data, margin=1.05, ratings=None):
+    """
+    Génère les cotes 1X2 de toutes les rencontres possibles en une seule passe NumPy.
+
     data : DataFrame du classement (doit contenir 'Team', 'PTS', 'Diff')
+    margin : overround des cotes (voir compute_odds_from_strengths)
+    ratings : source de force alternative (voir team_strengths)
+    Retourne un dictionnaire : 'teams' (liste des N équipes) et des matrices N×N
+    p1, pX, p2, odds1, oddsX, odds2 où [i, j] correspond à teams[i] (domicile)
+    contre teams[j] (extérieur). La diagonale vaut NaN.
+    """
+    strengths = team_strengths(data, ratings)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matrices = compute_odds_from_strengths(strengths[:, None], strengths[None, :], margin)
+    diagonal = np.eye(len(strengths), dtype=bool)
+    for values in matrices.values():
+        values[diagonal] = np.nan
+    matrices["teams"] = data["Team"].tolist()
+    return matrices
+
+def generate_all_odds(data, margin=1.05, ratings=None):
     """
-    # Extraction des infos depuis le DataFrame
-    teamA = data[data["Team"] == teamA_name].iloc[0]
-    teamB = data[data["Team"] == teamB_name].iloc[0]
-
-    # Score de force basé sur les points et la différence de buts
-    strengthA = int(teamA["PTS"]) + int(teamA["Diff"]) * 0.3
-    strengthB = int(teamB["PTS"]) + int(teamB["Diff"]) * 0.3
-
-    # Probabilités brutes
-    pA = strengthA / (strengthA + strengthB)
-    pB = strengthB / (strengthA + strengthB)
-    pDraw = 0.15 + 0.1 * (1 - abs(pA - pB))  # nul plus probable si forces proches
-
-    # Normalisation
-    total = pA + pB + pDraw
-    pA /= total
-    pB /= total
-    pDraw /= total
-
-    # Conversion en cotes décimales (1/probabilité) + marge bookmaker
-    margin = 1.05
-    oddsA = round((1 / pA) * margin, 2)
-    oddsDraw = round((1 / pDraw) * margin, 2)
-    oddsB = round((1 / pB) * margin, 2)
-
-    return {
-        "Match": f"{teamA_name} vs {teamB_name}",
-        "1": oddsA,
-        "X": oddsDraw,
-        "2": oddsB
-    }
\ No newline at end of file
+    Version « longue » de generate_odds_matrix : une ligne par rencontre ordonnée.
+
+    Retourne un DataFrame avec les colonnes Home, Away, p1, pX, p2, 1, X, 2
+    (cotes arrondies à 2 décimales comme generate_odds).
+    """
+    matrices = generate_odds_matrix(data, margin, ratings)
+    teams = np.asarray(matrices["teams"], dtype=object)
+    home, away = np.nonzero(~np.eye(len(teams), dtype=bool))
+    return pd.DataFrame({
+        "Home": teams[home],
+        "Away": teams[away],
+        "p1": matrices["p1"][home, away],
+        "pX": matrices["pX"][home, away],
+        "p2": matrices["p2"][home, away],
+        "1": np.round(matrices["odds1"][home, away], 2),
+        "X": np.round(matrices["oddsX"][home, away], 2),
+        "2": np.round(matrices["odds2"][home, away], 2),
+    })
+
+def get_season_data(season_file):
+    """
+    Load season data through the season store.
+
+    Parameters:
+    - season_file (str or pd.DataFrame): Path to the season data file
+      (a DataFrame is returned as is).
+
+    Returns:
+    - pd.DataFrame: The loaded season data.
+    """
+    if isinstance(season_file, pd.DataFrame):
+        return season_file
+    # Parsed once into the season store, reloaded only when the file changes
+    return default_store().load_path(season_file).to_frame()
+
+def _season_columns(season_data, teams):
+    """Victoires, nuls et matchs joués de teams dans season_data (NaN si absente)."""
+    registry = TeamRegistry.for_frame(season_data)
+    idx = np.array([registry.get(team, -1) for team in teams], dtype=np.intp)
+    found = idx >= 0
+    return tuple(
+        np.where(found, season_data[column].to_numpy(dtype=float)[idx], np.nan)
+        for column in ("W", "D", "M")
+    )
+
+@timed("odds")
+def weighted_home_away_matrix(wins, draws, matches, weights, home_advantage=0.1, away_advantage=-0.05, prior=None):
+    """
+    Home/away adjusted 1X2 probabilities of every ordered pair of teams,
+    blending any number of seasons in one weighted reduction.
+
+    Parameters:
+    - wins, draws, matches (np.ndarray): (seasons, teams) arrays, NaN when a
+      team did not play that season.
+    - weights (np.ndarray): weight of each season (see catalogue.season_weights).
+      Seasons a team (or a pair, for draws) missed are left out and the
+      remaining weights renormalized.
+    - prior (dict): optional per-team prior (see priors.PriorStore.team_prior):
+      'win' and 'draw' rates per match (NaN = no prior) and 'matches', the
+      prior weight in pseudo-matches. Teams with a prior get those
+      pseudo-matches added to each season they played, and the prior rates
+      for the seasons they missed.
+    Returns:
+    - dict: N×N probabilities p1, pX, p2 (NaN on the diagonal and for teams
+      without any season nor prior).
+    """
+    matches = np.asarray(matches, dtype=float)
+    wins = np.asarray(wins, dtype=float)
+    draws = np.asarray(draws, dtype=float)
+    if prior is not None:
+        wins, draws, matches = _apply_prior(wins, draws, matches, prior)
+    present = ~np.isnan(matches) & (matches > 0)
+    weights = np.asarray(weights, dtype=float)[:, None] * present
+    safe_matches = np.where(present, matches, 1.0)
+    draws = np.where(present, draws, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        win = (weights * np.where(present, wins, 0.0) / safe_matches).sum(axis=0) / weights.sum(axis=0)
+        # Nul : (D_dom + D_ext) / (M_dom + M_ext) de chaque saison, pondéré par paire
+        pair_weights = np.einsum("si,sj->sij", weights, present.astype(float))
+        pair_draws = (draws[:, :, None] + draws[:, None, :]) / (safe_matches[:, :, None] + safe_matches[:, None, :])
+        draw = (pair_weights * pair_draws).sum(axis=0) / pair_weights.sum(axis=0)
+
+        home_win = win[:, None] + home_advantage
+        away_win = win[None, :] + away_advantage
+        total = home_win + draw + away_win
+        probs = {"p1": home_win / total, "pX": draw / total, "p2": away_win / total}
+
+    diagonal = np.eye(len(win), dtype=bool)
+    for values in probs.values():
+        values[diagonal] = np.nan
+    return probs
+
+def _apply_prior(wins, draws, matches, prior):
+    """Rétrécit les statistiques des équipes ayant un prior (pseudo-matchs) et comble leurs saisons manquantes."""
+    win_rate = np.asarray(prior["win"], dtype=float)
+    draw_rate = np.asarray(prior["draw"], dtype=float)
+    k = prior.get("matches", 10)
+    has_prior = ~np.isnan(win_rate)
+    present = ~np.isnan(matches) & (matches > 0)
+    # Saisons manquantes : le prior compte comme une saison de longueur habituelle
+    season_matches = np.where(present, matches, 0.0).max(axis=1, keepdims=True)
+    fill = ~present & has_prior & (season_matches > 0)
+
+    shrink = present & has_prior
+    wins = np.where(shrink, wins + k * win_rate, np.where(fill, win_rate * season_matches, wins))
+    draws = np.where(shrink, draws + k * draw_rate, np.where(fill, draw_rate * season_matches, draws))
+    matches = np.where(shrink, matches + k, np.where(fill, season_matches, matches))
+    return wins, draws, matches
+
+def home_away_probability_matrix(season_data, home_advantage=0.1, away_advantage=-0.05, previous_season=None, weight_current_season=0.6, prior=None):
+    """
+    Matrix version of generate_odds_with_home_away_adjustment (or of the
+    combined variant when previous_season is given) for every ordered pair
+    of teams in season_data.
+
+    Returns a dict: 'teams' and N×N normalized probabilities p1, pX, p2
+    ([i, j] = teams[i] at home against teams[j]), NaN on the diagonal.
+    Teams missing from previous_season are priced on season_data alone,
+    or shrunk towards prior when given (see weighted_home_away_matrix).
+    """
+    teams = season_data["Team"].tolist()
+    seasons = [_season_columns(season_data, teams)]
+    weights = [1.0]
+    if previous_season is not None:
+        seasons.insert(0, _season_columns(previous_season, teams))
+        weights = [1 - weight_current_season, weight_current_season]
+
+    wins, draws, matches = (np.stack(column) for column in zip(*seasons))
+    probs = weighted_home_away_matrix(wins, draws, matches, weights, home_advantage, away_advantage, prior)
+    probs["teams"] = teams
+    return probs
+
+def probabilities_to_odds(probs):
+    """Fair decimal odds 1/p, as in calculate_odds (inf when p <= 0)."""
+    probs = np.asarray(probs, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(probs > 0, 1 / probs, np.where(np.isnan(probs), np.nan, np.inf))
@@ -0,0 +1,312 @@
+import argparse
+import hashlib
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from poisson import match_markets, score_matrices
+from results import read_results
+from teams import canonical_team_key
+
+FEATURES_DIR = os.path.join(".cache", "backtest")
+FEATURES_VERSION = 1
+STATS = ("M", "W", "D", "G", "GA", "PTS")
+
+# Cotes du marché reconnues dans les fichiers de résultats (1, X, 2)
+MARKET_ODDS_COLUMNS = (("odds_1", "odds_x", "odds_2"), ("B365H", "B365D", "B365A"), ("PSH", "PSD", "PSA"), ("AvgH", "AvgD", "AvgA"))
+
+# Paramètres par défaut de chaque modèle (les constantes historiques du projet)
+MODEL_DEFAULTS = {
+    "home_away": {"home_advantage": 0.1, "away_advantage": -0.05},
+    "combined": {"weight_current_season": 0.6, "home_advantage": 0.1, "away_advantage": -0.05},
+    "ranking": {"bonus_home": 1.1, "draw": 0.25},
+    "strength": {"diff_weight": 0.3, "draw_base": 0.15, "draw_slope": 0.1},
+    "poisson": {"home_factor": 1.0},
+}
+
+def build_features(results, season_gap_days=45):
+    """
+    Parcourt les résultats dans l'ordre chronologique et enregistre, pour
+    chaque match, les statistiques des deux équipes AVANT le match (saison en
+    cours et saison précédente) : aucune information future n'est utilisée.
+
+    results : itérable de matchs (voir results.read_results) ; une colonne
+              'season' délimite les saisons, à défaut une interruption de plus
+              de season_gap_days jours marque le début d'une nouvelle saison.
+    Retourne un dictionnaire de tableaux NumPy (un élément par match).
+    """
+    current, previous = {}, {}
+    season = None
+    last_date = None
+    league_goals = league_matches = 0
+    columns = {name: [] for name in ("home_goals", "away_goals", "odds_1", "odds_x", "odds_2", "league_avg")}
+    for side in ("home", "away"):
+        for stat in STATS:
+            columns[f"{side}_{stat}"] = []
+            columns[f"{side}_prev_{stat}"] = []
+    dates, homes, aways = [], [], []
+
+    for match in results:
+        if last_date is not None and match["date"] < last_date:
+            raise ValueError("Results must be sorted chronologically.")
+        new_season = match.get("season", season) != season
+        if "season" not in match and last_date is not None:
+            new_season = (match["date"] - last_date).days > season_gap_days
+        if new_season and current:
+            previous, current = current, {}
+            league_goals = league_matches = 0
+        season = match.get("season")
+        last_date = match["date"]
+
+        keys = canonical_team_key(match["home"]), canonical_team_key(match["away"])
+        for side, key in zip(("home", "away"), keys):
+            stats = current.get(key, (0, 0, 0, 0, 0, 0))
+            prev = previous.get(key, (0, 0, 0, 0, 0, 0))
+            for i, stat in enumerate(STATS):
+                columns[f"{side}_{stat}"].append(stats[i])
+                columns[f"{side}_prev_{stat}"].append(prev[i])
+        columns["league_avg"].append(league_goals / league_matches if league_matches else np.nan)
+
+        odds = _market_odds(match)
+        for name, value in zip(("odds_1", "odds_x", "odds_2"), odds):
+            columns[name].append(value)
+
+        home_goals, away_goals = match["home_goals"], match["away_goals"]
+        columns["home_goals"].append(home_goals)
+        columns["away_goals"].append(away_goals)
+        dates.append(match["date"])
+        homes.append(match["home"])
+        aways.append(match["away"])
+
+        # Mise à jour des cumuls après le match
+        home_points = 3 if home_goals > away_goals else 1 if home_goals == away_goals else 0
+        away_points = 3 if away_goals > home_goals else 1 if home_goals == away_goals else 0
+        for key, scored, conceded, points in ((keys[0], home_goals, away_goals, home_points),
+                                              (keys[1], away_goals, home_goals, away_points)):
+            m, w, d, g, ga, pts = current.get(key, (0, 0, 0, 0, 0, 0))
+            current[key] = (m + 1, w + (points == 3), d + (points == 1), g + scored, ga + conceded, pts + points)
+        league_goals += home_goals + away_goals
+        league_matches += 2
+
+    features = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+    features["date"] = np.asarray(dates, dtype="datetime64[s]")
+    features["home"] = np.asarray(homes, dtype=object)
+    features["away"] = np.asarray(aways, dtype=object)
+    outcome = np.sign(features["home_goals"] - features["away_goals"])
+    features["outcome"] = np.select([outcome > 0, outcome == 0], [0, 1], 2)
+    return features
+
+def _market_odds(match):
+    for names in MARKET_ODDS_COLUMNS:
+        if all(match.get(name) for name in names):
+            try:
+                return tuple(float(match[name]) for name in names)
+            except ValueError:
+                break
+    return (np.nan, np.nan, np.nan)
+
+def load_features(path, cache_dir=FEATURES_DIR):
+    """
+    Caractéristiques d'un fichier de résultats, mises en cache (.npz) selon
+    le contenu du fichier : une campagne de paramètres ne les calcule qu'une fois.
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}-v{FEATURES_VERSION}.npz")
+    if os.path.exists(cache_path):
+        with np.load(cache_path, allow_pickle=True) as data:
+            return {name: data[name] for name in data.files}
+
+    features = build_features(read_results(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(cache_path, **features)
+    return features
+
+def _normalize(p1, pX, p2, eps=1e-6):
+    probs = np.maximum(np.stack([p1, pX, p2], axis=1), eps)
+    return probs / probs.sum(axis=1, keepdims=True)
+
+def _rates(f, side, prefix=""):
+    m = np.maximum(f[f"{side}_{prefix}M"], 1)
+    return f[f"{side}_{prefix}W"] / m, f[f"{side}_{prefix}D"], m
+
+def predict_probabilities(features, model, params=None):
+    """
+    Probabilités (F, 3) 1/X/2 d'un modèle, calculées en une fois sur tous les matchs.
+
+    model : "home_away" (generate_odds_with_home_away_adjustment), "combined"
+            (generate_combined_odds_with_home_away_adjustment), "ranking"
+            (calc_prob_from_ranking), "strength" (generate_odds) ou "poisson" (predict_match)
+    """
+    p = dict(MODEL_DEFAULTS[model])
+    p.update(params or {})
+    f = features
+
+    if model in ("home_away", "combined"):
+        home_win, home_d, home_m = _rates(f, "home")
+        away_win, away_d, away_m = _rates(f, "away")
+        draw = (home_d + away_d) / (home_m + away_m)
+        if model == "combined":
+            w = p["weight_current_season"]
+            # Équipe sans saison précédente (promue) : pas de mélange, sa saison en cours seule
+            home_prev = f["home_prev_M"] > 0
+            away_prev = f["away_prev_M"] > 0
+            prev_home_win = np.where(home_prev, _rates(f, "home", "prev_")[0], home_win)
+            prev_away_win = np.where(away_prev, _rates(f, "away", "prev_")[0], away_win)
+            prev_d = np.where(home_prev, f["home_prev_D"], 0) + np.where(away_prev, f["away_prev_D"], 0)
+            prev_m = np.where(home_prev, f["home_prev_M"], 0) + np.where(away_prev, f["away_prev_M"], 0)
+            prev_draw = np.where(prev_m > 0, prev_d / np.maximum(prev_m, 1), draw)
+            home_win = w * home_win + (1 - w) * prev_home_win
+            away_win = w * away_win + (1 - w) * prev_away_win
+            draw = w * draw + (1 - w) * prev_draw
+        return _normalize(home_win + p["home_advantage"], draw, away_win + p["away_advantage"])
+
+    if model == "ranking":
+        score_home = f["home_PTS"] * p["bonus_home"]
+        score_away = f["away_PTS"]
+        total = score_home + score_away
+        safe = np.where(total > 0, total, 1)
+        p_home = np.where(total > 0, score_home / safe, 0.5)
+        return _normalize(p_home * (1 - p["draw"]), np.full_like(p_home, p["draw"]), (1 - p_home) * (1 - p["draw"]))
+
+    if model == "strength":
+        strength_home = f["home_PTS"] + (f["home_G"] - f["home_GA"]) * p["diff_weight"]
+        strength_away = f["away_PTS"] + (f["away_G"] - f["away_GA"]) * p["diff_weight"]
+        total = strength_home + strength_away
+        safe = np.where(total != 0, total, 1)
+        p_home = np.where(total != 0, strength_home / safe, 0.5)
+        p_away = 1 - p_home
+        draw = p["draw_base"] + p["draw_slope"] * (1 - np.abs(p_home - p_away))
+        return _normalize(p_home, draw, p_away)
+
+    if model == "poisson":
+        avg = np.nan_to_num(f["league_avg"], nan=1.0)
+        avg = np.where(avg > 0, avg, 1.0)
+        home_m = np.maximum(f["home_M"], 1)
+        away_m = np.maximum(f["away_M"], 1)
+        attack_home = f["home_G"] / home_m / avg
+        defence_home = f["home_GA"] / home_m / avg
+        attack_away = f["away_G"] / away_m / avg
+        defence_away = f["away_GA"] / away_m / avg
+        exp_home = np.maximum(attack_home * defence_away * avg * p["home_factor"], 1e-3)
+        exp_away = np.maximum(attack_away * defence_home * avg, 1e-3)
+        markets = match_markets(score_matrices(exp_home, exp_away, max_goals=10), lines=())
+        return _normalize(markets["p1"], markets["pX"], markets["p2"])
+
+    raise ValueError(f"Unknown model '{model}'.")
+
+def evaluate(features, model, params=None, min_matches=3, value_threshold=0.0, n_bins=10):
+    """
+    Score d'un modèle : log-loss, score de Brier, calibration et ROI simulé.
+
+    min_matches : les matchs où une équipe a joué moins de min_matches fois
+                  dans la saison sont ignorés (statistiques non significatives)
+    value_threshold : pari de 1 unité sur chaque issue où proba * cote > 1 + seuil
+    """
+    mask = (features["home_M"] >= min_matches) & (features["away_M"] >= min_matches)
+    probs = predict_probabilities(features, model, params)[mask]
+    outcome = features["outcome"][mask].astype(int)
+    n = len(outcome)
+    if n == 0:
+        raise ValueError("No fixture left to evaluate.")
+
+    onehot = np.zeros_like(probs)
+    onehot[np.arange(n), outcome] = 1
+    result = {
+        "model": model,
+        **(params or {}),
+        "matches": n,
+        "log_loss": float(-np.log(probs[np.arange(n), outcome]).mean()),
+        "brier": float(((probs - onehot) ** 2).sum(axis=1).mean()),
+    }
+
+    # Calibration : fréquence observée par tranche de probabilité prédite
+    bins = np.minimum((probs.ravel() * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    predicted = np.bincount(bins, probs.ravel(), n_bins) / np.maximum(counts, 1)
+    observed = np.bincount(bins, onehot.ravel(), n_bins) / np.maximum(counts, 1)
+    result["calibration_error"] = float((counts * np.abs(predicted - observed)).sum() / counts.sum())
+    result["calibration"] = list(zip(predicted.round(4).tolist(), observed.round(4).tolist(), counts.tolist()))
+
+    odds = np.stack([features["odds_1"], features["odds_x"], features["odds_2"]], axis=1)[mask]
+    bets = (probs * odds > 1 + value_threshold) & np.isfinite(odds)
+    stakes = bets.sum()
+    # Gains des paris gagnants ; les cotes absentes (NaN) n'entrent jamais dans la somme
+    profit = np.where(bets & onehot.astype(bool), odds, 0.0).sum() - stakes
+    result["bets"] = int(stakes)
+    result["roi"] = float(profit / stakes) if stakes else float("nan")
+    return result
+
+_worker_features = None
+
+def _init_worker(features):
+    global _worker_features
+    _worker_features = features
+
+def _evaluate_config(args):
+    model, params, options = args
+    result = evaluate(_worker_features, model, params, **options)
+    result.pop("calibration")
+    return result
+
+def parameter_grid(grid):
+    """Toutes les combinaisons d'un dictionnaire {paramètre: liste de valeurs}."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+def random_configs(ranges, n, seed=None):
+    """n configurations tirées uniformément dans {paramètre: (min, max)}."""
+    rng = np.random.default_rng(seed)
+    return [{name: float(rng.uniform(low, high)) for name, (low, high) in ranges.items()} for _ in range(n)]
+
+def sweep(features, model, configs, max_workers=None, chunksize=32, **options):
+    """
+    Évalue un modèle pour chaque configuration de paramètres, en parallèle.
+
+    Les caractéristiques sont envoyées une seule fois à chaque processus
+    (initializer), seules les configurations circulent ensuite.
+    Retourne un DataFrame trié par log-loss croissante.
+    """
+    tasks = [(model, config, options) for config in configs]
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features,)) as pool:
+            rows = list(pool.map(_evaluate_config, tasks, chunksize=chunksize))
+    else:
+        _init_worker(features)
+        rows = [_evaluate_config(task) for task in tasks]
+    return pd.DataFrame(rows).sort_values("log_loss").reset_index(drop=True)
+
+def _parse_grid(values):
+    grid = {}
+    for item in values or []:
+        name, _, raw = item.partition("=")
+        grid[name] = [float(v) for v in raw.split(",")]
+    return grid
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest des modèles de cotes sur des résultats historiques.")
+    parser.add_argument("results", help="Fichier CSV de résultats (Date, HomeTeam, AwayTeam, FTHG, FTAG, cotes optionnelles)")
+    parser.add_argument("--model", default="home_away", choices=sorted(MODEL_DEFAULTS))
+    parser.add_argument("--grid", nargs="*", help="Grille de paramètres, par ex. home_advantage=0,0.05,0.1")
+    parser.add_argument("--random", type=int, default=0, help="Nombre de configurations aléatoires (bornes = min/max de --grid)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-matches", type=int, default=3)
+    args = parser.parse_args()
+
+    features = load_features(args.results)
+    grid = _parse_grid(args.grid)
+    if args.random:
+        configs = random_configs({name: (min(v), max(v)) for name, v in grid.items()}, args.random)
+    elif grid:
+        configs = parameter_grid(grid)
+    else:
+        configs = [{}]
+
+    table = sweep(features, args.model, configs, max_workers=args.workers, min_matches=args.min_matches)
+    print(table.head(20).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import sys
+
+from margins import METHODS
+from odds_cache import default_odds_cache
+from results import RESULT_COLUMNS
+from season_store import default_store, previous_season
+from server import build_models
+
+# En-têtes acceptés pour les fichiers de rencontres (en plus de home/away des résultats)
+FIXTURE_COLUMNS = {
+    "home": RESULT_COLUMNS["home"],
+    "away": RESULT_COLUMNS["away"],
+    "league": ("league", "League", "Div"),
+    "season": ("season", "Season"),
+    "model": ("model", "Model", "choice"),
+}
+
+OUTPUT_COLUMNS = ["home", "away", "league", "season", "model", "p1", "pX", "p2", "1", "X", "2", "error"]
+OUTPUT_FORMATS = ("csv", "jsonl", "parquet")
+
+def _normalize(record):
+    fixture = dict(record)
+    for name, candidates in FIXTURE_COLUMNS.items():
+        for candidate in candidates:
+            if candidate in record:
+                fixture[name] = record[candidate]
+                if candidate != name:
+                    del fixture[candidate]
+                break
+    return fixture
+
+def read_fixtures(stream, fmt=None):
+    """
+    Lit des rencontres en flux depuis un fichier texte ouvert (CSV avec
+    en-tête ou JSONL). Si fmt n'est pas précisé, le format est deviné sur
+    la première ligne.
+
+    Produit des dictionnaires : home, away et, s'ils sont présents, league,
+    season, model, ainsi que les autres colonnes telles quelles.
+    """
+    first_line = stream.readline()
+    if fmt is None:
+        fmt = "jsonl" if first_line.lstrip().startswith("{") else "csv"
+    lines = itertools.chain([first_line], stream)
+
+    if fmt == "jsonl":
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield _normalize(json.loads(line))
+    else:
+        for record in csv.DictReader(lines):
+            yield _normalize(record)
+
+class FixturePricer:
+    """
+    Calcule les cotes de lots de rencontres de ligues et saisons différentes.
+
+    Les modèles d'une (ligue, saison) sont construits à la première
+    rencontre qui les utilise (voir server.build_models) puis réutilisés ;
+    la saison historique des modèles 1 et 3 est la saison précédente.
+    """
+
+    def __init__(self, league="ligue1", season="2024-2025", model="3", margin=1.05, store=None,
+                 overround=1.0, margin_method="proportional"):
+        self.league = league
+        self.season = season
+        self.model = str(model)
+        self.margin = margin
+        self.overround = overround
+        self.margin_method = margin_method
+        self.store = store or default_store()
+        self._models = {}
+
+    def models(self, league, season):
+        key = (league.lower(), str(season))
+        if key not in self._models:
+            try:
+                self._models[key] = build_models(
+                    league, previous_season(season), season, self.margin, self.store,
+                    overround=self.overround, margin_method=self.margin_method,
+                )
+                # Version des classements enregistrée dans le cache des cotes (voir OddsService)
+                default_odds_cache().refresh(self._models[key].sources)
+            except (FileNotFoundError, ValueError) as e:
+                self._models[key] = e
+        models = self._models[key]
+        if isinstance(models, Exception):
+            raise models
+        return models
+
+    def price_chunk(self, fixtures):
+        """
+        Cotes d'un lot de rencontres, une indexation NumPy par groupe
+        (ligue, saison, modèle). Retourne une ligne de sortie par rencontre,
+        dans l'ordre ; une rencontre impossible à coter a une colonne 'error'.
+        """
+        out = []
+        groups = {}
+        for i, fixture in enumerate(fixtures):
+            row = dict(fixture)
+            row["league"] = row.get("league") or self.league
+            row["season"] = row.get("season") or self.season
+            row["model"] = str(row.get("model") or self.model)
+            out.append(row)
+            groups.setdefault((row["league"], row["season"], row["model"]), []).append(i)
+
+        for (league, season, model), positions in groups.items():
+            homes = [out[i].get("home") for i in positions]
+            aways = [out[i].get("away") for i in positions]
+            try:
+                models = self.models(league, season)
+                rows, h, a, probs, odds = models.gather(model, homes, aways)
+            except (FileNotFoundError, ValueError) as e:
+                for i in positions:
+                    out[i]["error"] = str(e)
+                continue
+
+            teams = models.teams(model)
+            probs = probs.tolist()
+            odds = odds.round(2).tolist()
+            for k, r in enumerate(rows):
+                row = out[positions[r]]
+                row["home"], row["away"] = teams[h[k]], teams[a[k]]
+                row["p1"], row["pX"], row["p2"] = probs[k]
+                row["1"], row["X"], row["2"] = odds[k]
+            for i in positions:
+                if "p1" not in out[i]:
+                    out[i]["error"] = f"Unknown fixture '{out[i].get('home')}' - '{out[i].get('away')}'."
+        return out
+
+    def price(self, fixtures, chunk_size=10_000):
+        """Produit les lots cotés (listes de lignes) au fil de la lecture des rencontres."""
+        fixtures = iter(fixtures)
+        while True:
+            chunk = list(itertools.islice(fixtures, chunk_size))
+            if not chunk:
+                return
+            yield self.price_chunk(chunk)
+
+def _fieldnames(rows):
+    extra = []
+    for row in rows:
+        for key in row:
+            if key not in OUTPUT_COLUMNS and key not in extra:
+                extra.append(key)
+    return OUTPUT_COLUMNS + extra
+
+def _json_value(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def _check_columns(rows, fieldnames):
+    extra = {key for row in rows for key in row}.difference(fieldnames)
+    if extra:
+        raise ValueError(
+            f"Column(s) {', '.join(sorted(map(str, extra)))} missing from the output columns: pass fieldnames "
+            "(union of the input columns) or use JSONL output."
+        )
+
+def write_chunks(chunks, stream=None, fmt="csv", path=None, fieldnames=None):
+    """
+    Écrit les lots au fil de l'eau : CSV ou JSONL sur un flux texte, Parquet
+    (pyarrow, un groupe de lignes par lot) dans le fichier path.
+    Les colonnes CSV et Parquet sont fieldnames, par défaut celles du premier
+    lot : ValueError si un lot suivant en apporte une autre (jamais ignorée).
+    Retourne le nombre de lignes.
+    """
+    count = 0
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow).")
+
+        writer = None
+        schema = None
+        try:
+            for rows in chunks:
+                if writer is None:
+                    names = fieldnames or _fieldnames(rows)
+                    numeric = {"p1", "pX", "p2", "1", "X", "2"}
+                    schema = pa.schema([(name, pa.float64() if name in numeric else pa.string()) for name in names])
+                    writer = pq.ParquetWriter(path, schema)
+                _check_columns(rows, schema.names)
+                columns = {}
+                for field in schema:
+                    values = [row.get(field.name) for row in rows]
+                    if field.type == pa.string():
+                        values = [None if v is None else str(v) for v in values]
+                    columns[field.name] = values
+                writer.write_table(pa.table(columns, schema=schema))
+                count += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+    writer = None
+    for rows in chunks:
+        if fmt == "jsonl":
+            for row in rows:
+                stream.write(json.dumps({k: _json_value(v) for k, v in row.items()}, ensure_ascii=False, default=str))
+                stream.write("\n")
+        else:
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=fieldnames or _fieldnames(rows), lineterminator="\n")
+                writer.writeheader()
+            _check_columns(rows, writer.fieldnames)
+            writer.writerows(rows)
+        count += len(rows)
+        stream.flush()
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Cotes d'un fichier de rencontres (CSV ou JSONL, '-' = entrée standard), écrites en flux.",
+    )
+    parser.add_argument("fixtures", nargs="?", default="-", help="Fichier de rencontres (home, away, league, season, model)")
+    parser.add_argument("-o", "--output", default="-", help="Fichier de sortie ('-' = sortie standard)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), default=None)
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None, help="Format de sortie (déduit de l'extension sinon)")
+    parser.add_argument("--league", default="ligue1", help="Ligue par défaut")
+    parser.add_argument("--season", default="2024-2025", help="Saison par défaut")
+    parser.add_argument("--model", default="3", help="Modèle par défaut : 1 (historique), 2 (saison en cours), 3 (combiné), weighted (toutes les saisons), strength, poisson")
+    parser.add_argument("--margin", type=float, default=1.05, help="Marge du modèle strength")
+    parser.add_argument("--overround", type=float, default=1.0, help="Overround des autres modèles (1.05 = marge de 5 %%)")
+    parser.add_argument("--margin-method", choices=METHODS, default="proportional", help="Répartition de la marge (margins.py)")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        extension = args.output.rsplit(".", 1)[-1].lower() if "." in args.output else "csv"
+        fmt = extension if extension in OUTPUT_FORMATS else "csv"
+    if fmt == "parquet" and args.output == "-":
+        parser.error("Parquet output needs a file (--output).")
+
+    pricer = FixturePricer(
+        args.league, args.season, args.model, args.margin,
+        overround=args.overround, margin_method=args.margin_method,
+    )
+    source = sys.stdin if args.fixtures == "-" else open(args.fixtures, newline="", encoding="utf-8")
+    try:
+        fieldnames = None
+        if source is not sys.stdin and fmt != "jsonl":
+            # Colonnes CSV / Parquet : union des colonnes de toutes les rencontres
+            # (un JSONL peut en ajouter en cours de fichier), lue en un premier passage
+            fieldnames = _fieldnames(read_fixtures(source, args.input_format))
+            source.seek(0)
+        chunks = pricer.price(read_fixtures(source, args.input_format), args.chunk_size)
+        if fmt == "parquet":
+            count = write_chunks(chunks, fmt=fmt, path=args.output, fieldnames=fieldnames)
+        elif args.output == "-":
+            count = write_chunks(chunks, sys.stdout, fmt, fieldnames=fieldnames)
+        else:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                count = write_chunks(chunks, out, fmt, fieldnames=fieldnames)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(f"{count} rencontres cotées.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Mesures de performance des chemins de calcul des cotes et des forces.
+
+    python -m benchmarks                        # toutes les mesures, tailles 18, 20 et 40
+    python -m benchmarks --output results.json --baseline benchmarks/baseline.json
+
+Les ligues sont synthétiques (benchmarks.synthetic), les résultats sont
+enregistrés en JSON et comparés à une référence (benchmarks.report).
+"""
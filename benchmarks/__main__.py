@@ -0,0 +1,65 @@
+import argparse
+import sys
+import tempfile
+
+from benchmarks.cases import CASES, Context
+from benchmarks.report import compare, format_comparison, format_results, load_results, save_results
+from benchmarks.timing import measure, memory_peak
+
+def run(team_sizes=(18, 20, 40), n_seasons=5, kinds=None, pattern=None, min_time=0.2, memory=True, seed=0):
+    """Exécute les cas sélectionnés pour chaque taille de ligue ; retourne la liste des mesures."""
+    results = []
+    for n_teams in team_sizes:
+        with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+            context = Context(n_teams, directory, n_seasons, seed)
+            for bench in CASES:
+                if kinds and bench["kind"] not in kinds:
+                    continue
+                if pattern and pattern not in bench["name"]:
+                    continue
+                fn, items = bench["factory"](context)
+                timing = measure(fn, min_time)
+                result = {"kind": bench["kind"], "name": bench["name"], "n_teams": n_teams, "items": items}
+                result.update(timing)
+                result["items_per_s"] = items / (timing["p50_us"] / 1e6)
+                result["peak_kb"] = memory_peak(fn) if memory else 0.0
+                results.append(result)
+                print(f"  {bench['kind']:<10} n={n_teams:<3} {bench['name']:<60} {timing['p50_us']:>12.1f} µs", file=sys.stderr)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Mesures de performance des cotes et des forces.")
+    parser.add_argument("--teams", type=int, nargs="+", default=[18, 20, 40], help="Tailles de ligue (18 à 40 équipes)")
+    parser.add_argument("--seasons", type=int, default=5, help="Saisons synthétiques pour les mesures de chargement")
+    parser.add_argument("--kind", action="append", choices=("latency", "throughput", "load", "startup"), help="Type de mesure (toutes par défaut)")
+    parser.add_argument("-k", "--filter", default=None, help="Ne garder que les cas dont le nom contient ce texte")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Durée cumulée minimale par cas (secondes)")
+    parser.add_argument("--no-memory", action="store_true", help="Ne pas mesurer le pic mémoire")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", help="Référence JSON à comparer")
+    parser.add_argument("--save-baseline", action="store_true", help="Écrire les résultats dans --baseline au lieu de comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Ralentissement toléré avant régression (0.25 = +25 %%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.teams, args.seasons, args.kind, args.filter, args.min_time, not args.no_memory, args.seed)
+    print(format_results(results))
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        if args.save_baseline:
+            save_results(results, args.baseline)
+            print(f"\nRéférence enregistrée : {args.baseline}")
+            return 0
+        rows = compare(results, load_results(args.baseline), args.tolerance)
+        print()
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row["status"] == "regression"]
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de +{args.tolerance:.0%}.")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+import contextlib
+import importlib.util
+import io
+import itertools
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_league, write_league_files
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import algorithms  # noqa: E402
+import combos  # noqa: E402
+import core  # noqa: E402
+import odds_cache  # noqa: E402
+import poisson  # noqa: E402
+import server  # noqa: E402
+from catalogue import SeasonCatalogue  # noqa: E402
+from priors import PriorStore  # noqa: E402
+from ratings import EloRatings  # noqa: E402
+from season_store import SeasonStore  # noqa: E402
+
+# Cas enregistrés : {"kind", "name", "factory"} ; factory(context) retourne
+# (fonction à chronométrer, nombre de rencontres traitées par appel)
+CASES = []
+
+def case(kind, name):
+    def register(factory):
+        CASES.append({"kind": kind, "name": name, "factory": factory})
+        return factory
+    return register
+
+def load_script(filename):
+    """Importe un script à tiret (odds-fr-old.py...) sans exécuter son main ni afficher ses print."""
+    name = os.path.splitext(filename)[0].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+class Context:
+    """
+    Données synthétiques d'une taille de ligue : saison précédente complète,
+    saison en cours à mi-parcours, fichiers de n_seasons saisons, un
+    stockage de saisons et un cache des priors dédiés (dans directory,
+    rien n'est écrit dans le dossier courant).
+    """
+
+    def __init__(self, n_teams, directory, n_seasons=5, seed=0):
+        self.n_teams = n_teams
+        self.directory = directory
+        self.n_seasons = n_seasons
+        self.previous = synthetic_league(n_teams, seed=seed)
+        self.current = synthetic_league(n_teams, seed=seed + 1, played=n_teams - 1)
+        self.teams = self.current["Team"].tolist()
+        self.home, self.away = self.teams[0], self.teams[-1]
+        pairs = [(h, a) for h, a in itertools.permutations(self.teams, 2)]
+        self.homes = [h for h, _ in pairs]
+        self.aways = [a for _, a in pairs]
+
+        self.data_dir = os.path.join(directory, "data")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.previous.to_csv(os.path.join(self.data_dir, "ligue1-2023-2024.csv"), index=False)
+        self.current.to_csv(os.path.join(self.data_dir, "ligue1-2024-2025.csv"), index=False)
+        self.season_files = write_league_files(self.data_dir, "synth", n_teams, n_seasons, seed)
+        self.store = SeasonStore(self.data_dir, os.path.join(directory, "store"))
+        self.priors = PriorStore(self.store, os.path.join(directory, "priors"))
+        self._cold = itertools.count()
+
+    def cold_store(self):
+        """Stockage neuf (aucun .npy) : chaque chargement refait l'ingestion."""
+        return SeasonStore(self.data_dir, os.path.join(self.directory, "cold", str(next(self._cold))))
+
+    def script(self, filename):
+        """Script à tiret dont default_store pointe vers les données synthétiques."""
+        module = load_script(filename)
+        if hasattr(module, "default_store"):
+            module.default_store = lambda: self.store
+        return module
+
+# Latence d'une rencontre
+
+@case("latency", "algorithms.generate_odds")
+def _(ctx):
+    return lambda: algorithms.generate_odds(ctx.home, ctx.away, ctx.current), 1
+
+@case("latency", "algorithms.compute_odds_from_strengths")
+def _(ctx):
+    return lambda: algorithms.compute_odds_from_strengths(60.0, 45.0), 1
+
+@case("latency", "algorithms.calc_prob_from_ranking")
+def _(ctx):
+    classement = dict(zip(ctx.teams, ctx.current["PTS"].tolist()))
+    return lambda: algorithms.calc_prob_from_ranking(ctx.home, ctx.away, classement), 1
+
+@case("latency", "algorithms.generate_odds_with_home_away_adjustment")
+def _(ctx):
+    return lambda: algorithms.generate_odds_with_home_away_adjustment(ctx.home, ctx.away, ctx.current), 1
+
+@case("latency", "algorithms.generate_combined_odds_with_home_away_adjustment")
+def _(ctx):
+    return lambda: algorithms.generate_combined_odds_with_home_away_adjustment(ctx.home, ctx.away, ctx.previous, ctx.current), 1
+
+@case("latency", "core.generate_odds_with_home_away_adjustment")
+def _(ctx):
+    table = core.load_season(os.path.join(ctx.data_dir, "ligue1-2024-2025.csv"))
+    return lambda: core.generate_odds_with_home_away_adjustment(ctx.home, ctx.away, table), 1
+
+@case("latency", "core.generate_odds")
+def _(ctx):
+    table = core.load_season(os.path.join(ctx.data_dir, "ligue1-2024-2025.csv"))
+    return lambda: core.generate_odds(ctx.home, ctx.away, table), 1
+
+@case("latency", "odds_cache.home_away_odds (hit)")
+def _(ctx):
+    table = core.load_season(os.path.join(ctx.data_dir, "ligue1-2024-2025.csv"))
+    cache = odds_cache.FixtureOddsCache()
+    return lambda: cache.home_away_odds(ctx.home, ctx.away, table), 1
+
+@case("latency", "odds_cache.predict_match (hit)")
+def _(ctx):
+    table = core.load_season(os.path.join(ctx.data_dir, "ligue1-2024-2025.csv"))
+    cache = odds_cache.FixtureOddsCache()
+    return lambda: cache.predict_match(ctx.home, ctx.away, table), 1
+
+@case("latency", "algorithms-old.generate_odds")
+def _(ctx):
+    module = ctx.script("algorithms-old.py")
+    return lambda: module.generate_odds(ctx.home, ctx.away, ctx.current), 1
+
+@case("latency", "algorithms-old2.calc_prob")
+def _(ctx):
+    module = ctx.script("algorithms-old2.py")
+    forces = module.calc_forces(_goal_stats(ctx.current))
+    return lambda: module.calc_prob(ctx.home, ctx.away, forces), 1
+
+@case("latency", "odds-fr-old.generate_odds")
+def _(ctx):
+    module = ctx.script("odds-fr-old.py")
+    return lambda: module.generate_odds(ctx.home, ctx.away), 1
+
+@case("latency", "odds-fr-old.generate_combined_odds")
+def _(ctx):
+    module = ctx.script("odds-fr-old.py")
+    return lambda: module.generate_combined_odds(ctx.home, ctx.away), 1
+
+@case("latency", "poisson.predict_match")
+def _(ctx):
+    strengths = poisson.compute_team_strengths(ctx.current)
+    return lambda: poisson.predict_match(ctx.home, ctx.away, print_output=False, strengths=strengths), 1
+
+@case("latency", "ratings.EloRatings.update")
+def _(ctx):
+    elo = EloRatings()
+    return lambda: elo.update(ctx.home, ctx.away, 2, 1), 1
+
+@case("latency", "server.ModelSet.price")
+def _(ctx):
+    models = server.build_models(store=ctx.store, priors=ctx.priors)
+    return lambda: models.price("3", [ctx.home], [ctx.away]), 1
+
+# Débit : toutes les rencontres de la ligue
+
+@case("throughput", "algorithms.generate_odds_matrix")
+def _(ctx):
+    return lambda: algorithms.generate_odds_matrix(ctx.current), len(ctx.homes)
+
+@case("throughput", "algorithms.generate_all_odds")
+def _(ctx):
+    return lambda: algorithms.generate_all_odds(ctx.current), len(ctx.homes)
+
+@case("throughput", "algorithms.home_away_probability_matrix")
+def _(ctx):
+    return lambda: algorithms.home_away_probability_matrix(ctx.current, previous_season=ctx.previous), len(ctx.homes)
+
+@case("throughput", "algorithms.generate_odds (loop)")
+def _(ctx):
+    def run():
+        for h, a in zip(ctx.homes, ctx.aways):
+            algorithms.generate_odds(h, a, ctx.current)
+    return run, len(ctx.homes)
+
+@case("throughput", "algorithms-old2.calc_forces + calc_prob (loop)")
+def _(ctx):
+    module = ctx.script("algorithms-old2.py")
+    stats = _goal_stats(ctx.current)
+
+    def run():
+        forces = module.calc_forces(stats)
+        for h, a in zip(ctx.homes, ctx.aways):
+            module.calc_prob(h, a, forces)
+    return run, len(ctx.homes)
+
+@case("throughput", "poisson.predict_matches")
+def _(ctx):
+    strengths = poisson.compute_team_strengths(ctx.current)
+    return lambda: poisson.predict_matches(ctx.homes, ctx.aways, strengths=strengths), len(ctx.homes)
+
+@case("throughput", "server.ModelSet.price")
+def _(ctx):
+    models = server.build_models(store=ctx.store, priors=ctx.priors)
+    return lambda: models.price("3", ctx.homes, ctx.aways), len(ctx.homes)
+
+@case("throughput", "combos.ComboPricer.price_legs (10k x 3 legs)")
+def _(ctx):
+    pricer = combos.ComboPricer.from_standings(ctx.current)
+    n_combos, n_legs = 10_000, 3
+    picks = np.random.default_rng(0).integers(0, len(ctx.homes), n_combos * n_legs)
+    selections = np.random.default_rng(1).choice(list(combos.SELECTIONS), n_combos * n_legs).tolist()
+    combo_ids = np.repeat(np.arange(n_combos), n_legs)
+    homes = [ctx.homes[i] for i in picks]
+    aways = [ctx.aways[i] for i in picks]
+    return lambda: pricer.price_legs(combo_ids, homes, aways, selections), n_combos
+
+@case("throughput", "catalogue.StackedSeasons.team_report")
+def _(ctx):
+    stacked = SeasonCatalogue(ctx.store).load(["synth"])
+    return stacked.team_report, int(stacked.present.sum())
+
+# Chargement des saisons
+
+@case("load", "pandas.read_csv")
+def _(ctx):
+    return lambda: [pd.read_csv(path) for path in ctx.season_files], len(ctx.season_files)
+
+@case("load", "season_store (cold ingest)")
+def _(ctx):
+    def run():
+        store = ctx.cold_store()
+        return [store.load_path(path) for path in ctx.season_files]
+    return run, len(ctx.season_files)
+
+@case("load", "season_store (warm, new process)")
+def _(ctx):
+    def run():
+        store = SeasonStore(ctx.data_dir, ctx.store.store_dir)
+        return [store.load_path(path).to_frame() for path in ctx.season_files]
+    return run, len(ctx.season_files)
+
+@case("load", "season_store (cached)")
+def _(ctx):
+    return lambda: [ctx.store.load_path(path) for path in ctx.season_files], len(ctx.season_files)
+
+@case("load", "server.build_models")
+def _(ctx):
+    return lambda: server.build_models(store=ctx.store, priors=ctx.priors), 1
+
+# Démarrage des scripts : un processus par appel, réponses sur l'entrée standard
+
+def _run_script(ctx, filename, answers):
+    """Lance le script dans un nouveau processus, depuis le dossier des données synthétiques."""
+    command = [sys.executable, os.path.join(ROOT, filename)] if filename else [sys.executable, "-c", "pass"]
+    env = {**os.environ, "PYTHONPATH": ROOT}
+
+    def run():
+        subprocess.run(command, input=answers, cwd=ctx.directory, env=env, capture_output=True, text=True, check=True)
+    return run, 1
+
+@case("startup", "python -c pass")
+def _(ctx):
+    return _run_script(ctx, None, "")
+
+@case("startup", "odds-fr.py")
+def _(ctx):
+    return _run_script(ctx, "odds-fr.py", f"3\n{ctx.home}\n{ctx.away}\n")
+
+@case("startup", "stats-fr.py")
+def _(ctx):
+    return _run_script(ctx, "stats-fr.py", f"2024-2025\n{ctx.home}\n")
+
+@case("startup", "odds-fr-transfert.py")
+def _(ctx):
+    return _run_script(ctx, "odds-fr-transfert.py", f"{ctx.home}\n{ctx.away}\n")
+
+def _goal_stats(data):
+    """Statistiques au format de calc_forces (buts pour / contre, matchs)."""
+    return {
+        row.Team: {"buts_pour": row.G, "buts_contre": row.GA, "matchs": row.M}
+        for row in data.itertuples()
+    }
@@ -0,0 +1,93 @@
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+def result_key(result):
+    return f"{result['kind']}/{result['name']}/n{result['n_teams']}"
+
+def environment():
+    """Contexte de la mesure (à comparer avant d'interpréter un écart)."""
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def save_results(results, path):
+    """Enregistre les mesures en JSON (écriture atomique)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {"environment": environment(), "results": {result_key(r): r for r in results}}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(results, baseline, tolerance=0.25, metric="p50_us"):
+    """
+    Compare les mesures à une référence (contenu d'un fichier save_results).
+
+    Une mesure est une régression si elle est plus lente que la référence de
+    plus de tolerance (0.25 = +25 %). Retourne une liste de dictionnaires
+    key, baseline, current, ratio, status ('regression', 'improvement',
+    'ok' ou 'new').
+    """
+    reference = baseline.get("results", {})
+    rows = []
+    for result in results:
+        key = result_key(result)
+        current = result[metric]
+        base = reference.get(key, {}).get(metric)
+        if base is None:
+            rows.append({"key": key, "baseline": None, "current": current, "ratio": None, "status": "new"})
+            continue
+        ratio = current / base if base else float("inf")
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"key": key, "baseline": base, "current": current, "ratio": ratio, "status": status})
+    return rows
+
+def _format_us(value):
+    if value is None:
+        return "-"
+    if value >= 1e6:
+        return f"{value / 1e6:.2f} s"
+    if value >= 1e3:
+        return f"{value / 1e3:.2f} ms"
+    return f"{value:.1f} µs"
+
+def format_results(results):
+    lines = [f"{'mesure':<72} {'p50':>10} {'p95':>10} {'éléments/s':>14} {'pic mém.':>10}"]
+    for r in results:
+        lines.append(
+            f"{result_key(r):<72} {_format_us(r['p50_us']):>10} {_format_us(r['p95_us']):>10} "
+            f"{r['items_per_s']:>14,.0f} {r['peak_kb']:>8,.0f} Ko"
+        )
+    return "\n".join(lines)
+
+def format_comparison(rows):
+    lines = [f"{'mesure':<72} {'référence':>10} {'actuel':>10} {'ratio':>7}  statut"]
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        lines.append(
+            f"{row['key']:<72} {_format_us(row['baseline']):>10} {_format_us(row['current']):>10} {ratio:>7}  {row['status']}"
+        )
+    return "\n".join(lines)
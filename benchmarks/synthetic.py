@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+def synthetic_teams(n_teams):
+    """Noms d'équipes fictifs (Team 01, Team 02...)."""
+    width = len(str(n_teams))
+    return [f"Team {i + 1:0{width}d}" for i in range(n_teams)]
+
+def synthetic_results(n_teams, seed=0, strengths=None):
+    """
+    Résultats d'un championnat complet (matchs aller et retour entre chaque
+    paire), buts tirés selon une loi de Poisson à partir de forces
+    d'attaque et de défense aléatoires.
+
+    Retourne (home_idx, away_idx, home_goals, away_goals).
+    """
+    rng = np.random.default_rng(seed)
+    if strengths is None:
+        strengths = rng.normal(0.0, 0.25, size=(2, n_teams))
+    attack, defence = strengths
+    home, away = np.nonzero(~np.eye(n_teams, dtype=bool))
+    home_goals = rng.poisson(np.exp(0.3 + attack[home] + defence[away]))
+    away_goals = rng.poisson(np.exp(0.1 + attack[away] + defence[home]))
+    return home, away, home_goals, away_goals
+
+def standings_from_results(teams, home, away, home_goals, away_goals):
+    """Classement au format des CSV du projet (Number, Team, M, W, D, L, G, GA, PTS, Diff)."""
+    n_teams = len(teams)
+
+    def count(mask_home, mask_away):
+        return np.bincount(home, mask_home, n_teams) + np.bincount(away, mask_away, n_teams)
+
+    wins = count(home_goals > away_goals, away_goals > home_goals)
+    draws = count(home_goals == away_goals, home_goals == away_goals)
+    matches = np.bincount(home, minlength=n_teams) + np.bincount(away, minlength=n_teams)
+    goals = count(home_goals, away_goals)
+    against = count(away_goals, home_goals)
+
+    data = pd.DataFrame({
+        "Team": teams,
+        "M": matches,
+        "W": wins.astype(int),
+        "D": draws.astype(int),
+        "L": (matches - wins - draws).astype(int),
+        "G": goals.astype(int),
+        "GA": against.astype(int),
+    })
+    data["PTS"] = 3 * data["W"] + data["D"]
+    data["Diff"] = data["G"] - data["GA"]
+    data = data.sort_values(["PTS", "Diff", "G"], ascending=False, kind="stable").reset_index(drop=True)
+    data.insert(0, "Number", np.arange(1, n_teams + 1))
+    return data
+
+def synthetic_league(n_teams=18, seed=0, played=None):
+    """
+    Classement synthétique d'une ligue de n_teams équipes.
+
+    played : nombre de matchs joués par équipe (saison en cours) ; par
+             défaut la saison est complète (2 * (n_teams - 1) matchs).
+    """
+    teams = synthetic_teams(n_teams)
+    home, away, home_goals, away_goals = synthetic_results(n_teams, seed=seed)
+    if played is not None:
+        # Les premières journées : on garde une fraction des rencontres
+        keep = np.random.default_rng(seed + 1).random(len(home)) < played / (2 * (n_teams - 1))
+        home, away, home_goals, away_goals = home[keep], away[keep], home_goals[keep], away_goals[keep]
+    return standings_from_results(teams, home, away, home_goals, away_goals)
+
+def synthetic_seasons(n_teams=18, n_seasons=5, seed=0, first_year=2000):
+    """
+    Plusieurs saisons successives des mêmes équipes (forces qui dérivent
+    d'une saison à l'autre). Retourne une liste de (saison, classement).
+    """
+    rng = np.random.default_rng(seed)
+    strengths = rng.normal(0.0, 0.25, size=(2, n_teams))
+    teams = synthetic_teams(n_teams)
+    seasons = []
+    for k in range(n_seasons):
+        results = synthetic_results(n_teams, seed=seed + k + 1, strengths=strengths)
+        seasons.append((f"{first_year + k}-{first_year + k + 1}", standings_from_results(teams, *results)))
+        strengths = 0.8 * strengths + rng.normal(0.0, 0.1, size=strengths.shape)
+    return seasons
+
+def write_league_files(directory, league="synth", n_teams=18, n_seasons=5, seed=0, first_year=2000):
+    """Écrit les saisons synthétiques en CSV <ligue>-<saison>.csv ; retourne les chemins."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for season, data in synthetic_seasons(n_teams, n_seasons, seed, first_year):
+        path = os.path.join(directory, f"{league}-{season}.csv")
+        data.to_csv(path, index=False)
+        paths.append(path)
+    return paths
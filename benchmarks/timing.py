@@ -0,0 +1,55 @@
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+def measure(fn, min_time=0.2, min_calls=5, max_calls=1_000_000):
+    """
+    Chronomètre chaque appel de fn jusqu'à min_time secondes cumulées
+    (au moins min_calls appels, après un appel de chauffe).
+
+    Retourne un dictionnaire : calls, min_us, p50_us, p95_us, p99_us, mean_us.
+    """
+    fn()
+    durations = []
+    clock = time.perf_counter_ns
+    total = 0
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while (total < min_time * 1e9 or len(durations) < min_calls) and len(durations) < max_calls:
+            start = clock()
+            fn()
+            elapsed = clock() - start
+            durations.append(elapsed)
+            total += elapsed
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    us = np.asarray(durations, dtype=float) / 1e3
+    return {
+        "calls": len(us),
+        "min_us": float(us.min()),
+        "p50_us": float(np.percentile(us, 50)),
+        "p95_us": float(np.percentile(us, 95)),
+        "p99_us": float(np.percentile(us, 99)),
+        "mean_us": float(us.mean()),
+    }
+
+def memory_peak(fn):
+    """Pic d'allocation (Ko, tracemalloc : objets Python et tableaux NumPy) d'un appel de fn."""
+    gc.collect()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return max(peak - base, 0) / 1024
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+
+from instrumentation import count, timed
+
+CACHE_DIR = os.path.join(".cache", "standings")
+CACHE_DURATION = 24 * 3600  # 24 heures
+
+def cache_key(*parts):
+    """Clé de cache lisible : ('api-football', 61, 2024) -> 'api-football/61/2024'."""
+    return "/".join(str(p) for p in parts)
+
+class DiskTTLCache:
+    """
+    Cache JSON sur disque avec durée de validité (un fichier par clé).
+
+    Remplace le fichier unique standings_cache.json : chaque couple
+    fournisseur / ligue / saison a sa propre entrée {"timestamp", "key", "value"}.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_DURATION):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    @timed("cache.read")
+    def get_entry(self, key):
+        """Retourne (timestamp, valeur) quel que soit l'âge, ou None si absent ou corrompu."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            entry = entry["timestamp"], entry["value"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            count("cache.miss")
+            return None
+        count("cache.hit")
+        return entry
+
+    def get(self, key):
+        """Valeur encore valide pour la clé, ou None."""
+        entry = self.get_entry(key)
+        if entry is None or time.time() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    @timed("cache.write")
+    def set(self, key, value, timestamp=None):
+        """Écrit l'entrée de façon atomique (fichier temporaire puis renommage)."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        entry = {"timestamp": time.time() if timestamp is None else timestamp, "key": key, "value": value}
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+class LRUCache:
+    """Cache mémoire borné : l'entrée la moins récemment utilisée est évincée."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def set(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def keys(self):
+        """Clés en cache, de la moins à la plus récemment utilisée (copie : l'ordre LRU n'est pas modifié)."""
+        return list(self._data)
+
+    def items(self):
+        """Paires (clé, valeur) dans l'ordre de keys(), sans modifier l'ordre LRU."""
+        return list(self._data.items())
+
+def approximate_size(value):
+    """
+    Taille approchée en octets d'une valeur (dictionnaires, listes, textes
+    et nombres imbriqués ; les vues NumPy comptent les données qu'elles montrent).
+    """
+    size = sys.getsizeof(value)
+    if getattr(value, "base", None) is not None and hasattr(value, "nbytes"):
+        size += value.nbytes
+    elif isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(approximate_size(v) for v in value)
+    return size
+
+class SizedLRUCache(LRUCache):
+    """
+    LRU borné en nombre d'entrées (maxsize) et en octets (maxbytes, tailles
+    estimées par sizeof) : les entrées les moins récemment utilisées sont
+    évincées jusqu'à repasser sous les deux limites.
+    """
+
+    def __init__(self, maxsize=100_000, maxbytes=64 * 1024 * 1024, sizeof=approximate_size):
+        super().__init__(maxsize)
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.evictions = 0
+        self._sizes = {}
+
+    def set(self, key, value):
+        size = self.sizeof(key) + self.sizeof(value)
+        self.nbytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while self._data and (len(self._data) > self.maxsize or self.nbytes > self.maxbytes):
+            old_key, _ = self._data.popitem(last=False)
+            self.nbytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        self.nbytes -= self._sizes.pop(key, 0)
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+
+class CacheMetrics:
+    """Compteurs d'un cache à niveaux (succès, échecs, données périmées, rafraîchissements)."""
+
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def snapshot(self):
+        return dict(vars(self))
+
+class TieredCache:
+    """
+    Cache à deux niveaux (LRU mémoire devant le cache disque) avec
+    « stale-while-revalidate ».
+
+    loader : coroutine loader(key) qui télécharge la valeur d'une clé
+             (tuple, par ex. (fournisseur, ligue, saison))
+    ttl : âge au-delà duquel une valeur est rafraîchie en arrière-plan ;
+          elle reste servie immédiatement jusqu'à la fin du rafraîchissement.
+
+    Les rafraîchissements concurrents d'une même clé sont regroupés en un
+    seul appel au loader. Seul un échec complet (aucune valeur, même périmée)
+    attend le loader sur le chemin de la requête.
+    """
+
+    def __init__(self, loader, disk=None, memory_size=128, ttl=CACHE_DURATION):
+        self.loader = loader
+        self.disk = disk if disk is not None else DiskTTLCache(ttl=ttl)
+        self.memory = LRUCache(memory_size)
+        self.ttl = ttl
+        self.metrics = CacheMetrics()
+        self._inflight = {}
+
+    def _entry(self, key, count=True):
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.metrics.memory_hits += count
+            return entry
+        entry = self.disk.get_entry(cache_key(*key))
+        if entry is not None:
+            self.metrics.disk_hits += count
+            self.memory.set(key, entry)
+        return entry
+
+    async def get(self, key):
+        """Valeur de la clé : fraîche, périmée (rafraîchie en arrière-plan) ou téléchargée."""
+        key = tuple(key)
+        entry = self._entry(key)
+        if entry is not None:
+            timestamp, value = entry
+            if time.time() - timestamp >= self.ttl:
+                self.metrics.stale_hits += 1
+                self.refresh(key)
+            return value
+
+        self.metrics.misses += 1
+        return await self.refresh(key)
+
+    def refresh(self, key):
+        """Lance (ou rejoint) le rafraîchissement de la clé ; retourne la tâche asyncio."""
+        import asyncio  # importé à la demande : les caches mémoire servent aussi aux scripts
+
+        key = tuple(key)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key))
+            self._inflight[key] = task
+            task.add_done_callback(self._refresh_done(key))
+        return task
+
+    def _refresh_done(self, key):
+        def done(task):
+            self._inflight.pop(key, None)
+            if not task.cancelled() and task.exception() is not None:
+                self.metrics.refresh_errors += 1
+        return done
+
+    async def _load(self, key):
+        import asyncio
+
+        self.metrics.refreshes += 1
+        value = await self.loader(key)
+        timestamp = time.time()
+        self.memory.set(key, (timestamp, value))
+        await asyncio.to_thread(self.disk.set, cache_key(*key), value, timestamp)
+        return value
+
+    def age(self, key):
+        """Âge en secondes de la valeur en cache, ou None si absente."""
+        entry = self._entry(tuple(key), count=False)
+        return None if entry is None else time.time() - entry[0]
+
+    def stats(self):
+        """Compteurs, âge des entrées en mémoire et rafraîchissements en cours."""
+        now = time.time()
+        stats = self.metrics.snapshot()
+        stats["memory_entries"] = len(self.memory)
+        stats["inflight"] = len(self._inflight)
+        stats["ages"] = {cache_key(*key): now - entry[0] for key, entry in self.memory.items()}
+        return stats
@@ -0,0 +1,290 @@
+import numpy as np
+from algorithms import weighted_home_away_matrix
+from season_store import default_store
+from teams import TeamRegistry, canonical_team_key
+
+# Identifiants des ligues chez les fournisseurs de classements (standings_client)
+LEAGUES = {
+    "ligue1": {"name": "Ligue 1", "api-football": 61, "thesportsdb": "4334"},
+    "ligue2": {"name": "Ligue 2", "api-football": 62, "thesportsdb": "4401"},
+    "premier_league": {"name": "Premier League", "api-football": 39, "thesportsdb": "4328"},
+    "laliga": {"name": "La Liga", "api-football": 140, "thesportsdb": "4335"},
+    "serie_a": {"name": "Serie A", "api-football": 135, "thesportsdb": "4332"},
+    "bundesliga": {"name": "Bundesliga", "api-football": 78, "thesportsdb": "4331"},
+}
+
+STACKED_COLUMNS = ("M", "W", "D", "L", "G", "GA", "PTS", "Diff")
+
+# Statistiques par match du rapport : (numérateur, dénominateur M)
+REPORT_METRICS = {
+    "win_rate": "W",
+    "draw_rate": "D",
+    "loss_rate": "L",
+    "goals_per_match": "G",
+    "goals_against_per_match": "GA",
+    "points_per_match": "PTS",
+}
+
+def provider_league_id(provider, league):
+    """Identifiant d'une ligue chez un fournisseur ('ligue1' -> 61) ; inchangé si inconnu."""
+    return LEAGUES.get(str(league).lower(), {}).get(provider, league)
+
+def season_sort_key(season):
+    """Ordre chronologique des saisons ('2023-2024', '2024'...)."""
+    return int(str(season).split("-")[0])
+
+def season_weights(n_seasons, decay=2 / 3):
+    """
+    Poids exponentiels de n_seasons saisons (de la plus ancienne à la plus
+    récente) : chaque saison pèse decay fois la suivante. Avec deux saisons
+    et decay = 2/3, la saison en cours pèse 0.6 (weight_current_season).
+    """
+    weights = decay ** np.arange(n_seasons - 1, -1, -1, dtype=float)
+    return weights / weights.sum()
+
+class SeasonCatalogue:
+    """Ligues et saisons disponibles dans le stockage des saisons."""
+
+    def __init__(self, store=None):
+        self.store = store or default_store()
+
+    def leagues(self):
+        return sorted({league for league, _ in self.store.keys()})
+
+    def seasons(self, league):
+        """Saisons d'une ligue, de la plus ancienne à la plus récente."""
+        seasons = [season for lg, season in self.store.keys() if lg == league.lower()]
+        return sorted(seasons, key=season_sort_key)
+
+    def load(self, leagues=None, seasons=None, last=None, columns=STACKED_COLUMNS):
+        """
+        Empile les saisons demandées (toutes par défaut ; last = les N plus
+        récentes de chaque ligue) dans un StackedSeasons.
+        """
+        leagues = [lg.lower() for lg in (leagues or self.leagues())]
+        wanted = set(map(str, seasons)) if seasons is not None else None
+        selected = {}
+        for league in leagues:
+            available = [s for s in self.seasons(league) if wanted is None or s in wanted]
+            selected[league] = available[-last:] if last else available
+        return StackedSeasons.from_store(self.store, selected, columns)
+
+class StackedSeasons:
+    """
+    Classements de plusieurs ligues et saisons dans des tableaux
+    (ligue, saison, équipe) : values[colonne][l, s, t], NaN quand l'équipe t
+    ne jouait pas dans la ligue l pendant la saison s.
+
+    Les saisons sont l'union chronologique des saisons de toutes les ligues ;
+    les équipes d'une ligue sont l'union de ses saisons (même club reconnu
+    d'une saison à l'autre grâce aux alias de teams.py), complétée jusqu'au
+    plus grand effectif.
+    """
+
+    def __init__(self, leagues, seasons, teams, values):
+        self.leagues = list(leagues)
+        self.seasons = list(seasons)
+        self.teams = [list(t) for t in teams]
+        self.values = values
+        self.present = ~np.isnan(values["M"])
+        self.registries = [TeamRegistry(t) for t in self.teams]
+        self._league_ids = {league: i for i, league in enumerate(self.leagues)}
+        self._season_ids = {season: i for i, season in enumerate(self.seasons)}
+
+    @classmethod
+    def from_store(cls, store, selected, columns=STACKED_COLUMNS):
+        """selected : {ligue: [saisons]} (saisons chargées depuis store)."""
+        leagues = list(selected)
+        seasons = sorted({s for ss in selected.values() for s in ss}, key=season_sort_key)
+        season_ids = {season: i for i, season in enumerate(seasons)}
+
+        loaded = {}
+        teams = []
+        for league in leagues:
+            keys, names = {}, []
+            # Du plus récent au plus ancien : le nom affiché est le plus récent
+            for season in sorted(selected[league], key=season_sort_key, reverse=True):
+                data = store.get(league, season)
+                loaded[league, season] = data
+                for team in data.teams:
+                    key = canonical_team_key(team)
+                    if key not in keys:
+                        keys[key] = len(names)
+                        names.append(team)
+            teams.append(names)
+
+        shape = (len(leagues), len(seasons), max((len(t) for t in teams), default=0))
+        values = {name: np.full(shape, np.nan) for name in columns}
+        for l, (league, names) in enumerate(zip(leagues, teams)):
+            index = {canonical_team_key(team): t for t, team in enumerate(names)}
+            for season in selected[league]:
+                data = loaded[league, season]
+                s = season_ids[season]
+                rows = np.array([index[canonical_team_key(team)] for team in data.teams], dtype=np.intp)
+                for name in columns:
+                    if name in data.columns:
+                        values[name][l, s, rows] = data[name]
+        return cls(leagues, seasons, teams, values)
+
+    @property
+    def shape(self):
+        return self.values["M"].shape
+
+    def __getitem__(self, column):
+        return self.values[column]
+
+    def index(self, league, season=None, team=None):
+        """Indices (l, s, t) ; season / team peuvent être omis."""
+        try:
+            l = self._league_ids[league.lower()]
+        except KeyError:
+            raise ValueError(f"League '{league}' not found in the catalogue.")
+        result = [l]
+        if season is not None:
+            if str(season) not in self._season_ids:
+                raise ValueError(f"Season '{season}' not found in the catalogue.")
+            result.append(self._season_ids[str(season)])
+        if team is not None:
+            result.append(self.registries[l].id(team))
+        return tuple(result)
+
+    def league(self, league):
+        """(équipes, {colonne: tableau (saisons, équipes)}) d'une ligue."""
+        l, = self.index(league)
+        n_teams = len(self.teams[l])
+        return self.teams[l], {name: values[l, :, :n_teams] for name, values in self.values.items()}
+
+    def weights(self, decay=2 / 3, as_of=None):
+        """
+        Poids exponentiels par (ligue, saison) : la saison la plus récente de
+        chaque ligue (ou as_of) pèse 1, la précédente decay, etc. Les saisons
+        postérieures à as_of et celles sans données pèsent 0.
+        """
+        played = self.present.any(axis=2)
+        positions = np.arange(len(self.seasons))
+        if as_of is not None:
+            if str(as_of) not in self._season_ids:
+                raise ValueError(f"Season '{as_of}' not found in the catalogue.")
+            played &= positions <= self._season_ids[str(as_of)]
+        latest = np.where(played.any(axis=1), (played * positions).max(axis=1), 0)
+        age = latest[:, None] - positions[None, :]
+        return np.where(played & (age >= 0), decay ** np.maximum(age, 0), 0.0)
+
+    def weighted(self, column, decay=2 / 3, as_of=None):
+        """
+        Moyenne pondérée dans le temps d'une colonne (ou d'un tableau de même
+        forme) sur les saisons : une seule réduction, résultat (ligue, équipe).
+        Les saisons où l'équipe est absente sont ignorées (poids renormalisés) ;
+        NaN pour une équipe sans aucune saison retenue.
+        """
+        values = self.values[column] if isinstance(column, str) else np.asarray(column, dtype=float)
+        weights = self.weights(decay, as_of)[:, :, None] * self.present
+        total = weights.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (np.where(weights > 0, values, 0.0) * weights).sum(axis=1) / total
+
+    def rates(self, decay=2 / 3, as_of=None):
+        """Taux de victoire, de nul et de défaite par match pondérés dans le temps (ligue, équipe)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            matches = self.values["M"]
+            return {
+                "win": self.weighted(self.values["W"] / matches, decay, as_of),
+                "draw": self.weighted(self.values["D"] / matches, decay, as_of),
+                "loss": self.weighted(self.values["L"] / matches, decay, as_of),
+            }
+
+    def _metrics(self, totals):
+        """
+        Statistiques par match de REPORT_METRICS et leur écart avec la saison
+        précédente (axe 1) : NaN si les deux saisons retenues ne se suivent pas
+        (--season 2020 --season 2024).
+        """
+        matches = totals["M"]
+        metrics = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for name, column in REPORT_METRICS.items():
+                values = totals[column] if column in totals else matches - totals["W"] - totals["D"]
+                metrics[name] = values / matches
+        starts = np.array([season_sort_key(season) for season in self.seasons])
+        follows = np.diff(starts) == 1
+        for name in REPORT_METRICS:
+            delta = np.full_like(metrics[name], np.nan)
+            previous = follows.reshape((-1,) + (1,) * (delta.ndim - 2))
+            delta[:, 1:] = np.where(previous, metrics[name][:, 1:] - metrics[name][:, :-1], np.nan)
+            metrics[f"{name}_delta"] = delta
+        return metrics
+
+    def team_report(self):
+        """
+        Rapport par (ligue, saison, équipe) présente, en colonnes : league,
+        season, team, les colonnes empilées, les taux de victoire / nul /
+        défaite, buts marqués / encaissés et points par match, et pour chacun
+        l'écart avec la saison précédente de l'équipe dans la ligue (_delta,
+        NaN si elle n'y jouait pas ou si cette saison n'est pas chargée). Calculé sur tous les tableaux à la fois.
+        """
+        metrics = self._metrics(self.values)
+        l, s, t = np.nonzero(self.present)
+        names = np.full(self.shape[::2], None, dtype=object)
+        for i, teams in enumerate(self.teams):
+            names[i, :len(teams)] = teams
+        report = {
+            "league": np.asarray(self.leagues, dtype=object)[l],
+            "season": np.asarray(self.seasons, dtype=object)[s],
+            "team": names[l, t],
+        }
+        for name, values in {**self.values, **metrics}.items():
+            report[name] = values[l, s, t]
+        return report
+
+    def group_report(self, by=("league", "season")):
+        """
+        Rapport agrégé par ligue et / ou saison (by : sous-ensemble de
+        ("league", "season"), vide = tout) : nombre d'équipes, totaux et
+        statistiques par match de l'ensemble (totaux rapportés aux matchs),
+        écarts d'une saison à l'autre quand les saisons sont séparées.
+        """
+        by = tuple(by)
+        unknown = set(by) - {"league", "season"}
+        if unknown:
+            raise ValueError(f"Unknown group-by column(s): {', '.join(sorted(unknown))}.")
+        totals = {"teams": self.present.sum(axis=2)}
+        totals.update((name, np.nansum(values, axis=2)) for name, values in self.values.items())
+        if "league" not in by:
+            totals = {name: values.sum(axis=0, keepdims=True) for name, values in totals.items()}
+        if "season" not in by:
+            totals = {name: values.sum(axis=1, keepdims=True) for name, values in totals.items()}
+        metrics = self._metrics(totals)
+        if "season" not in by:
+            metrics = {name: values for name, values in metrics.items() if not name.endswith("_delta")}
+
+        l, s = np.nonzero(totals["teams"])
+        report = {}
+        if "league" in by:
+            report["league"] = np.asarray(self.leagues, dtype=object)[l]
+        if "season" in by:
+            report["season"] = np.asarray(self.seasons, dtype=object)[s]
+        for name, values in {**totals, **metrics}.items():
+            report[name] = values[l, s]
+        return report
+
+    def probability_matrix(self, league, decay=2 / 3, as_of=None, home_advantage=0.1, away_advantage=-0.05, priors=None):
+        """
+        Probabilités 1X2 de toutes les rencontres d'une ligue, saisons
+        combinées avec des poids exponentiels (remplace weight_current_season).
+        Les équipes sont celles de la saison la plus récente retenue ; avec
+        priors (priors.PriorStore), les promues sont rétrécies vers leur prior.
+        """
+        l, = self.index(league)
+        teams, columns = self.league(league)
+        weights = self.weights(decay, as_of)[l]
+        latest = np.flatnonzero(weights)[-1]
+        current = np.flatnonzero(self.present[l, latest, :len(teams)])
+        names = [teams[t] for t in current]
+        prior = priors.team_prior(league, self.seasons[latest], names) if priors is not None else None
+
+        matrices = weighted_home_away_matrix(
+            columns["W"][:, current], columns["D"][:, current], columns["M"][:, current],
+            weights, home_advantage, away_advantage, prior,
+        )
+        matrices["teams"] = names
+        return matrices
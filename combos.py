@@ -0,0 +1,282 @@
+import argparse
+import sys
+from collections import defaultdict
+
+import numpy as np
+from poisson import DEFAULT_LINES, compute_team_strengths, expected_goals, score_matrices, team_indices
+
+# Sélections d'une jambe : chacune est un masque sur la grille des scores,
+# identifiée par un bit (les jambes d'une même rencontre se combinent par ET).
+SELECTIONS = (
+    ("1", "X", "2", "1X", "12", "X2", "btts_yes", "btts_no")
+    + tuple(f"over_{line}" for line in DEFAULT_LINES)
+    + tuple(f"under_{line}" for line in DEFAULT_LINES)
+)
+SELECTION_BITS = {name: 1 << i for i, name in enumerate(SELECTIONS)}
+
+# Autres écritures acceptées
+SELECTION_ALIASES = {
+    "h": "1", "home": "1", "d": "X", "x": "X", "draw": "X", "a": "2", "away": "2",
+    "1x": "1X", "x2": "X2", "btts": "btts_yes", "gg": "btts_yes", "ng": "btts_no",
+}
+
+def selection_name(selection):
+    """Nom canonique d'une sélection : '1', 'X', 'over_2.5', 'btts_yes'... ; ValueError si inconnue."""
+    text = str(selection).strip()
+    if text in SELECTION_BITS:
+        return text
+    lowered = text.lower().replace(" ", "")
+    if lowered in SELECTION_ALIASES:
+        return SELECTION_ALIASES[lowered]
+    for prefix in ("over", "under", "o", "u"):
+        if lowered.startswith(prefix):
+            rest = lowered[len(prefix):].lstrip("_")
+            try:
+                name = f"{'over' if prefix[0] == 'o' else 'under'}_{float(rest)}"
+            except ValueError:
+                break
+            if name in SELECTION_BITS:
+                return name
+    raise ValueError(f"Unknown selection '{selection}'.")
+
+def selection_masks(size):
+    """Masques (len(SELECTIONS), size * size) des sélections sur une grille de scores size x size."""
+    home_goals, away_goals = (g.reshape(-1) for g in np.indices((size, size)))
+    total = home_goals + away_goals
+    masks = {
+        "1": home_goals > away_goals,
+        "X": home_goals == away_goals,
+        "2": home_goals < away_goals,
+        "btts_yes": (home_goals > 0) & (away_goals > 0),
+    }
+    masks["1X"] = masks["1"] | masks["X"]
+    masks["12"] = ~masks["X"]
+    masks["X2"] = masks["X"] | masks["2"]
+    masks["btts_no"] = ~masks["btts_yes"]
+    for line in DEFAULT_LINES:
+        masks[f"over_{line}"] = total > line
+        masks[f"under_{line}"] = total < line
+    return np.array([masks[name] for name in SELECTIONS])
+
+class PoissonScoreModel:
+    """Grilles de scores du modèle de Poisson (forces de poisson.compute_team_strengths)."""
+
+    def __init__(self, strengths):
+        self.strengths = strengths
+        self.registry = strengths["registry"]
+
+    def score_matrices(self, home_teams, away_teams, max_goals=None, tol=1e-10):
+        home_idx = team_indices(home_teams, self.strengths)
+        away_idx = team_indices(away_teams, self.strengths)
+        return score_matrices(*expected_goals(home_idx, away_idx, self.strengths), max_goals, tol)
+
+class ComboPricer:
+    """
+    Cotes de combinés : jambes 1X2 (et double chance), plus/moins de buts et
+    « les deux équipes marquent » sur une ou plusieurs rencontres.
+
+    model : objet avec score_matrices(home_teams, away_teams) et registry
+            (PoissonScoreModel, dixon_coles.DixonColesModel)
+
+    Les rencontres différentes sont indépendantes : la probabilité du combiné
+    est le produit des probabilités par rencontre. Les jambes d'une même
+    rencontre sont évaluées ensemble sur sa grille des scores (par exemple
+    1 et over_2.5 : somme des scores où les deux sont vrais). Les grilles
+    sont calculées une fois par rencontre puis gardées en cache.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.size = 0
+        self._index = {}
+        self._grids = np.zeros((0, 0))  # une grille aplatie par rencontre
+        self._masks = selection_masks(0)
+        self._joint = {}
+        self._and_masks = {}
+
+    @classmethod
+    def from_standings(cls, season_data):
+        """Pricer du modèle de Poisson à partir d'un classement (DataFrame ou core.SeasonTable)."""
+        if hasattr(season_data, "to_frame") and not hasattr(season_data, "columns"):
+            season_data = season_data.to_frame()
+        return cls(PoissonScoreModel(compute_team_strengths(season_data)))
+
+    def _fixture_ids(self, homes, aways):
+        """Ligne de la grille de chaque rencontre (calcule en un lot les rencontres encore inconnues)."""
+        index = self._index
+        rows = [index.get(pair) for pair in zip(homes, aways)]
+        if None in rows:
+            registry = self.model.registry
+            unknown = {pair for pair, row in zip(zip(homes, aways), rows) if row is None}
+            canonical = {pair: tuple(registry.names[registry.id(name)] for name in pair) for pair in unknown}
+            missing = list(dict.fromkeys(key for key in canonical.values() if key not in index))
+            if missing:
+                self._add_fixtures(missing)
+            for pair, key in canonical.items():
+                index[pair] = index[key]  # noms tels que saisis (alias) -> même ligne
+            rows = [index[pair] for pair in zip(homes, aways)]
+        return rows
+
+    def _add_fixtures(self, pairs):
+        grids = self.model.score_matrices([h for h, _ in pairs], [a for _, a in pairs])
+        size = grids.shape[1]
+        if size > self.size:
+            self._resize(size)
+        padded = np.zeros((len(pairs), self.size, self.size))
+        padded[:, :size, :size] = grids
+        start = len(self._grids)
+        self._grids = np.concatenate([self._grids, padded.reshape(len(pairs), -1)])
+        for row, pair in enumerate(pairs, start):
+            self._index[pair] = row
+
+    def _resize(self, size):
+        """Agrandit les grilles en cache (zéros au-delà de l'ancienne troncature) et recalcule les masques."""
+        old = self._grids.reshape(len(self._grids), self.size, self.size)
+        grids = np.zeros((len(old), size, size))
+        grids[:, :self.size, :self.size] = old
+        self._grids = grids.reshape(len(old), size * size)
+        self.size = size
+        self._masks = selection_masks(size)
+        self._joint.clear()
+        self._and_masks.clear()
+
+    def _and_mask(self, bits):
+        mask = self._and_masks.get(bits)
+        if mask is None:
+            selected = [i for i in range(len(SELECTIONS)) if bits >> i & 1]
+            mask = self._and_masks[bits] = np.logical_and.reduce(self._masks[selected]).astype(float)
+        return mask
+
+    def fixture_probability(self, row, bits):
+        """Probabilité que toutes les sélections bits soient vraies sur la rencontre row."""
+        key = (row, bits)
+        prob = self._joint.get(key)
+        if prob is None:
+            prob = self._joint[key] = float(self._grids[row] @ self._and_mask(bits))
+        return prob
+
+    def price(self, legs, overround=1.0):
+        """
+        Cote d'un combiné : legs = [(home, away, sélection), ...].
+
+        Retourne probability, fair_odds (1 / probabilité) et odds, avec
+        la marge overround appliquée à chaque rencontre : 1 / (p x overround ** rencontres).
+        """
+        legs = list(legs)
+        rows = self._fixture_ids([leg[0] for leg in legs], [leg[1] for leg in legs])
+        groups = defaultdict(int)
+        for row, leg in zip(rows, legs):
+            groups[row] |= SELECTION_BITS[selection_name(leg[2])]
+        probability = 1.0
+        for row, bits in groups.items():
+            probability *= self.fixture_probability(row, bits)
+        return _combo_result(probability, len(groups), overround)
+
+    def price_legs(self, combo_ids, homes, aways, selections, overround=1.0):
+        """
+        Cotes d'un lot de combinés décrit jambe par jambe (colonnes de même
+        longueur) : combo_ids[k] est le combiné de la jambe k (entiers).
+
+        Retourne (combos, probability, fair_odds, odds, fixtures) : identifiants
+        des combinés (triés) et, pour chacun, sa probabilité, ses cotes et son
+        nombre de rencontres distinctes.
+        """
+        combo_ids = np.asarray(combo_ids, dtype=np.int64)
+        rows = np.asarray(self._fixture_ids(homes, aways), dtype=np.int64)
+        bits = np.array([SELECTION_BITS.get(s) or SELECTION_BITS[selection_name(s)] for s in selections], dtype=np.int64)
+
+        # Un groupe par (combiné, rencontre) : union des sélections de ses jambes
+        combos, combo_codes = np.unique(combo_ids, return_inverse=True)
+        groups, group_codes = np.unique(combo_codes * len(self._grids) + rows, return_inverse=True)
+        group_bits = np.zeros(len(groups), dtype=np.int64)
+        np.bitwise_or.at(group_bits, group_codes, bits)
+        group_rows = groups % len(self._grids)
+        group_combos = groups // len(self._grids)
+
+        # Probabilité de chaque (rencontre, sélections) distinct : un produit matrice-vecteur par jeu de sélections
+        pairs, pair_codes = np.unique((group_rows << len(SELECTIONS)) | group_bits, return_inverse=True)
+        pair_rows = pairs >> len(SELECTIONS)
+        pair_bits = pairs & ((1 << len(SELECTIONS)) - 1)
+        pair_probs = np.empty(len(pairs))
+        for value in np.unique(pair_bits):
+            selected = pair_bits == value
+            pair_probs[selected] = self._grids[pair_rows[selected]] @ self._and_mask(int(value))
+
+        # Produit des groupes de chaque combiné (les groupes sont triés par combiné)
+        starts = np.flatnonzero(np.r_[True, group_combos[1:] != group_combos[:-1]])
+        probability = np.multiply.reduceat(pair_probs[pair_codes], starts)
+        fixtures = np.diff(np.r_[starts, len(groups)])
+        with np.errstate(divide="ignore"):
+            fair_odds = 1 / probability
+            odds = 1 / (probability * float(overround) ** fixtures)
+        return combos, probability, fair_odds, odds, fixtures
+
+    def price_many(self, combos, overround=1.0):
+        """Cotes d'une liste de combinés (listes de (home, away, sélection)) ; un dictionnaire par combiné."""
+        combo_ids, homes, aways, selections = [], [], [], []
+        for i, legs in enumerate(combos):
+            for home, away, selection in legs:
+                combo_ids.append(i)
+                homes.append(home)
+                aways.append(away)
+                selections.append(selection)
+        ids, probability, fair_odds, odds, fixtures = self.price_legs(combo_ids, homes, aways, selections, overround)
+        results = [None] * len(combos)
+        for i, p, fair, o, n in zip(ids.tolist(), probability.tolist(), fair_odds.tolist(), odds.tolist(), fixtures.tolist()):
+            results[i] = {"probability": p, "fair_odds": fair, "odds": o, "fixtures": n}
+        return results
+
+def _combo_result(probability, fixtures, overround):
+    return {
+        "probability": probability,
+        "fair_odds": 1 / probability if probability > 0 else float("inf"),
+        "odds": 1 / (probability * overround ** fixtures) if probability > 0 else float("inf"),
+        "fixtures": fixtures,
+    }
+
+def parse_leg(text):
+    """'PSG - Lens: over_2.5' -> ('PSG', 'Lens', 'over_2.5')."""
+    try:
+        match, selection = text.rsplit(":", 1)
+        home, away = match.split(" - ", 1) if " - " in match else match.split("-", 1)
+    except ValueError:
+        raise ValueError(f"Invalid leg '{text}' (expected 'Home - Away: selection').")
+    return home.strip(), away.strip(), selection.strip()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cotes de combinés (1X2, double chance, plus/moins, les deux équipes marquent).")
+    parser.add_argument("legs", nargs="*", help="Jambes d'un combiné : 'PSG - Lens: 1' 'Nice - Lyon: over_2.5'")
+    parser.add_argument("--file", help="Lot de combinés (CSV ou JSONL : combo, home, away, selection ; '-' = entrée standard)")
+    parser.add_argument("-o", "--output", default="-", help="Résultats du lot en CSV ('-' = sortie standard)")
+    parser.add_argument("--league", default="ligue1")
+    parser.add_argument("--season", default="2024-2025")
+    parser.add_argument("--overround", type=float, default=1.0, help="Marge par rencontre (1.05 = 5 %%)")
+    args = parser.parse_args(argv)
+    if not args.legs and not args.file:
+        parser.error("give legs or --file")
+
+    from season_store import default_store
+
+    pricer = ComboPricer.from_standings(default_store().frame(args.league, args.season))
+    if args.legs:
+        result = pricer.price([parse_leg(leg) for leg in args.legs], args.overround)
+        print(f"Probabilité : {result['probability']:.4%}  cote juste : {result['fair_odds']:.2f}  cote : {result['odds']:.2f}")
+        return
+
+    import pandas as pd
+
+    legs = pd.read_json(args.file if args.file != "-" else sys.stdin, lines=True) if args.file.endswith((".jsonl", ".json")) \
+        else pd.read_csv(args.file if args.file != "-" else sys.stdin)
+    codes, labels = pd.factorize(legs["combo"])
+    combos, probability, fair_odds, odds, fixtures = pricer.price_legs(
+        codes, legs["home"].astype(str).tolist(), legs["away"].astype(str).tolist(),
+        legs["selection"].astype(str).tolist(), args.overround,
+    )
+    out = pd.DataFrame({
+        "combo": labels[combos], "legs": np.bincount(codes)[combos], "fixtures": fixtures,
+        "probability": probability, "fair_odds": fair_odds, "odds": odds,
+    })
+    out.to_csv(sys.stdout if args.output == "-" else args.output, index=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+import csv
+import os
+
+from instrumentation import span, timed
+from teams import TeamRegistry
+
+# Noyau léger des scripts (odds-fr.py, stats-fr.py, odds-fr-transfert.py) :
+# classements lus avec csv, une TeamRecord à __slots__ par équipe, calculs
+# scalaires. Ni pandas ni NumPy à l'import : pandas n'est chargé que si un
+# DataFrame est demandé (SeasonTable.to_frame). Les fonctions acceptent aussi
+# un DataFrame de saison (algorithms.py les réexporte).
+DATA_DIR = "data"
+TRANSFERS_FILE = os.path.join(DATA_DIR, "transfers.csv")  # transferts lus par transfers.py
+
+# Colonnes numériques d'un classement (ordre des CSV)
+RECORD_COLUMNS = ("Number", "M", "W", "D", "L", "G", "GA", "PTS", "Diff")
+
+# En-têtes rencontrés dans les différentes sources -> nom canonique
+HEADER_ALIASES = {
+    "number": "Number", "pos": "Number", "rank": "Number", "position": "Number",
+    "team": "Team", "m": "M", "w": "W", "d": "D", "l": "L",
+    "g": "G", "ga": "GA", "pts": "PTS", "diff": "Diff",
+}
+
+def read_csv_rows(path):
+    """Lit un CSV de classement (en-têtes normalisés : Number/NUMBER, etc.)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        try:
+            header = next(reader)
+        except StopIteration:
+            raise ValueError(f"File '{path}' is empty or invalid.")
+        header = [HEADER_ALIASES.get(h.strip().lower(), h.strip()) for h in header]
+        return [dict(zip(header, row)) for row in reader if row]
+
+def _number(value):
+    number = float(value or 0)
+    return int(number) if number.is_integer() else number
+
+class TeamRecord:
+    """Ligne de classement d'une équipe (accès record['W'] comme une ligne de DataFrame)."""
+
+    __slots__ = ("Team",) + RECORD_COLUMNS
+
+    def __init__(self, Team, **values):
+        self.Team = Team
+        for name in RECORD_COLUMNS:
+            setattr(self, name, values.get(name))
+        if self.Diff is None and self.G is not None and self.GA is not None:
+            self.Diff = self.G - self.GA
+
+    @classmethod
+    def from_row(cls, row):
+        values = {name: _number(row[name]) for name in RECORD_COLUMNS if name in row}
+        return cls(str(row["Team"]).strip(), **values)
+
+    def __getitem__(self, column):
+        try:
+            return getattr(self, column)
+        except AttributeError:
+            raise KeyError(column)
+
+    def __repr__(self):
+        return f"TeamRecord({self.to_dict()})"
+
+    def keys(self):
+        return [name for name in self.__slots__ if getattr(self, name) is not None]
+
+    def get(self, column, default=None):
+        value = getattr(self, column, None)
+        return default if value is None else value
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.keys()}
+
+    def replace(self, **values):
+        """Copie de la ligne avec certaines colonnes modifiées."""
+        record = TeamRecord(**self.to_dict())
+        for name, value in values.items():
+            setattr(record, name, value)
+        return record
+
+class SeasonTable:
+    """Classement d'une saison : TeamRecord dans l'ordre du fichier et index des noms."""
+
+    __slots__ = ("records", "registry", "path", "_frame", "__weakref__")
+
+    def __init__(self, records, path=None):
+        self.records = list(records)
+        self.registry = TeamRegistry([record.Team for record in self.records])
+        self.path = path
+        self._frame = None
+
+    @classmethod
+    def from_rows(cls, rows, path=None):
+        return cls([TeamRecord.from_row(row) for row in rows], path)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    @property
+    def teams(self):
+        return self.registry.names
+
+    def team(self, team_name):
+        """TeamRecord d'une équipe (noms normalisés et alias) ; ValueError si inconnue."""
+        return self.records[self.registry.id(team_name)]
+
+    def column(self, name):
+        return [record[name] for record in self.records]
+
+    def to_frame(self):
+        """DataFrame pandas du classement (pandas importé à ce moment seulement)."""
+        if self._frame is None:
+            import pandas as pd
+
+            self._frame = pd.DataFrame([record.to_dict() for record in self.records])
+        return self._frame
+
+_tables = {}
+
+def season_file(league, season, data_dir=DATA_DIR):
+    """Chemin du CSV d'une saison : data/<ligue>-<saison>.csv."""
+    return os.path.join(data_dir, f"{league.lower()}-{season}.csv")
+
+def load_season(source):
+    """
+    Classement d'une saison : SeasonTable lue depuis un CSV (relue seulement
+    si le fichier change) ; une SeasonTable ou un DataFrame est retourné tel quel.
+    Les sources JSON passent par season_store (NumPy).
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return source
+    path = os.fspath(source)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File '{path}' not found.")
+    key = os.path.abspath(path)
+    cached = _tables.get(key)
+    if cached is not None and cached[0] == stat.st_mtime_ns:
+        return cached[1]
+
+    with span("load"):
+        if path.lower().endswith(".json"):
+            from season_store import read_json_rows
+
+            rows = read_json_rows(path)
+        else:
+            rows = read_csv_rows(path)
+        table = SeasonTable.from_rows(rows, path)
+    _tables[key] = (stat.st_mtime_ns, table)
+    return table
+
+@timed("team_lookup")
+def get_team_stats(team_name, season_data):
+    """
+    Stats of a team: TeamRecord for a SeasonTable, row (pd.Series) for a DataFrame.
+    Indexed lookup (normalized names and aliases), built once per season.
+    """
+    if isinstance(season_data, SeasonTable):
+        return season_data.team(team_name)
+    return season_data.iloc[TeamRegistry.for_frame(season_data).id(team_name)]
+
+def calculate_team_probabilities(team_stats):
+    """
+    Calcule les probabilités de victoire, de match nul et de défaite pour une équipe.
+    :param team_stats: Statistiques de l'équipe (TeamRecord, dictionnaire ou ligne de DataFrame).
+    :return: Dictionnaire avec les probabilités.
+    """
+    total_matches = team_stats['M']
+    win_prob = team_stats['W'] / total_matches
+    draw_prob = team_stats['D'] / total_matches
+    lose_prob = (total_matches - team_stats['W'] - team_stats['D']) / total_matches
+
+    return {
+        'win_prob': win_prob,
+        'draw_prob': draw_prob,
+        'lose_prob': lose_prob
+    }
+
+def calculate_probabilities(home_stats, away_stats):
+    """
+    Calculate probabilities for home win, away win, and draw.
+
+    Parameters:
+    - home_stats (TeamRecord or pd.Series): Stats for the home team.
+    - away_stats (TeamRecord or pd.Series): Stats for the away team.
+
+    Returns:
+    - tuple: (home_win_prob, draw_prob, away_win_prob)
+    """
+    home_win_prob = home_stats['W'] / home_stats['M']
+    away_win_prob = away_stats['W'] / away_stats['M']
+    draw_prob = (home_stats['D'] + away_stats['D']) / (home_stats['M'] + away_stats['M'])
+
+    return home_win_prob, draw_prob, away_win_prob
+
+def calculate_odds(home_win_prob, draw_prob, away_win_prob):
+    """
+    Calculate odds from probabilities.
+
+    Returns:
+    - dict: A dictionary containing the calculated odds.
+    """
+    total_prob = home_win_prob + draw_prob + away_win_prob
+
+    odds_home = round(1 / (home_win_prob / total_prob), 2) if home_win_prob > 0 else float('inf')
+    odds_draw = round(1 / (draw_prob / total_prob), 2) if draw_prob > 0 else float('inf')
+    odds_away = round(1 / (away_win_prob / total_prob), 2) if away_win_prob > 0 else float('inf')
+
+    return {
+        'home_win_odds': odds_home,
+        'draw_odds': odds_draw,
+        'away_win_odds': odds_away
+    }
+
+def adjust_probs_for_home_away(home_win_prob, draw_prob, away_win_prob, home_advantage=0.1, away_advantage=-0.05):
+    """
+    Adjust the probabilities based on whether a team is playing at home or away.
+
+    Returns:
+    - tuple: Adjusted probabilities (home_win_prob, draw_prob, away_win_prob).
+    """
+    adjusted_home_win_prob = home_win_prob + home_advantage
+    adjusted_away_win_prob = away_win_prob + away_advantage
+
+    return adjusted_home_win_prob, draw_prob, adjusted_away_win_prob
+
+def generate_odds_with_home_away_adjustment(home_team, away_team, season_data, home_advantage=0.1, away_advantage=-0.05, cache=None):
+    """
+    Generate odds for a match between two teams with home and away adjustments.
+
+    Parameters:
+    - home_team (str): Name of the home team.
+    - away_team (str): Name of the away team.
+    - season_data (SeasonTable or pd.DataFrame): The season data.
+    - home_advantage (float): Added to the home win probability (default is 0.1).
+    - away_advantage (float): Added to the away win probability (default is -0.05).
+    - cache (odds_cache.FixtureOddsCache): memoised result when given
+      (e.g. odds_cache.default_odds_cache()).
+    Returns:
+    - dict: A dictionary containing the adjusted odds.
+    """
+    if cache is not None:
+        return cache.home_away_odds(home_team, away_team, season_data, home_advantage, away_advantage)
+    home_stats = get_team_stats(home_team, season_data)
+    away_stats = get_team_stats(away_team, season_data)
+
+    home_win_prob, draw_prob, away_win_prob = calculate_probabilities(home_stats, away_stats)
+    home_win_prob, draw_prob, away_win_prob = adjust_probs_for_home_away(
+        home_win_prob, draw_prob, away_win_prob, home_advantage, away_advantage
+    )
+    return calculate_odds(home_win_prob, draw_prob, away_win_prob)
+
+def promoted_team_rates(team_name, season_data, priors=None):
+    """
+    Prior (statistiques par match, voir priors.PriorStore) d'une équipe
+    promue dans la saison season_data (chemin <ligue>-<saison>.csv ou
+    SeasonTable lue depuis un tel fichier). None si l'équipe n'est pas
+    promue ou si la ligue et la saison ne se déduisent pas du fichier.
+    NumPy n'est importé qu'à ce moment (équipes absentes de la saison précédente).
+    """
+    path = season_data if isinstance(season_data, (str, os.PathLike)) else getattr(season_data, "path", None)
+    if path is None:
+        return None
+    from priors import default_priors
+    from season_store import parse_season_filename
+
+    try:
+        league, season = parse_season_filename(os.fspath(path))
+        return (priors or default_priors()).team_rates(league, season, team_name)
+    except (ValueError, FileNotFoundError):
+        return None
+
+def _season_matches(season_data):
+    """Nombre de matchs habituel d'une saison (le plus grand M du classement)."""
+    if isinstance(season_data, SeasonTable):
+        return max(season_data.column("M"))
+    return season_data["M"].max()
+
+def combined_team_stats(team_name, season_1_data, season_2_data, priors=None):
+    """
+    Lignes (saison précédente, saison en cours) d'une équipe pour les cotes combinées.
+
+    Une équipe promue, absente de season_1_data, prend son prior
+    (promoted_team_rates) : sur un nombre de matchs habituel pour la saison
+    précédente, en PRIOR_MATCHES matchs fictifs ajoutés à la saison en cours,
+    comme le modèle 3 du serveur. ValueError si l'équipe n'a pas de prior.
+    """
+    current = get_team_stats(team_name, season_2_data)
+    try:
+        return get_team_stats(team_name, season_1_data), current
+    except ValueError:
+        rates = promoted_team_rates(current["Team"], season_2_data, priors)
+        if rates is None:
+            raise
+    from priors import PRIOR_MATCHES
+
+    matches = _season_matches(season_1_data)
+    previous = {"Team": current["Team"], "M": matches, "W": rates["win"] * matches, "D": rates["draw"] * matches}
+    current = {
+        "Team": current["Team"],
+        "M": current["M"] + PRIOR_MATCHES,
+        "W": current["W"] + PRIOR_MATCHES * rates["win"],
+        "D": current["D"] + PRIOR_MATCHES * rates["draw"],
+    }
+    return previous, current
+
+def generate_combined_odds_with_home_away_adjustment(home_team, away_team, season_1, season_2, weight_current_season=0.6, home_advantage=0.1, away_advantage=-0.05, priors=None, cache=None):
+    """
+    Generate odds blending two seasons (season_2 being the current one), with home and away adjustments.
+
+    season_1, season_2 : paths to the season files, SeasonTable or DataFrames.
+    Promoted teams missing from season_1 use their prior (see combined_team_stats);
+    priors : priors.PriorStore (default_priors() by default).
+    cache : odds_cache.FixtureOddsCache, memoised result when given (default priors only).
+    """
+    if cache is not None and priors is None:
+        return cache.combined_odds(home_team, away_team, season_1, season_2, weight_current_season, home_advantage, away_advantage)
+    season_1_data = load_season(season_1)
+    season_2_data = load_season(season_2)
+    home_stats_1, home_stats_2 = combined_team_stats(home_team, season_1_data, season_2_data, priors)
+    away_stats_1, away_stats_2 = combined_team_stats(away_team, season_1_data, season_2_data, priors)
+
+    home_win_prob_1, draw_prob_1, away_win_prob_1 = calculate_probabilities(home_stats_1, away_stats_1)
+    home_win_prob_2, draw_prob_2, away_win_prob_2 = calculate_probabilities(home_stats_2, away_stats_2)
+
+    home_win_prob = weight_current_season * home_win_prob_2 + (1 - weight_current_season) * home_win_prob_1
+    draw_prob = weight_current_season * draw_prob_2 + (1 - weight_current_season) * draw_prob_1
+    away_win_prob = weight_current_season * away_win_prob_2 + (1 - weight_current_season) * away_win_prob_1
+
+    home_win_prob, draw_prob, away_win_prob = adjust_probs_for_home_away(
+        home_win_prob, draw_prob, away_win_prob, home_advantage, away_advantage
+    )
+    return calculate_odds(home_win_prob, draw_prob, away_win_prob)
+
+def calc_prob_from_ranking(home, away, classement, bonus_home=1.1, cache=None):
+    """
+    home, away : noms des équipes
+    classement : dict {equipe: points} (ou {equipe: force}, voir EloRatings.as_classement)
+    bonus_home : multiplicateur pour l’avantage domicile
+    cache : odds_cache.FixtureOddsCache, résultat mémoïsé si fourni
+    """
+    if cache is not None:
+        return cache.ranking_odds(home, away, classement, bonus_home)
+    points_home = classement.get(home, 0)
+    points_away = classement.get(away, 0)
+
+    # Bonus domicile
+    score_home = points_home * bonus_home
+    score_away = points_away
+
+    # Éviter division par zéro
+    if score_home + score_away == 0:
+        score_home, score_away = 0.5, 0.5
+
+    # Probabilités brutes (sans nul)
+    p_home = score_home / (score_home + score_away)
+    p_away = score_away / (score_home + score_away)
+
+    # Probabilité du nul (fixe : 25%), home/away réduits pour lui laisser la place
+    p_draw = 0.25
+    p_home *= (1 - p_draw)
+    p_away *= (1 - p_draw)
+
+    return {
+        "prob_home": round(p_home, 3),
+        "prob_draw": round(p_draw, 3),
+        "prob_away": round(p_away, 3),
+        "odds_home": round(1/p_home, 2) if p_home > 0 else None,
+        "odds_draw": round(1/p_draw, 2),
+        "odds_away": round(1/p_away, 2) if p_away > 0 else None
+    }
+
+@timed("odds")
+def compute_odds_from_strengths(strengthA, strengthB, margin=1.05, method="proportional"):
+    """
+    Cotes 1X2 à partir des forces des deux équipes.
+
+    strengthA, strengthB : forces (scalaires ou tableaux NumPy de même forme :
+                           les opérations sont les mêmes, algorithms.py s'en
+                           sert pour la matrice de toutes les rencontres)
+    margin : overround des cotes (somme des 1/cote ; 1.05 = marge de 5 %, 1 = cotes justes)
+    method : répartition de la marge (voir margins.apply_margin)
+    Retourne un dictionnaire : p1, pX, p2, odds1, oddsX, odds2
+    """
+    from margins import apply_margin  # NumPy n'est importé qu'ici
+
+    # Probabilités brutes
+    total_strength = strengthA + strengthB
+    pA = strengthA / total_strength
+    pB = strengthB / total_strength
+    pDraw = 0.15 + 0.1 * (1 - abs(pA - pB))  # nul plus probable si forces proches
+
+    # Normalisation
+    total = pA + pB + pDraw
+    pA = pA / total
+    pB = pB / total
+    pDraw = pDraw / total
+
+    # Conversion en cotes décimales avec la marge bookmaker (margins.py)
+    odds = apply_margin([pA, pDraw, pB], overround=margin, method=method, axis=0)
+    return {
+        "p1": pA,
+        "pX": pDraw,
+        "p2": pB,
+        "odds1": odds[0],
+        "oddsX": odds[1],
+        "odds2": odds[2],
+    }
+
+def generate_odds(teamA_name, teamB_name, season_data, ratings=None, margin=1.05, cache=None):
+    """
+    Génère les cotes 1X2 pour un match entre teamA et teamB.
+
+    teamA_name, teamB_name : noms des équipes (chaînes)
+    season_data : SeasonTable ou DataFrame du classement ('Team', 'PTS', 'Diff')
+    ratings : source de force alternative (par ex. ratings.EloRatings),
+              utilisée à la place de PTS + 0.3 * Diff si fournie
+    margin : overround des cotes (voir compute_odds_from_strengths)
+    cache : odds_cache.FixtureOddsCache, résultat mémoïsé si fourni (sans ratings)
+    """
+    if cache is not None and ratings is None:
+        return cache.strength_odds(teamA_name, teamB_name, season_data, margin)
+    teamA = get_team_stats(teamA_name, season_data)
+    teamB = get_team_stats(teamB_name, season_data)
+
+    # Score de force basé sur les points et la différence de buts (ou sur ratings)
+    if ratings is not None:
+        strengthA, strengthB = ratings.strengths([teamA["Team"], teamB["Team"]])
+    else:
+        strengthA = int(teamA["PTS"]) + int(teamA["Diff"]) * 0.3
+        strengthB = int(teamB["PTS"]) + int(teamB["Diff"]) * 0.3
+
+    odds = compute_odds_from_strengths(strengthA, strengthB, margin)
+    return {
+        "Match": f"{teamA_name} vs {teamB_name}",
+        "1": round(float(odds["odds1"]), 2),
+        "X": round(float(odds["oddsX"]), 2),
+        "2": round(float(odds["odds2"]), 2)
+    }
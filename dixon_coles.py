@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.special import gammaln
+from poisson import match_markets, score_matrices
+from teams import TeamRegistry
+
+RHO_BOUNDS = (-0.3, 0.3)
+
+class DixonColesModel:
+    """
+    Modèle de Maher / Dixon-Coles ajusté.
+
+    Buts attendus : domicile = exp(attack[h] + defence[a] + home),
+                    extérieur = exp(attack[a] + defence[h]).
+    rho corrige les scores faibles (0-0, 1-0, 0-1, 1-1) ; rho = 0 est le modèle de Maher.
+    """
+
+    def __init__(self, teams, attack, defence, home, rho=0.0, loglik=None):
+        self.teams = list(teams)
+        self.registry = TeamRegistry(self.teams)
+        self.attack = np.asarray(attack, dtype=float)
+        self.defence = np.asarray(defence, dtype=float)
+        self.home = float(home)
+        self.rho = float(rho)
+        self.loglik = loglik
+
+    def params(self):
+        """Vecteur des paramètres (ordre de l'optimiseur)."""
+        return np.concatenate([self.attack, self.defence, [self.home, self.rho]])
+
+    def strengths(self):
+        """Forces sous forme de DataFrame (Team, attack, defence en échelle multiplicative)."""
+        return pd.DataFrame({
+            "Team": self.teams,
+            "attack": np.exp(self.attack),
+            "defence": np.exp(self.defence),
+        })
+
+    def expected_goals(self, home_teams, away_teams):
+        home_idx = np.asarray(self.registry.ids(home_teams), dtype=np.intp)
+        away_idx = np.asarray(self.registry.ids(away_teams), dtype=np.intp)
+        exp_home = np.exp(self.attack[home_idx] + self.defence[away_idx] + self.home)
+        exp_away = np.exp(self.attack[away_idx] + self.defence[home_idx])
+        return exp_home, exp_away
+
+    def score_matrices(self, home_teams, away_teams, max_goals=None, tol=1e-10):
+        """Matrices des scores (F, n+1, n+1) avec la correction de Dixon-Coles."""
+        exp_home, exp_away = self.expected_goals(home_teams, away_teams)
+        matrices = score_matrices(exp_home, exp_away, max_goals, tol)
+        if self.rho:
+            rho = self.rho
+            matrices[:, 0, 0] *= 1 - exp_home * exp_away * rho
+            matrices[:, 0, 1] *= 1 + exp_home * rho
+            matrices[:, 1, 0] *= 1 + exp_away * rho
+            matrices[:, 1, 1] *= 1 - rho
+            matrices /= matrices.sum(axis=(1, 2), keepdims=True)
+        return matrices
+
+    def predict(self, home_teams, away_teams, max_goals=None):
+        """Probabilités de tous les marchés (DataFrame, une ligne par rencontre)."""
+        exp_home, exp_away = self.expected_goals(home_teams, away_teams)
+        markets = match_markets(self.score_matrices(home_teams, away_teams, max_goals))
+        return pd.DataFrame({
+            "Home": list(home_teams),
+            "Away": list(away_teams),
+            "exp_home": exp_home,
+            "exp_away": exp_away,
+            **markets,
+        })
+
+def time_decay_weights(dates, xi=0.0019, reference=None):
+    """
+    Poids exp(-xi * jours écoulés) (xi par jour ; 0.0019 ≈ demi-vie d'un an).
+    """
+    dates = pd.to_datetime(pd.Series(dates))
+    reference = dates.max() if reference is None else pd.Timestamp(reference)
+    days = (reference - dates).dt.days.to_numpy(dtype=float)
+    return np.exp(-xi * np.maximum(days, 0))
+
+def _negative_loglik(params, home_idx, away_idx, home_goals, away_goals, weights, n_teams, fit_rho, penalty):
+    attack = params[:n_teams]
+    defence = params[n_teams:2 * n_teams]
+    home, rho = params[2 * n_teams], params[2 * n_teams + 1]
+
+    log_lam = attack[home_idx] + defence[away_idx] + home
+    log_mu = attack[away_idx] + defence[home_idx]
+    lam = np.exp(log_lam)
+    mu = np.exp(log_mu)
+
+    # Log-vraisemblance de Poisson (les termes log(x!) sont constants)
+    loglik = home_goals * log_lam - lam + away_goals * log_mu - mu
+    g_lam = home_goals - lam
+    g_mu = away_goals - mu
+    g_rho = np.zeros_like(lam)
+
+    if fit_rho:
+        # Correction tau de Dixon-Coles sur les scores 0-0, 0-1, 1-0 et 1-1
+        s00 = (home_goals == 0) & (away_goals == 0)
+        s01 = (home_goals == 0) & (away_goals == 1)
+        s10 = (home_goals == 1) & (away_goals == 0)
+        s11 = (home_goals == 1) & (away_goals == 1)
+        tau = np.ones_like(lam)
+        tau[s00] = 1 - lam[s00] * mu[s00] * rho
+        tau[s01] = 1 + lam[s01] * rho
+        tau[s10] = 1 + mu[s10] * rho
+        tau[s11] = 1 - rho
+        tau = np.maximum(tau, 1e-10)
+        loglik = loglik + np.log(tau)
+
+        g_lam[s00] -= lam[s00] * mu[s00] * rho / tau[s00]
+        g_mu[s00] -= lam[s00] * mu[s00] * rho / tau[s00]
+        g_lam[s01] += lam[s01] * rho / tau[s01]
+        g_mu[s10] += mu[s10] * rho / tau[s10]
+        g_rho[s00] = -lam[s00] * mu[s00] / tau[s00]
+        g_rho[s01] = lam[s01] / tau[s01]
+        g_rho[s10] = mu[s10] / tau[s10]
+        g_rho[s11] = -1 / tau[s11]
+
+    g_lam *= weights
+    g_mu *= weights
+
+    grad = np.empty_like(params)
+    grad[:n_teams] = np.bincount(home_idx, g_lam, n_teams) + np.bincount(away_idx, g_mu, n_teams)
+    grad[n_teams:2 * n_teams] = np.bincount(away_idx, g_lam, n_teams) + np.bincount(home_idx, g_mu, n_teams)
+    grad[2 * n_teams] = g_lam.sum()
+    grad[2 * n_teams + 1] = (weights * g_rho).sum()
+
+    # Contrainte d'identifiabilité : somme des attaques nulle (pénalité quadratique)
+    attack_sum = attack.sum()
+    value = (weights * loglik).sum() - penalty * attack_sum ** 2
+    grad[:n_teams] -= 2 * penalty * attack_sum
+    return -value, -grad
+
+def _initial_params(teams, init, n_teams):
+    params = np.zeros(2 * n_teams + 2)
+    params[2 * n_teams] = 0.25
+    if init is not None:
+        # Démarrage à chaud depuis l'ajustement précédent (équipes nouvelles à 0)
+        for i, team in enumerate(teams):
+            j = init.registry.get(team)
+            if j is not None:
+                params[i] = init.attack[j]
+                params[n_teams + i] = init.defence[j]
+        params[2 * n_teams] = init.home
+        params[2 * n_teams + 1] = init.rho
+    return params
+
+def fit_dixon_coles(results, xi=0.0019, dixon_coles=True, init=None, reference_date=None, penalty=100.0):
+    """
+    Ajuste le modèle par maximum de vraisemblance sur des résultats de matchs.
+
+    results : DataFrame avec 'home', 'away', 'home_goals', 'away_goals' et 'date'
+              (voir results.load_results)
+    xi : taux de décroissance temporelle par jour (0 = tous les matchs au même poids)
+    dixon_coles : False pour le modèle de Maher (rho = 0)
+    init : DixonColesModel précédent pour un démarrage à chaud (nouvelle journée)
+    Retourne un DixonColesModel.
+    """
+    teams = sorted(set(results["home"]) | set(results["away"]))
+    registry = TeamRegistry(teams)
+    n_teams = len(teams)
+    home_idx = np.asarray(registry.ids(results["home"]), dtype=np.intp)
+    away_idx = np.asarray(registry.ids(results["away"]), dtype=np.intp)
+    home_goals = results["home_goals"].to_numpy(dtype=float)
+    away_goals = results["away_goals"].to_numpy(dtype=float)
+    if xi and "date" in results:
+        weights = time_decay_weights(results["date"], xi, reference_date)
+    else:
+        weights = np.ones(len(results))
+
+    bounds = [(None, None)] * (2 * n_teams + 1) + [RHO_BOUNDS if dixon_coles else (0.0, 0.0)]
+    solution = minimize(
+        _negative_loglik,
+        _initial_params(teams, init, n_teams),
+        args=(home_idx, away_idx, home_goals, away_goals, weights, n_teams, dixon_coles, penalty),
+        jac=True,
+        method="L-BFGS-B",
+        bounds=bounds,
+    )
+    params = solution.x
+    loglik = -solution.fun - (weights * (gammaln(home_goals + 1) + gammaln(away_goals + 1))).sum()
+    return DixonColesModel(
+        teams, params[:n_teams], params[n_teams:2 * n_teams],
+        params[2 * n_teams], params[2 * n_teams + 1], loglik,
+    )
+
+def _pooled_term(goals, exposure, u, v):
+    """
+    Terme de pseudo-vraisemblance agrégée : goals[i] ~ Poisson(rate[i]) avec
+    rate[i] = exposure[i] * exp(u[i]) * moyenne_{j != i} exp(v[j]).
+    Retourne (log-vraisemblance, gradient en u, gradient en v).
+    """
+    n = len(u)
+    ev = np.exp(v)
+    others = ev.sum() - ev
+    rate = exposure * np.exp(u) * others / (n - 1)
+    loglik = (goals * np.log(np.maximum(rate, 1e-300)) - rate).sum()
+    residual = goals - rate
+    t = residual / others
+    return loglik, residual, ev * (t.sum() - t)
+
+def _negative_pooled_loglik(params, n_teams, stats, penalty):
+    attack = params[:n_teams]
+    defence = params[n_teams:2 * n_teams]
+    home = params[2 * n_teams]
+    grad = np.zeros_like(params)
+    value = 0.0
+
+    # Buts marqués / encaissés à domicile et à l'extérieur, adversaires supposés
+    # répartis uniformément dans la ligue
+    for goals, exposure, u, v, u_slice, v_slice, home_in_u in (
+        (stats["home_G"], stats["home_M"], attack + home, defence, slice(0, n_teams), slice(n_teams, 2 * n_teams), True),
+        (stats["home_GA"], stats["home_M"], defence, attack, slice(n_teams, 2 * n_teams), slice(0, n_teams), False),
+        (stats["away_G"], stats["away_M"], attack, defence, slice(0, n_teams), slice(n_teams, 2 * n_teams), False),
+        (stats["away_GA"], stats["away_M"], defence + home, attack, slice(n_teams, 2 * n_teams), slice(0, n_teams), True),
+    ):
+        loglik, grad_u, grad_v = _pooled_term(goals, exposure, u, v)
+        value += loglik
+        grad[u_slice] += grad_u
+        grad[v_slice] += grad_v
+        if home_in_u:
+            grad[2 * n_teams] += grad_u.sum()
+
+    attack_sum = attack.sum()
+    value -= penalty * attack_sum ** 2
+    grad[:n_teams] -= 2 * penalty * attack_sum
+    return -value, -grad
+
+def fit_from_standings(data, init=None, penalty=100.0):
+    """
+    Ajuste un modèle de Maher sur un classement avec répartition domicile /
+    extérieur (colonnes home_M, home_G, home_GA, away_M, away_G, away_GA,
+    fournies par le cache API-Football via season_store).
+
+    Sans le détail des matchs, les adversaires sont supposés uniformément
+    répartis : c'est une pseudo-vraisemblance, sans correction rho.
+    """
+    teams = data["Team"].tolist()
+    n_teams = len(teams)
+    stats = {c: data[c].to_numpy(dtype=float) for c in ("home_M", "home_G", "home_GA", "away_M", "away_G", "away_GA")}
+    params = _initial_params(teams, init, n_teams)[:2 * n_teams + 1]
+    solution = minimize(
+        _negative_pooled_loglik, params, args=(n_teams, stats, penalty), jac=True, method="L-BFGS-B",
+    )
+    params = solution.x
+    return DixonColesModel(teams, params[:n_teams], params[n_teams:2 * n_teams], params[2 * n_teams], 0.0, -solution.fun)
@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import csv
+import heapq
+import inspect
+import json
+import sys
+import time
+
+import numpy as np
+from poisson import DEFAULT_LINES, compute_team_strengths, expected_goals, poisson_pmf, team_indices
+
+MATCH_MINUTES = 95  # 90 minutes + temps additionnel moyen : les buts attendus couvrent toute la durée
+RED_CARD_OWN = 0.67  # buts attendus restants de l'équipe réduite à 10
+RED_CARD_OPPONENT = 1.25  # ... et de son adversaire
+
+# Tables partagées par tous les matchs, indexées par les buts attendus
+# restants (taux par minute x minutes restantes), arrondis à MU_STEP
+MU_STEP = 0.002
+MU_MAX = 10.0
+MAX_GOALS = 30
+MU_LIMIT = int(MU_MAX / MU_STEP)
+SCORE_PAD = 20  # écart de score au-delà duquel l'issue est certaine
+INF = float("inf")
+
+_TABLES = None
+
+def _tables():
+    """
+    Lois de Poisson précalculées : pmf et fonction de répartition pour
+    chaque valeur de la grille des buts attendus, avec des marges (pmf à 0,
+    répartition à 0 à gauche et 1 à droite) pour lire directement une
+    fenêtre décalée de l'écart au score.
+    """
+    global _TABLES
+    if _TABLES is None:
+        mu = np.arange(0.0, MU_MAX + MU_STEP / 2, MU_STEP)
+        pmf = poisson_pmf(mu, MAX_GOALS)
+        pmf /= pmf.sum(axis=1, keepdims=True)
+        cdf = np.cumsum(pmf, axis=1)
+        width = 2 * SCORE_PAD + 2 * (MAX_GOALS + 1)
+        pmf_pad = np.zeros((len(mu), width))
+        cdf_pad = np.ones((len(mu), width))
+        cdf_pad[:, :SCORE_PAD] = 0.0
+        pmf_pad[:, SCORE_PAD:SCORE_PAD + MAX_GOALS + 1] = pmf
+        cdf_pad[:, SCORE_PAD:SCORE_PAD + MAX_GOALS + 1] = cdf
+        _TABLES = (pmf, pmf_pad, cdf_pad)
+    return _TABLES
+
+
+class MatchState:
+    """État d'un match en cours (score, minute, taux de buts par minute)."""
+
+    __slots__ = ("match_id", "home", "away", "minute", "home_goals", "away_goals",
+                 "home_rate", "away_rate", "red_home", "red_away", "finished")
+
+    def __init__(self, match_id, home, away, exp_home, exp_away, minute=0):
+        self.match_id = match_id
+        self.home = home
+        self.away = away
+        self.minute = minute
+        self.home_goals = 0
+        self.away_goals = 0
+        self.home_rate = exp_home / MATCH_MINUTES
+        self.away_rate = exp_away / MATCH_MINUTES
+        self.red_home = 0
+        self.red_away = 0
+        self.finished = False
+
+    def remaining(self):
+        if self.finished:
+            return 0
+        # Tant que le coup de sifflet final n'est pas donné, il reste au moins une minute
+        return max(MATCH_MINUTES - self.minute, 1)
+
+class InPlayEngine:
+    """
+    Cotes en direct de nombreux matchs simultanés.
+
+    Les buts restants de chaque équipe suivent une loi de Poisson de
+    paramètre taux x minutes restantes ; un but ne change que le score, un
+    carton rouge change les taux. Chaque mise à jour lit deux lignes des
+    tables partagées (_tables) et fait deux produits scalaires.
+    """
+
+    def __init__(self, strengths=None, lines=DEFAULT_LINES, margin=1.0):
+        self.strengths = strengths
+        self.lines = tuple(lines)
+        self._line_keys = [(int(line), f"under_{line}", f"over_{line}") for line in self.lines]
+        self.margin = margin
+        self.matches = {}
+        self.events = 0
+        _tables()
+
+    @classmethod
+    def from_standings(cls, data, **options):
+        """Buts attendus d'avant-match tirés d'un classement (poisson.compute_team_strengths)."""
+        return cls(compute_team_strengths(data), **options)
+
+    def kickoff(self, match_id, home, away, exp_home=None, exp_away=None, minute=0):
+        if exp_home is None or exp_away is None:
+            if self.strengths is None:
+                raise ValueError(f"No expected goals for match '{match_id}'.")
+            idx = team_indices([home, away], self.strengths)
+            exp_h, exp_a = expected_goals(idx[:1], idx[1:], self.strengths)
+            exp_home = float(exp_h[0]) if exp_home is None else exp_home
+            exp_away = float(exp_a[0]) if exp_away is None else exp_away
+        state = MatchState(match_id, home, away, float(exp_home), float(exp_away), minute)
+        self.matches[match_id] = state
+        return state
+
+    def handle(self, event):
+        """
+        Applique un événement et retourne les cotes mises à jour du match
+        (None pour un match inconnu).
+
+        event : dictionnaire 'match', 'minute', 'type' (kickoff, goal,
+        red_card, tick, end), 'team' (home / away) pour un but ou un carton,
+        'home', 'away' et éventuellement 'exp_home', 'exp_away' au coup d'envoi.
+        """
+        self.events += 1
+        kind = event["type"]
+        match_id = event["match"]
+        if kind == "kickoff":
+            state = self.kickoff(
+                match_id, event.get("home"), event.get("away"),
+                event.get("exp_home"), event.get("exp_away"), int(event.get("minute") or 0),
+            )
+            return self.price(state)
+
+        state = self.matches.get(match_id)
+        if state is None:
+            return None
+        minute = event.get("minute")
+        if minute is not None and minute != "":
+            state.minute = max(state.minute, int(minute))
+
+        if kind == "goal":
+            if event["team"] == "home":
+                state.home_goals += 1
+            else:
+                state.away_goals += 1
+        elif kind == "red_card":
+            if event["team"] == "home":
+                state.red_home += 1
+                state.home_rate *= RED_CARD_OWN
+                state.away_rate *= RED_CARD_OPPONENT
+            else:
+                state.red_away += 1
+                state.away_rate *= RED_CARD_OWN
+                state.home_rate *= RED_CARD_OPPONENT
+        elif kind == "end":
+            state.finished = True
+            update = self.price(state)
+            del self.matches[match_id]
+            return update
+        return self.price(state)
+
+    def price(self, state):
+        """Probabilités et cotes 1X2 / plus-moins du match dans son état actuel."""
+        pmf, pmf_pad, cdf_pad = _TABLES
+        remaining = state.remaining()
+        mu_home = min(int(state.home_rate * remaining / MU_STEP + 0.5), MU_LIMIT)
+        mu_away = min(int(state.away_rate * remaining / MU_STEP + 0.5), MU_LIMIT)
+        away_pmf = pmf[mu_away]
+
+        # Le score final est une victoire à domicile si buts restants
+        # domicile - extérieur > retard actuel (t) : somme sur les buts j de l'extérieur
+        t = min(max(state.away_goals - state.home_goals, -SCORE_PAD), SCORE_PAD)
+        start = SCORE_PAD + t
+        stop = start + MAX_GOALS + 1
+        p_home_not_above = float(away_pmf.dot(cdf_pad[mu_home, start:stop]))
+        p_draw = float(away_pmf.dot(pmf_pad[mu_home, start:stop]))
+        p1 = 1.0 - p_home_not_above
+        p2 = max(p_home_not_above - p_draw, 0.0)
+        margin = self.margin
+
+        update = {
+            "match": state.match_id,
+            "minute": state.minute,
+            "home": state.home,
+            "away": state.away,
+            "score": [state.home_goals, state.away_goals],
+            "p1": p1,
+            "pX": p_draw,
+            "p2": p2,
+            "1": margin / p1 if p1 > 1e-12 else INF,
+            "X": margin / p_draw if p_draw > 1e-12 else INF,
+            "2": margin / p2 if p2 > 1e-12 else INF,
+        }
+        # Plus / moins : buts restants ~ Poisson(mu domicile + mu extérieur)
+        total_row = cdf_pad[min(mu_home + mu_away, MU_LIMIT)]
+        offset = SCORE_PAD - state.home_goals - state.away_goals
+        for goals, under_key, over_key in self._line_keys:
+            index = goals + offset
+            under = float(total_row[index]) if index >= 0 else 0.0
+            update[under_key] = under
+            update[over_key] = 1.0 - under
+        return update
+
+    def tick(self, minute):
+        """
+        Passe tous les matchs en cours à la minute donnée et retourne leurs
+        probabilités 1X2 en une seule passe vectorisée (dictionnaire de
+        tableaux : match, p1, pX, p2).
+        """
+        states = [s for s in self.matches.values() if not s.finished]
+        pmf, pmf_pad, cdf_pad = _tables()
+        if not states:
+            return {"match": [], "p1": np.array([]), "pX": np.array([]), "p2": np.array([])}
+        for state in states:
+            state.minute = max(state.minute, minute)
+        remaining = np.array([s.remaining() for s in states], dtype=float)
+        home_rate = np.array([s.home_rate for s in states])
+        away_rate = np.array([s.away_rate for s in states])
+        mu_home = np.minimum(np.rint(home_rate * remaining / MU_STEP).astype(np.intp), MU_LIMIT)
+        mu_away = np.minimum(np.rint(away_rate * remaining / MU_STEP).astype(np.intp), MU_LIMIT)
+        t = np.clip([s.away_goals - s.home_goals for s in states], -SCORE_PAD, SCORE_PAD)
+
+        columns = SCORE_PAD + t[:, None] + np.arange(MAX_GOALS + 1)[None, :]
+        away_pmf = pmf[mu_away]
+        not_above = (away_pmf * cdf_pad[mu_home[:, None], columns]).sum(axis=1)
+        p_draw = (away_pmf * pmf_pad[mu_home[:, None], columns]).sum(axis=1)
+        return {
+            "match": [s.match_id for s in states],
+            "p1": 1.0 - not_above,
+            "pX": p_draw,
+            "p2": np.maximum(not_above - p_draw, 0.0),
+        }
+
+    async def run(self, events, emit=None):
+        """
+        Consomme un flux asynchrone d'événements (par ex. replay) et transmet
+        chaque mise à jour à emit (fonction ou coroutine). Retourne le nombre
+        d'événements traités.
+        """
+        count = 0
+        is_coroutine = inspect.iscoroutinefunction(emit)
+        async for event in events:
+            update = self.handle(event)
+            count += 1
+            if update is not None and emit is not None:
+                if is_coroutine:
+                    await emit(update)
+                else:
+                    emit(update)
+        return count
+
+def read_events(path):
+    """
+    Lit un fichier d'événements enregistrés (JSONL, ou CSV avec les colonnes
+    match, minute, type, team, home, away, exp_home, exp_away), trié par minute.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                event = {k: v for k, v in row.items() if v not in (None, "")}
+                event["minute"] = int(event.get("minute", 0))
+                for key in ("exp_home", "exp_away"):
+                    if key in event:
+                        event[key] = float(event[key])
+                yield event
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+async def replay(paths, speed=0.0, batch=1000):
+    """
+    Rejoue des fichiers d'événements fusionnés par minute.
+
+    speed : minutes de match par seconde réelle (0 = le plus vite possible ;
+            on rend alors la main à la boucle toutes les batch lignes).
+    """
+    events = heapq.merge(*(read_events(path) for path in paths), key=lambda e: int(e.get("minute", 0)))
+    last_minute = None
+    for count, event in enumerate(events, 1):
+        minute = int(event.get("minute", 0))
+        if speed and last_minute is not None and minute > last_minute:
+            await asyncio.sleep((minute - last_minute) / speed)
+        elif not speed and count % batch == 0:
+            await asyncio.sleep(0)
+        last_minute = minute
+        yield event
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cotes en direct à partir de fichiers d'événements rejoués.")
+    parser.add_argument("events", nargs="+", help="Fichiers d'événements (JSONL ou CSV)")
+    parser.add_argument("--speed", type=float, default=0.0, help="Minutes de match par seconde (0 = sans attente)")
+    parser.add_argument("--league", default="ligue1")
+    parser.add_argument("--season", default="2024-2025", help="Saison des forces d'avant-match (si exp_home/exp_away absents)")
+    parser.add_argument("--quiet", action="store_true", help="N'affiche que le résumé")
+    args = parser.parse_args(argv)
+
+    from season_store import default_store
+
+    engine = InPlayEngine.from_standings(default_store().frame(args.league, args.season))
+
+    def emit(update):
+        if not args.quiet:
+            print(json.dumps(update, ensure_ascii=False))
+
+    start = time.perf_counter()
+    count = asyncio.run(engine.run(replay(args.events, args.speed), emit))
+    elapsed = time.perf_counter() - start
+    print(f"{count} événements en {elapsed:.3f} s ({elapsed / max(count, 1) * 1e6:.1f} µs/événement)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import atexit
+import bisect
+import json
+import math
+import os
+import sys
+import time
+from functools import wraps
+
+# Mode choisi par variable d'environnement : off (défaut), histogram,
+# prometheus ou json (les deux derniers écrivent un rapport à la sortie du
+# programme, dans SOCCER_METRICS_FILE ou sur la sortie d'erreur)
+METRICS_ENV = "SOCCER_METRICS"
+METRICS_FILE_ENV = "SOCCER_METRICS_FILE"
+MODES = ("off", "histogram", "prometheus", "json")
+
+# Bornes des histogrammes de durée (secondes, comme Prometheus)
+BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class NoopRecorder:
+    """Instrumentation désactivée : span et count ne font rien."""
+
+    enabled = False
+
+    def span(self, name):
+        return _NOOP_SPAN
+
+    def count(self, name, value=1):
+        pass
+
+    def snapshot(self):
+        return {"spans": {}, "counters": {}}
+
+    def reset(self):
+        pass
+
+class Histogram:
+    """Durées d'une étape : nombre, somme, min, max et effectifs par borne de BUCKETS."""
+
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Quantile approché (borne supérieure de l'intervalle qui le contient)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], self.counts)),
+        }
+
+class _Span:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+class HistogramRecorder:
+    """Histogrammes de durée par étape et compteurs, en mémoire du processus."""
+
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+
+    def span(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return _Span(histogram)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        return {
+            "spans": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def reset(self):
+        self.histograms.clear()
+        self.counters.clear()
+
+_recorder = NoopRecorder()
+
+def recorder():
+    return _recorder
+
+def span(name):
+    """
+    Mesure la durée d'une étape : with span("load"): ...
+
+    Étapes instrumentées : load, load.parse, team_lookup, strength, odds,
+    odds.poisson, odds.margin, models.build, cache.read, cache.write.
+    """
+    return _recorder.span(name)
+
+def count(name, value=1):
+    """Incrémente un compteur (cache.hit, cache.miss, rows.loaded, fixtures.priced...)."""
+    _recorder.count(name, value)
+
+def timed(name):
+    """Décorateur : chaque appel de la fonction est une étape name."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _recorder.enabled:
+                return fn(*args, **kwargs)
+            with _recorder.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def snapshot():
+    return _recorder.snapshot()
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+def prometheus_text(data=None):
+    """Mesures au format texte de Prometheus (histogrammes cumulés, compteurs)."""
+    data = data if data is not None else snapshot()
+    lines = []
+    if data["spans"]:
+        lines.append("# HELP soccer_span_seconds Durée des étapes instrumentées.")
+        lines.append("# TYPE soccer_span_seconds histogram")
+        for name, h in data["spans"].items():
+            cumulative = 0
+            for bound, n in h["buckets"].items():
+                cumulative += n
+                lines.append(f'soccer_span_seconds_bucket{{span="{_label(name)}",le="{bound}"}} {cumulative}')
+            lines.append(f'soccer_span_seconds_sum{{span="{_label(name)}"}} {h["sum"]:.9f}')
+            lines.append(f'soccer_span_seconds_count{{span="{_label(name)}"}} {h["count"]}')
+    if data["counters"]:
+        lines.append("# HELP soccer_events_total Compteurs (succès de cache, lignes traitées...).")
+        lines.append("# TYPE soccer_events_total counter")
+        for name, value in data["counters"].items():
+            lines.append(f'soccer_events_total{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+def json_text(data=None):
+    return json.dumps(data if data is not None else snapshot(), indent=2)
+
+def dump(path=None, fmt="prometheus"):
+    """Écrit les mesures (prometheus ou json) dans path, ou sur la sortie d'erreur."""
+    text = prometheus_text() if fmt == "prometheus" else json_text()
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stderr.write(text)
+
+def configure(mode=None, path=None):
+    """
+    Choisit l'enregistreur : mode parmi MODES (par défaut la variable
+    SOCCER_METRICS, 'off' si absente). prometheus et json enregistrent comme
+    histogram et écrivent le rapport à la sortie du programme.
+    """
+    global _recorder, _exit_dump
+    mode = (mode or os.environ.get(METRICS_ENV) or "off").lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown metrics mode '{mode}'.")
+    _recorder = NoopRecorder() if mode == "off" else HistogramRecorder()
+    _exit_dump = (path or os.environ.get(METRICS_FILE_ENV), mode) if mode in ("prometheus", "json") else None
+    return _recorder
+
+_exit_dump = None
+
+@atexit.register
+def _dump_at_exit():
+    if _exit_dump is not None:
+        dump(*_exit_dump)
+
+configure()
@@ -0,0 +1,129 @@
+import numpy as np
+from instrumentation import timed
+
+# Méthodes de répartition de la marge entre les issues d'un marché
+METHODS = ("proportional", "shin", "power", "odds_ratio")
+
+LOG_BOUND = 30.0  # paramètres power / odds_ratio cherchés dans [e^-30, e^30]
+SHIN_MAX = 1 - 1e-9
+
+def _markets(values, axis):
+    """
+    Tableau (marchés, issues), forme des marchés et fonction qui remet un
+    résultat dans la forme d'origine.
+    """
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    shape = values.shape
+
+    def restore(result):
+        return np.moveaxis(result.reshape(shape), -1, axis)
+
+    return values.reshape(-1, shape[-1]), shape[:-1], restore
+
+def _bisect(f, lo, hi, target, increasing=True, tol=1e-12, max_iter=200):
+    """
+    Résout f(x) = target pour tous les marchés à la fois par dichotomie
+    (f monotone, un paramètre par marché). lo, hi : bornes (tableaux ou
+    scalaires) ; retourne le milieu de l'intervalle final.
+    """
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), target.shape).copy()
+    hi = np.broadcast_to(np.asarray(hi, dtype=float), target.shape).copy()
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        value = f(mid)
+        up = value < target if increasing else value > target
+        lo = np.where(up, mid, lo)
+        hi = np.where(up, hi, mid)
+        if not np.nanmax(hi - lo, initial=0.0) > tol:
+            break
+    return 0.5 * (lo + hi)
+
+def _shin_forward(p, z):
+    """Probabilités implicites de Shin (somme = overround) et leur racine S."""
+    s = np.sqrt(z[:, None] * p + (1 - z[:, None]) * p * p)
+    total = s.sum(axis=1)
+    return s * total[:, None], total
+
+def _shin_inverse(q, booksum, z):
+    z = z[:, None]
+    return (np.sqrt(z * z + 4 * (1 - z) * q * q / booksum[:, None]) - z) / (2 * (1 - z))
+
+def overround(odds, axis=-1):
+    """Somme des probabilités implicites 1/cote d'un marché (1.05 = marge de 5 %)."""
+    with np.errstate(divide="ignore"):
+        return (1 / np.asarray(odds, dtype=float)).sum(axis=axis)
+
+@timed("odds.margin")
+def apply_margin(probs, overround=1.05, method="proportional", axis=-1):
+    """
+    Cotes bookmaker de probabilités 1X2 (ou de tout marché à issues
+    exclusives) avec un overround cible.
+
+    probs : tableau de probabilités, issues sur l'axe axis (renormalisées)
+    overround : somme visée des 1/cote (scalaire ou un par marché ; 1 = cotes justes)
+    method : 'proportional' (marge répartie au prorata), 'shin' (marge plus
+             forte sur les outsiders, modèle de Shin), 'power' (q = p^k) ou
+             'odds_ratio' (cote-ratio q/(1-q) = c p/(1-p))
+    Retourne les cotes décimales (inf pour une probabilité nulle, NaN si
+    l'overround n'est pas atteignable avec la méthode).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown margin method '{method}'.")
+    p, markets, restore = _markets(probs, axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = p / p.sum(axis=1, keepdims=True)
+    target = np.broadcast_to(np.asarray(overround, dtype=float), markets).reshape(-1)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if method == "proportional":
+            q = p * target[:, None]
+        elif method == "power":
+            # sum(p^k) décroît avec k : k < 1 pour une marge, k > 1 pour une sous-marge
+            x = _bisect(lambda x: np.power(p, np.exp(x)[:, None]).sum(axis=1), -LOG_BOUND, LOG_BOUND, target, increasing=False)
+            q = np.power(p, np.exp(x)[:, None])
+        elif method == "odds_ratio":
+            def implied(x):
+                c = np.exp(x)[:, None]
+                return c * p / (1 - p + c * p)
+            x = _bisect(lambda x: implied(x).sum(axis=1), -LOG_BOUND, LOG_BOUND, target)
+            q = implied(x)
+        else:
+            # S(z) = somme des sqrt(z p + (1 - z) p²) croît de 1 (z = 0) à somme des sqrt(p)
+            z = _bisect(lambda z: _shin_forward(p, z)[1], 0.0, SHIN_MAX, np.sqrt(target))
+            q, _ = _shin_forward(p, z)
+            feasible = (target >= 1) & (np.sqrt(p).sum(axis=1) ** 2 >= target)
+            q[~feasible] = np.nan
+        odds = np.where(q > 0, 1 / q, np.where(np.isnan(q), np.nan, np.inf))
+    return restore(odds)
+
+@timed("odds.margin")
+def remove_margin(odds, method="proportional", axis=-1):
+    """
+    Probabilités implicites sans marge de cotes de marché (inverse de
+    apply_margin avec la même méthode). Une cote infinie compte pour une
+    probabilité nulle ; les probabilités de chaque marché somment à 1.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown margin method '{method}'.")
+    q, _, restore = _markets(odds, axis)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        q = 1 / q
+        booksum = q.sum(axis=1)
+        ones = np.ones(len(q))
+        if method == "proportional":
+            p = q
+        elif method == "power":
+            x = _bisect(lambda x: np.power(q, np.exp(x)[:, None]).sum(axis=1), -LOG_BOUND, LOG_BOUND, ones, increasing=False)
+            p = np.power(q, np.exp(x)[:, None])
+        elif method == "odds_ratio":
+            def fair(x):
+                c = np.exp(x)[:, None]
+                return q / (c * (1 - q) + q)
+            x = _bisect(lambda x: fair(x).sum(axis=1), -LOG_BOUND, LOG_BOUND, ones, increasing=False)
+            p = fair(x)
+        else:
+            z = _bisect(lambda z: _shin_inverse(q, booksum, z).sum(axis=1), 0.0, SHIN_MAX, ones, increasing=False)
+            p = _shin_inverse(q, booksum, z)
+            p[booksum < 1] = np.nan  # Shin suppose une marge positive
+        p = p / p.sum(axis=1, keepdims=True)
+    return restore(p)
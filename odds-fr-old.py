@@ -1,14 +1,12 @@
-import pandas as pd
+from season_store import default_store
+from teams import TeamRegistry
 
 def get_team_stats(team_name, season_data):
-    # Normalize team names and handle missing data
-    team_stats = season_data[season_data['Team'].str.strip().str.lower() == team_name.strip().lower()]
-    if team_stats.empty:
-        raise ValueError(f"Team '{team_name}' not found in the dataset.")
-    return team_stats.iloc[0]
+    # Indexed lookup (normalized names and aliases), built once per season
+    return season_data.iloc[TeamRegistry.for_frame(season_data).id(team_name)]
 
 def generate_odds(home_team, away_team):
-    season_2023_2024_data = pd.read_csv('data/france/ligue1-2023-2024.csv')
+    season_2023_2024_data = default_store().frame("ligue1", "2023-2024")
 
     home_stats = get_team_stats(home_team, season_2023_2024_data)
     away_stats = get_team_stats(away_team, season_2023_2024_data)
@@ -31,7 +29,7 @@ def generate_odds(home_team, away_team):
 
 def generate_current_season_odds(home_team, away_team):
     # Filter data for the current season
-    current_season_data = pd.read_csv('data/france/ligue1-2024-2025.csv')
+    current_season_data = default_store().frame("ligue1", "2024-2025")
 
     home_stats = get_team_stats(home_team, current_season_data)
     away_stats = get_team_stats(away_team, current_season_data)
@@ -62,9 +60,9 @@ This method provides a more balanced prediction by considering both historical a
 '''
 
 def generate_combined_odds(home_team, away_team, weight_current_season=0.6):
-    # Load data for the 2023-2024 season and the current season from separate CSV files
-    season_2023_2024_data = pd.read_csv('data/france/ligue1-2023-2024.csv')
-    current_season_data = pd.read_csv('data/france/ligue1-2024-2025.csv')
+    # Load data for the 2023-2024 season and the current season from the season store
+    season_2023_2024_data = default_store().frame("ligue1", "2023-2024")
+    current_season_data = default_store().frame("ligue1", "2024-2025")
 
     # Get stats for both seasons
     home_stats_2023_2024 = get_team_stats(home_team, season_2023_2024_data)
@@ -1,14 +1,16 @@
-import pandas as pd
-from algorithms import get_season_data, generate_odds_with_home_away_adjustment, generate_combined_odds_with_home_away_adjustment
+from core import load_season, generate_odds_with_home_away_adjustment, generate_combined_odds_with_home_away_adjustment
+from odds_cache import default_odds_cache
 
 def main():
-    file_1_path = "data/france/ligue1-2023-2024.csv"
-    file_2_path = "data/france/ligue1-2024-2025.csv"
+    file_1_path = "data/ligue1-2023-2024.csv"
+    file_2_path = "data/ligue1-2024-2025.csv"
     # Load the historical season data
     # season_file_1 = "historical_season_2023_2024.csv"
     # season_file_2 = "current_season_2024_2025.csv"
-    season_data_1 = get_season_data(file_1_path)
-    season_data_2 = get_season_data(file_2_path)  
+    season_data_1 = load_season(file_1_path)
+    season_data_2 = load_season(file_2_path)
+    # Cotes mémoïsées, partagées entre les exécutions si SOCCER_ODDS_CACHE donne une base sqlite
+    cache = default_odds_cache()
 
     print("Welcome to the Soccer Match Prediction System!")
     print("Choose the prediction algorithm:")
@@ -26,13 +28,13 @@ def main():
     try:
         if choice == "1":
             # Use historical season algorithm
-            odds = generate_odds_with_home_away_adjustment(home_team, away_team, season_data_1)
+            odds = generate_odds_with_home_away_adjustment(home_team, away_team, season_data_1, cache=cache)
         elif choice == "2":
             # Use current season algorithm
-            odds = generate_odds_with_home_away_adjustment(home_team, away_team, season_data_2)
+            odds = generate_odds_with_home_away_adjustment(home_team, away_team, season_data_2, cache=cache)
         elif choice == "3":
             # Use combined algorithm
-            odds = generate_combined_odds_with_home_away_adjustment(home_team, away_team, season_data_1, season_data_2)
+            odds = generate_combined_odds_with_home_away_adjustment(home_team, away_team, season_data_1, season_data_2, cache=cache)
         else:
             print("Invalid choice. Please enter 1, 2, or 3.")
             return
@@ -0,0 +1,380 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+
+from cache import SizedLRUCache
+from core import (
+    RECORD_COLUMNS, SeasonTable, calc_prob_from_ranking, generate_combined_odds_with_home_away_adjustment, generate_odds,
+    generate_odds_with_home_away_adjustment, load_season, promoted_team_rates,
+)
+from instrumentation import count
+from teams import TeamRegistry
+
+# Cache des cotes par rencontre : une entrée par (source, modèle, paramètres,
+# domicile, extérieur, empreinte des lignes du classement utilisées). Les
+# modèles à deux lignes (home_away, strength, ranking) ne dépendent que des
+# lignes des deux équipes ; poisson dépend de tout le classement (moyenne de
+# buts de la ligue). Une nouvelle version du classement d'une source n'efface
+# que les entrées des équipes dont la ligne a changé (et celles de poisson).
+ODDS_CACHE_ENV = "SOCCER_ODDS_CACHE"  # chemin de la base sqlite partagée entre processus
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Portée des modèles : lignes des deux équipes ("teams") ou classement entier ("table")
+SCOPES = {"home_away": "teams", "combined": "teams", "strength": "teams", "ranking": "teams", "poisson": "table"}
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+class StandingsDigest:
+    """Empreintes d'un classement : une par ligne d'équipe et une pour le tableau entier."""
+
+    __slots__ = ("registry", "rows", "by_team", "table", "_resolved")
+
+    def __init__(self, registry, rows):
+        self.registry = registry
+        self.rows = [_digest(repr(row)) for row in rows]
+        self.by_team = dict(zip(registry.names, self.rows))
+        self.table = _digest("".join(self.rows))
+        self._resolved = {}
+
+    def team(self, team_name):
+        """(nom canonique, empreinte de sa ligne) ; ValueError si l'équipe est inconnue."""
+        resolved = self._resolved.get(team_name)
+        if resolved is None:
+            team_id = self.registry.id(team_name)
+            resolved = self._resolved[team_name] = (self.registry.names[team_id], self.rows[team_id])
+        return resolved
+
+    def changed_teams(self, other):
+        """Équipes dont la ligne diffère de other (StandingsDigest ou {équipe: empreinte}), ajoutées et retirées comprises."""
+        other = getattr(other, "by_team", other)
+        return {
+            team for team in self.by_team.keys() | other.keys()
+            if self.by_team.get(team) != other.get(team)
+        }
+
+_table_digests = weakref.WeakKeyDictionary()
+_frame_digests = {}
+
+def _frame_digest(season_data, columns):
+    """
+    Empreintes d'un DataFrame, calculées une fois par version de son contenu :
+    une copie des valeurs (to_numpy) est comparée à celle de la version
+    précédente du même objet, sans repasser par les colonnes et repr().
+    """
+    values = season_data.to_numpy()
+    key = id(season_data)
+    entry = _frame_digests.get(key)
+    if (entry is not None and entry[0]() is season_data and entry[1] is season_data.columns
+            and entry[2].shape == values.shape and (entry[2] == values).all()):
+        return entry[3]
+
+    positions = [season_data.columns.get_loc(name) if name in season_data.columns else None for name in columns]
+    rows = [tuple(None if position is None else row[position] for position in positions) for row in values.tolist()]
+    digest = StandingsDigest(TeamRegistry.for_frame(season_data), rows)
+    ref = weakref.ref(season_data, lambda _, key=key: _frame_digests.pop(key, None))
+    # Les colonnes sont gardées en vie avec l'entrée : leur id ne peut pas être réattribué
+    _frame_digests[key] = (ref, season_data.columns, values, digest)
+    return digest
+
+def standings_digest(season_data):
+    """
+    Empreintes d'un classement (SeasonTable ou DataFrame).
+
+    Une SeasonTable n'est pas modifiée sur place (load_season et SeasonStore
+    en créent une nouvelle à chaque version, TeamRecord.replace copie) : ses
+    empreintes sont calculées une fois par objet. Un DataFrame peut l'être :
+    ses empreintes sont recalculées quand ses valeurs changent (voir
+    _frame_digest ; une valeur NaN les fait recalculer à chaque appel).
+    """
+    columns = ("Team",) + RECORD_COLUMNS
+    if isinstance(season_data, SeasonTable):
+        digest = _table_digests.get(season_data)
+        if digest is None:
+            rows = [tuple(getattr(record, name) for name in columns) for record in season_data.records]
+            digest = _table_digests[season_data] = StandingsDigest(season_data.registry, rows)
+        return digest
+    return _frame_digest(season_data, columns)
+
+def _to_json(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class SqliteResultStore:
+    """
+    Niveau disque partagé : une base sqlite (mode WAL) que plusieurs processus
+    lisent et complètent. Les valeurs sont stockées en JSON (tableaux NumPy
+    en listes), avec la dernière version vue du classement de chaque source
+    (empreintes par équipe) pour que tout processus invalide ce qu'elle périme.
+    """
+
+    def __init__(self, path):
+        import sqlite3  # importé seulement avec un niveau disque (démarrage des scripts)
+
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS odds (key TEXT PRIMARY KEY, source TEXT, scope TEXT,"
+            " home TEXT, away TEXT, value TEXT, created REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS odds_home ON odds (source, home)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS odds_away ON odds (source, away)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS snapshots (source TEXT PRIMARY KEY, rows TEXT)")
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM odds WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key, source, scope, home, away, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO odds VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, source, scope, home, away, json.dumps(value, default=_to_json), time.time()),
+            )
+
+    def invalidate(self, source, teams=None):
+        """Efface les entrées de la source (toutes, ou celles des équipes données et de portée table)."""
+        with self._lock:
+            if teams is None:
+                cursor = self._conn.execute("DELETE FROM odds WHERE source = ?", (source,))
+            else:
+                teams = sorted(teams)
+                marks = ",".join("?" * len(teams))
+                cursor = self._conn.execute(
+                    f"DELETE FROM odds WHERE source = ? AND (scope = 'table' OR home IN ({marks}) OR away IN ({marks}))",
+                    (source, *teams, *teams),
+                )
+        return cursor.rowcount
+
+    def snapshot(self, source):
+        """Empreintes par équipe de la dernière version enregistrée du classement de source (None si aucune)."""
+        with self._lock:
+            row = self._conn.execute("SELECT rows FROM snapshots WHERE source = ?", (source,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set_snapshot(self, source, by_team):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?)", (source, json.dumps(by_team, sort_keys=True)))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM odds").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+class FixtureOddsCache:
+    """
+    Résultats mémoïsés des modèles de cotes par rencontre.
+
+    maxsize, maxbytes : bornes du LRU mémoire (entrées, octets estimés)
+    disk : chemin d'une base sqlite partagée (niveau disque optionnel)
+
+    Les classements d'une même source (par défaut le chemin absolu de la
+    SeasonTable, sinon 'default') sont comparés à la version précédente,
+    celle de la base partagée pour la première version vue par le processus :
+    seules les entrées des équipes dont la ligne a changé sont effacées.
+    Les noms d'équipes sont résolus (alias) avant calcul : les résultats
+    portent les noms canoniques. Les valeurs retournées sont partagées,
+    à ne pas modifier.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAX_ENTRIES, maxbytes=DEFAULT_MAX_BYTES, disk=None):
+        self.memory = SizedLRUCache(maxsize, maxbytes)
+        self.disk = SqliteResultStore(disk) if disk else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._snapshots = {}
+        self._strengths = {}
+
+    def lookup(self, source, model, params, home, away, digest, compute, decode=None):
+        """
+        Valeur en cache de la clé, sinon compute() (écrite en mémoire et sur
+        disque). decode(valeur) reconstruit une valeur lue sur disque (JSON).
+        """
+        key = (source, model, params, home, away, digest)
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            count("odds_cache.hit")
+            return value
+
+        disk_key = "\x1f".join(key)
+        if self.disk is not None:
+            value = self.disk.get(disk_key)
+            if value is not None:
+                if decode is not None:
+                    value = decode(value)
+                self.disk_hits += 1
+                count("odds_cache.disk_hit")
+                self.memory.set(key, value)
+                return value
+
+        self.misses += 1
+        count("odds_cache.miss")
+        value = compute()
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(disk_key, source, SCOPES.get(model, "table"), home, away, value)
+        return value
+
+    def standings(self, season_data, source=None):
+        """Empreintes du classement ; une nouvelle version de la source invalide les équipes modifiées."""
+        if source is None:
+            path = getattr(season_data, "path", None)
+            source = os.path.abspath(path) if path else "default"
+        digest = standings_digest(season_data)
+        previous = self._snapshots.get(source)
+        if previous is not digest:
+            if previous is not None:
+                previous = previous.by_team
+            elif self.disk is not None:
+                previous = self.disk.snapshot(source)
+            if previous != digest.by_team:
+                if previous is not None:
+                    self.invalidate(source, digest.changed_teams(previous))
+                if self.disk is not None:
+                    self.disk.set_snapshot(source, digest.by_team)
+            self._snapshots[source] = digest
+        return source, digest
+
+    def refresh(self, paths):
+        """
+        Enregistre la version courante des classements de ces fichiers
+        (load_season) : les entrées des équipes modifiées depuis la version
+        précédente sont effacées, en mémoire et dans la base partagée.
+        """
+        for path in paths:
+            self.standings(load_season(path))
+
+    def invalidate(self, source, teams=None):
+        """
+        Efface les entrées d'une source : toutes (teams=None), ou celles où
+        une des équipes joue ainsi que les entrées de portée table (poisson).
+        Retourne le nombre d'entrées mémoire effacées.
+        """
+        if teams is not None and not teams:
+            return 0
+        stale = [
+            key for key in self.memory.keys()
+            if key[0] == source and (teams is None or SCOPES.get(key[1], "table") == "table" or key[3] in teams or key[4] in teams)
+        ]
+        for key in stale:
+            self.memory.pop(key)
+        self._strengths.pop(source, None)
+        if self.disk is not None:
+            self.disk.invalidate(source, teams)
+        self.invalidated += len(stale)
+        count("odds_cache.invalidated", len(stale))
+        return len(stale)
+
+    def _pair(self, home_team, away_team, season_data, source):
+        source, digest = self.standings(season_data, source)
+        home, home_row = digest.team(home_team)
+        away, away_row = digest.team(away_team)
+        return source, digest, home, away, home_row + away_row
+
+    def home_away_odds(self, home_team, away_team, season_data, home_advantage=0.1, away_advantage=-0.05, source=None):
+        """generate_odds_with_home_away_adjustment mémoïsé."""
+        source, _, home, away, rows = self._pair(home_team, away_team, season_data, source)
+        return self.lookup(
+            source, "home_away", f"{home_advantage!r},{away_advantage!r}", home, away, rows,
+            lambda: generate_odds_with_home_away_adjustment(home, away, season_data, home_advantage, away_advantage),
+        )
+
+    def combined_odds(self, home_team, away_team, season_1, season_2, weight_current_season=0.6,
+                      home_advantage=0.1, away_advantage=-0.05, source=None):
+        """
+        generate_combined_odds_with_home_away_adjustment mémoïsé (source : celle
+        de la saison en cours). Une équipe absente de season_1 (promue, cotée
+        sur son prior) a l'empreinte de son prior dans la clé à la place de
+        sa ligne : un prior recalculé donne une nouvelle entrée.
+        """
+        season_1, season_2 = load_season(season_1), load_season(season_2)
+        source, _, home, away, rows = self._pair(home_team, away_team, season_2, source)
+        previous = standings_digest(season_1)
+        for team in (home, away):
+            try:
+                rows += previous.team(team)[1]
+            except ValueError:
+                rates = promoted_team_rates(team, season_2)
+                rows += "-" if rates is None else _digest(repr(sorted(rates.items())))
+        return self.lookup(
+            source, "combined", f"{weight_current_season!r},{home_advantage!r},{away_advantage!r}", home, away, rows,
+            lambda: generate_combined_odds_with_home_away_adjustment(
+                home, away, season_1, season_2, weight_current_season, home_advantage, away_advantage
+            ),
+        )
+
+    def strength_odds(self, home_team, away_team, season_data, margin=1.05, source=None):
+        """generate_odds (force = PTS + 0.3 * Diff) mémoïsé."""
+        source, _, home, away, rows = self._pair(home_team, away_team, season_data, source)
+        return self.lookup(
+            source, "strength", repr(margin), home, away, rows,
+            lambda: generate_odds(home, away, season_data, margin=margin),
+        )
+
+    def ranking_odds(self, home, away, classement, bonus_home=1.1, source="classement"):
+        """calc_prob_from_ranking mémoïsé (clé : points des deux équipes)."""
+        points = f"{classement.get(home, 0)!r},{classement.get(away, 0)!r}"
+        return self.lookup(
+            source, "ranking", repr(bonus_home), str(home), str(away), points,
+            lambda: calc_prob_from_ranking(home, away, classement, bonus_home),
+        )
+
+    def predict_match(self, home_team, away_team, season_data, max_goals=None, source=None):
+        """poisson.predict_match mémoïsé (forces calculées une fois par version du classement)."""
+        source, digest, home, away, _ = self._pair(home_team, away_team, season_data, source)
+
+        def compute():
+            import poisson
+
+            entry = self._strengths.get(source)
+            if entry is None or entry[0] != digest.table:
+                data = season_data.to_frame() if isinstance(season_data, SeasonTable) else season_data
+                entry = self._strengths[source] = (digest.table, poisson.compute_team_strengths(data))
+            return poisson.predict_match(home, away, max_goals=max_goals, print_output=False, strengths=entry[1])
+
+        def decode(value):
+            import numpy as np
+
+            value["probability_matrix"] = np.asarray(value["probability_matrix"])
+            return value
+
+        return self.lookup(source, "poisson", repr(max_goals), home, away, digest.table, compute, decode)
+
+    def stats(self):
+        """Compteurs, taille du LRU mémoire (entrées, octets, évictions) et du niveau disque."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.nbytes,
+            "evictions": self.memory.evictions,
+            "disk_entries": len(self.disk) if self.disk is not None else None,
+        }
+
+_default_cache = None
+
+def default_odds_cache():
+    """Cache partagé du processus ; niveau disque si SOCCER_ODDS_CACHE donne un chemin sqlite."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FixtureOddsCache(disk=os.environ.get(ODDS_CACHE_ENV))
+    return _default_cache
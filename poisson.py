@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+from instrumentation import timed
+from teams import TeamRegistry
+
+DEFAULT_LINES = (0.5, 1.5, 2.5, 3.5, 4.5)
+
+@timed("strength")
+def compute_team_strengths(data):
+    """
+    Calcule une seule fois les forces d'attaque et de défense de chaque équipe.
+
+    data : DataFrame du classement (doit contenir 'Team', 'M', 'G', 'GA')
+    Retourne un dictionnaire : 'teams', 'registry' (TeamRegistry des équipes),
+    'attack', 'defense' (tableaux NumPy) et 'league_avg_goals'.
+    """
+    matches = data["M"].to_numpy(dtype=float)
+    goals_for = data["G"].to_numpy(dtype=float)
+    goals_against = data["GA"].to_numpy(dtype=float)
+
+    # Moyenne de buts de la ligue
+    league_avg_goals = goals_for.sum() / matches.sum()
+
+    teams = data["Team"].tolist()
+    return {
+        "teams": teams,
+        "registry": TeamRegistry(teams),
+        "attack": (goals_for / matches) / league_avg_goals,
+        "defense": (goals_against / matches) / league_avg_goals,
+        "league_avg_goals": league_avg_goals,
+    }
+
+def team_indices(team_names, strengths):
+    """Convertit une liste de noms d'équipes en indices dans les tableaux de forces."""
+    registry = strengths["registry"]
+    team_names = list(team_names)
+    team_ids = [registry.get(name) for name in team_names]
+    if None in team_ids:
+        raise ValueError(f"Équipe inconnue : {team_names[team_ids.index(None)]}")
+    return np.asarray(team_ids, dtype=np.intp)
+
+def expected_goals(home_idx, away_idx, strengths):
+    """
+    Buts attendus pour plusieurs rencontres à la fois.
+
+    home_idx, away_idx : indices des équipes (tableaux de même longueur)
+    Retourne (exp_home, exp_away).
+    """
+    attack = strengths["attack"]
+    defense = strengths["defense"]
+    avg = strengths["league_avg_goals"]
+    exp_home = attack[home_idx] * defense[away_idx] * avg
+    exp_away = attack[away_idx] * defense[home_idx] * avg
+    return exp_home, exp_away
+
+def poisson_pmf(lambdas, max_goals):
+    """
+    Loi de Poisson de 0 à max_goals pour chaque lambda, par récurrence
+    p(k) = p(k-1) * lambda / k (pas d'appel à scipy).
+
+    Retourne un tableau (len(lambdas), max_goals + 1).
+    """
+    lambdas = np.asarray(lambdas, dtype=float).reshape(-1)
+    k = np.arange(1, max_goals + 1)
+    ratios = lambdas[:, None] / k[None, :]
+    pmf = np.empty((len(lambdas), max_goals + 1))
+    pmf[:, 0] = np.exp(-lambdas)
+    pmf[:, 1:] = pmf[:, :1] * np.cumprod(ratios, axis=1)
+    return pmf
+
+def tail_max_goals(lambdas, tol=1e-10, limit=30):
+    """
+    Plus petit nombre de buts n tel que la masse au-delà de n soit inférieure
+    à tol pour le plus grand lambda (borné par limit).
+    """
+    lam = float(np.max(lambdas)) if np.size(lambdas) else 0.0
+    pmf = poisson_pmf([lam], limit)[0]
+    tail = 1 - np.cumsum(pmf)
+    below = np.nonzero(tail < tol)[0]
+    return int(below[0]) if len(below) else limit
+
+@timed("odds.poisson")
+def score_matrices(exp_home, exp_away, max_goals=None, tol=1e-10):
+    """
+    Matrices des scores de toutes les rencontres dans un seul tableau 3-D.
+
+    exp_home, exp_away : buts attendus (tableaux de même longueur F)
+    max_goals : troncature ; si None, elle est étendue jusqu'à ce que la masse
+                négligée soit inférieure à tol
+    Retourne un tableau (F, n+1, n+1) renormalisé (chaque matrice somme à 1) :
+    [f, i, j] = P(domicile marque i, extérieur marque j).
+    """
+    exp_home = np.asarray(exp_home, dtype=float).reshape(-1)
+    exp_away = np.asarray(exp_away, dtype=float).reshape(-1)
+    if max_goals is None:
+        max_goals = tail_max_goals(np.concatenate([exp_home, exp_away]), tol)
+
+    pmf_home = poisson_pmf(exp_home, max_goals)
+    pmf_away = poisson_pmf(exp_away, max_goals)
+    matrices = pmf_home[:, :, None] * pmf_away[:, None, :]
+
+    # Renormalisation : la masse tronquée est redistribuée proportionnellement
+    matrices /= matrices.sum(axis=(1, 2), keepdims=True)
+    return matrices
+
+def match_markets(matrices, lines=DEFAULT_LINES):
+    """
+    Marchés dérivés des matrices de scores.
+
+    Retourne un dictionnaire de tableaux (un élément par rencontre) :
+    p1, pX, p2, btts_yes, btts_no, over_<ligne>, under_<ligne>.
+    """
+    size = matrices.shape[1]
+    home_goals, away_goals = np.indices((size, size))
+
+    markets = {
+        "p1": matrices[:, home_goals > away_goals].sum(axis=1),
+        "pX": matrices[:, home_goals == away_goals].sum(axis=1),
+        "p2": matrices[:, home_goals < away_goals].sum(axis=1),
+    }
+
+    # Les deux équipes marquent
+    btts = 1 - matrices[:, 0, :].sum(axis=1) - matrices[:, :, 0].sum(axis=1) + matrices[:, 0, 0]
+    markets["btts_yes"] = btts
+    markets["btts_no"] = 1 - btts
+
+    # Plus / moins de buts : distribution du total de buts par anti-diagonale
+    total_goals = (home_goals + away_goals).reshape(-1)
+    totals = np.zeros((len(matrices), 2 * size - 1))
+    np.add.at(totals.T, total_goals, matrices.reshape(len(matrices), -1).T)
+    cdf = np.cumsum(totals, axis=1)
+    for line in lines:
+        under = cdf[:, int(np.floor(line))]
+        markets[f"under_{line}"] = under
+        markets[f"over_{line}"] = 1 - under
+    return markets
+
+def predict_matches(home_teams, away_teams, data=None, strengths=None, max_goals=None, tol=1e-10, lines=DEFAULT_LINES):
+    """
+    Prédit en un seul lot toutes les rencontres home_teams[k] vs away_teams[k].
+
+    data : DataFrame du classement (ignoré si strengths est fourni)
+    strengths : résultat de compute_team_strengths, à réutiliser entre les appels
+    Retourne un DataFrame : Home, Away, exp_home, exp_away et les probabilités
+    de tous les marchés, plus les cotes décimales implicites 1, X, 2.
+    """
+    if strengths is None:
+        strengths = compute_team_strengths(data)
+
+    home_idx = team_indices(home_teams, strengths)
+    away_idx = team_indices(away_teams, strengths)
+    exp_home, exp_away = expected_goals(home_idx, away_idx, strengths)
+    markets = match_markets(score_matrices(exp_home, exp_away, max_goals, tol), lines)
+
+    result = pd.DataFrame({
+        "Home": list(home_teams),
+        "Away": list(away_teams),
+        "exp_home": exp_home,
+        "exp_away": exp_away,
+        **markets,
+    })
+    result["1"] = np.round(1 / result["p1"], 2)
+    result["X"] = np.round(1 / result["pX"], 2)
+    result["2"] = np.round(1 / result["p2"], 2)
+    return result
+
+def predict_match(team1, team2, data=None, max_goals=None, print_output=True, strengths=None, tol=1e-10):
+    """
+    Prédiction d'un seul match (même format de retour que le notebook poisson-fr).
+    """
+    if strengths is None:
+        strengths = compute_team_strengths(data)
+
+    idx = team_indices([team1, team2], strengths)
+    exp_home, exp_away = expected_goals(idx[:1], idx[1:], strengths)
+    prob_matrix = score_matrices(exp_home, exp_away, max_goals, tol)
+    markets = match_markets(prob_matrix)
+
+    exp_g1, exp_g2 = float(exp_home[0]), float(exp_away[0])
+    home_win_prob = float(markets["p1"][0])
+    draw_prob = float(markets["pX"][0])
+    away_win_prob = float(markets["p2"][0])
+
+    # Cotes décimales (implicites, sans marge)
+    home_odds = round(1 / home_win_prob, 2)
+    draw_odds = round(1 / draw_prob, 2)
+    away_odds = round(1 / away_win_prob, 2)
+
+    if print_output:
+        print(f"\n📊 Expected Goals:")
+        print(f"{team1}: {exp_g1:.2f}, {team2}: {exp_g2:.2f}")
+
+        print(f"\n📈 Match Outcome Probabilities:")
+        print(f"{team1} Win: {home_win_prob:.2%}")
+        print(f"Draw: {draw_prob:.2%}")
+        print(f"{team2} Win: {away_win_prob:.2%}")
+
+        print(f"\n🎯 Implied Decimal Odds:")
+        print(f"{team1} Win: {home_odds}")
+        print(f"Draw: {draw_odds}")
+        print(f"{team2} Win: {away_odds}")
+
+    return {
+        'expected_goals': {team1: exp_g1, team2: exp_g2},
+        'probabilities': {
+            f'{team1}_win': home_win_prob,
+            'draw': draw_prob,
+            f'{team2}_win': away_win_prob,
+        },
+        'decimal_odds': {
+            f'{team1}_win': home_odds,
+            'draw': draw_odds,
+            f'{team2}_win': away_odds,
+        },
+        'probability_matrix': prob_matrix[0]
+    }
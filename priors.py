@@ -0,0 +1,197 @@
+import hashlib
+import os
+
+import numpy as np
+from cache import DiskTTLCache, cache_key
+from catalogue import SeasonCatalogue, season_sort_key
+from season_store import default_store, previous_season
+from teams import canonical_team_key
+
+PRIORS_DIR = os.path.join(".cache", "priors")
+
+# Division inférieure de chaque ligue (données des équipes promues)
+LOWER_DIVISION = {
+    "ligue1": "ligue2",
+    "premier_league": "championship",
+    "laliga": "laliga2",
+    "serie_a": "serie_b",
+    "bundesliga": "bundesliga2",
+}
+
+# Poids du prior en matchs fictifs ajoutés aux statistiques d'une équipe promue
+PRIOR_MATCHES = 10
+
+RATES = ("win", "draw", "loss", "goals_for", "goals_against")
+
+def _rates(values, l, s, teams):
+    """Statistiques par match des équipes teams (indices) de la ligue l, saison s."""
+    matches = values["M"][l, s, teams]
+    return {
+        "win": values["W"][l, s, teams] / matches,
+        "draw": values["D"][l, s, teams] / matches,
+        "loss": values["L"][l, s, teams] / matches,
+        "goals_for": values["G"][l, s, teams] / matches,
+        "goals_against": values["GA"][l, s, teams] / matches,
+    }
+
+def newcomers(stacked, league, season):
+    """
+    Indices (dans stacked.teams[ligue]) des équipes présentes en season mais
+    pas la saison précédente de la ligue (promues), et des équipes
+    reléguées (présentes la saison précédente, absentes en season).
+    """
+    l, s = stacked.index(league, season)
+    played = np.flatnonzero(stacked.present[l].any(axis=1))
+    before = played[played < s]
+    if not len(before):
+        return np.array([], dtype=np.intp), np.array([], dtype=np.intp)
+    present, previous = stacked.present[l, s], stacked.present[l, before[-1]]
+    return np.flatnonzero(present & ~previous), np.flatnonzero(previous & ~present)
+
+def history_prior(stacked, league, season):
+    """
+    Statistiques par match moyennes des équipes promues lors de leur
+    première saison, sur toutes les saisons antérieures à season.
+
+    Sans historique, on prend les équipes reléguées à la fin de la saison
+    précédente : les promues prennent leur place.
+    Retourne (source, nombre d'équipes, {statistique: valeur}).
+    """
+    l, s = stacked.index(league, season)
+    samples = {rate: [] for rate in RATES}
+    count = 0
+    for k in range(s):
+        promoted, _ = newcomers(stacked, league, stacked.seasons[k])
+        if len(promoted):
+            for rate, values in _rates(stacked.values, l, k, promoted).items():
+                samples[rate].extend(values.tolist())
+            count += len(promoted)
+    if count:
+        return "history", count, {rate: float(np.nanmean(v)) for rate, v in samples.items()}
+
+    _, relegated = newcomers(stacked, league, season)
+    if len(relegated):
+        played = np.flatnonzero(stacked.present[l].any(axis=1))
+        last = played[played < s][-1]
+        rates = _rates(stacked.values, l, last, relegated)
+        return "relegated", len(relegated), {rate: float(np.nanmean(v)) for rate, v in rates.items()}
+    return "none", 0, {}
+
+def second_division_priors(stacked, lower, league, season, prior, promoted_names):
+    """
+    Priors propres à chaque promue d'après sa saison précédente en division
+    inférieure : ses statistiques par match, ramenées au niveau supérieur
+    par le rapport moyen observé (prior / moyenne des promues en division
+    inférieure). Retourne {nom: {statistique: valeur}}.
+    """
+    if lower is None or lower.lower() not in stacked.leagues:
+        return {}
+    try:
+        low, s = stacked.index(lower, previous_season(season))
+    except ValueError:
+        return {}
+    lower_registry = stacked.registries[low]
+    rows = {name: lower_registry.get(name) for name in promoted_names}
+    rows = {name: t for name, t in rows.items() if t is not None and stacked.present[low, s, t]}
+    if not rows:
+        return {}
+
+    rates = _rates(stacked.values, low, s, np.array(list(rows.values()), dtype=np.intp))
+    priors = {}
+    for k, name in enumerate(rows):
+        team = {}
+        for rate in RATES:
+            mean = float(np.nanmean(rates[rate]))
+            ratio = prior[rate] / mean if mean > 0 else 1.0
+            team[rate] = float(rates[rate][k] * ratio)
+        priors[name] = team
+    return priors
+
+class PriorStore:
+    """
+    Priors des équipes promues, calculés une fois par (ligue, saison) et
+    mis en cache (mémoire et .cache/priors) tant que les fichiers de saison
+    utilisés ne changent pas.
+    """
+
+    def __init__(self, store=None, directory=PRIORS_DIR, lower_division=LOWER_DIVISION):
+        self.store = store or default_store()
+        self.disk = DiskTTLCache(directory, ttl=float("inf"))
+        self.lower_division = lower_division
+        self._memory = {}
+
+    def _fingerprint(self, leagues):
+        digest = hashlib.sha1()
+        for key in self.store.keys():
+            if key[0] in leagues:
+                stat = os.stat(self.store.source(*key))
+                digest.update(f"{key}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+        return digest.hexdigest()
+
+    def get(self, league, season):
+        """
+        Prior de (ligue, saison) : {'source', 'count', 'rates' (moyenne des
+        promues), 'teams' ({promue: statistiques par match})}.
+        """
+        league = league.lower()
+        lower = self.lower_division.get(league)
+        leagues = {league, lower} - {None}
+        key = cache_key("priors", league, season, self._fingerprint(leagues))
+        prior = self._memory.get(key)
+        if prior is None:
+            prior = self.disk.get(key)
+            if prior is None:
+                prior = self._compute(league, str(season), lower)
+                self.disk.set(key, prior)
+            self._memory[key] = prior
+        return prior
+
+    def _compute(self, league, season, lower):
+        catalogue = SeasonCatalogue(self.store)
+        leagues = [lg for lg in (league, lower) if lg in catalogue.leagues()]
+        seasons = [s for s in catalogue.seasons(league) if season_sort_key(s) <= season_sort_key(season)]
+        if season not in seasons:
+            raise FileNotFoundError(f"No data registered for league '{league}' season '{season}'.")
+        stacked = catalogue.load(leagues, seasons + [previous_season(season)] if lower in leagues else seasons)
+
+        source, count, rates = history_prior(stacked, league, season)
+        promoted, _ = newcomers(stacked, league, season)
+        l = stacked.index(league)[0]
+        names = [stacked.teams[l][t] for t in promoted]
+        teams = {name: dict(rates) for name in names} if rates else {}
+        if rates:
+            teams.update(second_division_priors(stacked, lower, league, season, rates, names))
+        return {"source": source, "count": count, "rates": rates, "teams": teams}
+
+    def team_prior(self, league, season, teams, matches=PRIOR_MATCHES):
+        """
+        Prior aligné sur teams pour les moteurs vectorisés
+        (algorithms.weighted_home_away_matrix) : taux 'win' et 'draw' par
+        match, NaN pour les équipes qui ne sont pas promues, et 'matches'
+        (poids du prior en matchs fictifs).
+        """
+        by_key = self._by_key(league, season)
+        win = np.full(len(teams), np.nan)
+        draw = np.full(len(teams), np.nan)
+        for i, team in enumerate(teams):
+            rates = by_key.get(canonical_team_key(team))
+            if rates is not None:
+                win[i], draw[i] = rates["win"], rates["draw"]
+        return {"win": win, "draw": draw, "matches": matches}
+
+    def team_rates(self, league, season, team):
+        """Statistiques par match du prior d'une équipe promue (None si elle ne l'est pas)."""
+        return self._by_key(league, season).get(canonical_team_key(team))
+
+    def _by_key(self, league, season):
+        prior = self.get(league, season)
+        return {canonical_team_key(name): rates for name, rates in prior["teams"].items()}
+
+_default_priors = None
+
+def default_priors():
+    """Priors calculés sur le stockage partagé des saisons."""
+    global _default_priors
+    if _default_priors is None:
+        _default_priors = PriorStore()
+    return _default_priors
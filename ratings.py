@@ -0,0 +1,129 @@
+import json
+import os
+
+import numpy as np
+from teams import canonical_team_key
+
+class EloRatings:
+    """
+    Classement Elo mis à jour match par match (O(1) par résultat).
+
+    k : facteur de mise à jour
+    home_advantage : points Elo ajoutés à l'équipe à domicile pour l'espérance
+    goal_diff : pondère la mise à jour par l'écart de buts (Elo « football »)
+    """
+
+    def __init__(self, k=20.0, home_advantage=65.0, initial=1500.0, goal_diff=True):
+        self.k = k
+        self.home_advantage = home_advantage
+        self.initial = initial
+        self.goal_diff = goal_diff
+        self.ratings = {}
+        self.games = {}
+        self._names = {}
+
+    def _key(self, team):
+        key = canonical_team_key(team)
+        self._names.setdefault(key, team)
+        return key
+
+    def rating(self, team):
+        return self.ratings.get(canonical_team_key(team), self.initial)
+
+    def expected(self, home, away):
+        """Espérance de score de l'équipe à domicile (victoire = 1, nul = 0.5)."""
+        diff = self.rating(away) - self.rating(home) - self.home_advantage
+        return 1 / (1 + 10 ** (diff / 400))
+
+    def update(self, home, away, home_goals, away_goals):
+        """Applique un résultat ; retourne la variation de l'équipe à domicile."""
+        home_key, away_key = self._key(home), self._key(away)
+        home_rating = self.ratings.get(home_key, self.initial)
+        away_rating = self.ratings.get(away_key, self.initial)
+
+        expected = 1 / (1 + 10 ** ((away_rating - home_rating - self.home_advantage) / 400))
+        score = 1.0 if home_goals > away_goals else 0.5 if home_goals == away_goals else 0.0
+
+        k = self.k
+        if self.goal_diff:
+            margin = abs(home_goals - away_goals)
+            k *= 1.0 if margin <= 1 else 1.5 if margin == 2 else (11 + margin) / 8
+
+        delta = k * (score - expected)
+        self.ratings[home_key] = home_rating + delta
+        self.ratings[away_key] = away_rating - delta
+        self.games[home_key] = self.games.get(home_key, 0) + 1
+        self.games[away_key] = self.games.get(away_key, 0) + 1
+        return delta
+
+    def replay(self, results):
+        """
+        Rejoue une suite de résultats (par ex. results.read_results(path),
+        lu en flux) dans l'ordre fourni.
+        """
+        update = self.update
+        for match in results:
+            update(match["home"], match["away"], match["home_goals"], match["away_goals"])
+        return self
+
+    def new_season(self, regression=1 / 3):
+        """Ramène chaque classement d'une fraction vers la moyenne entre deux saisons."""
+        for key, value in self.ratings.items():
+            self.ratings[key] = value + regression * (self.initial - value)
+
+    def strengths(self, teams):
+        """
+        Forces 10^(rating/400) des équipes (dans l'ordre donné).
+
+        Avec cette échelle, force_A / (force_A + force_B) est exactement
+        l'espérance Elo : elles peuvent remplacer PTS + 0.3*Diff dans
+        algorithms.generate_odds ou les points de calc_prob_from_ranking.
+        Les équipes sans historique reçoivent le classement initial.
+        """
+        values = [self.rating(team) for team in teams]
+        return 10 ** (np.asarray(values, dtype=float) / 400)
+
+    def as_classement(self, teams=None):
+        """Dictionnaire {équipe: force} au format attendu par calc_prob_from_ranking."""
+        if teams is None:
+            teams = [self._names.get(key, key) for key in self.ratings]
+        teams = list(teams)
+        return dict(zip(teams, self.strengths(teams).tolist()))
+
+    def table(self):
+        """Classement trié (liste de (équipe, rating, matchs))."""
+        rows = [(self._names.get(key, key), value, self.games.get(key, 0)) for key, value in self.ratings.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def save(self, path):
+        """Sauvegarde l'état (paramètres et classements) de façon atomique."""
+        state = {
+            "k": self.k,
+            "home_advantage": self.home_advantage,
+            "initial": self.initial,
+            "goal_diff": self.goal_diff,
+            "ratings": {self._names.get(key, key): value for key, value in self.ratings.items()},
+            "games": {self._names.get(key, key): value for key, value in self.games.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        elo = cls(state["k"], state["home_advantage"], state["initial"], state["goal_diff"])
+        for team, value in state["ratings"].items():
+            elo.ratings[elo._key(team)] = value
+        for team, value in state.get("games", {}).items():
+            elo.games[elo._key(team)] = value
+        return elo
+
+    @classmethod
+    def load_or_create(cls, path, **options):
+        """État persistant s'il existe, sinon nouveau classement."""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(**options)
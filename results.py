@@ -0,0 +1,63 @@
+import csv
+from datetime import datetime
+
+# En-têtes acceptés pour les fichiers de résultats (format football-data.co.uk inclus)
+RESULT_COLUMNS = {
+    "date": ("Date", "date"),
+    "home": ("HomeTeam", "Home", "home", "home_team"),
+    "away": ("AwayTeam", "Away", "away", "away_team"),
+    "home_goals": ("FTHG", "HomeGoals", "HG", "home_goals"),
+    "away_goals": ("FTAG", "AwayGoals", "AG", "away_goals"),
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%d/%m/%Y", "%d/%m/%y")
+
+def parse_date(value):
+    """Date d'un résultat : ISO (2024-08-16) ou format français / football-data (16/08/2024)."""
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date '{value}'.")
+
+def _column_map(header):
+    mapping = {}
+    for name, candidates in RESULT_COLUMNS.items():
+        for candidate in candidates:
+            if candidate in header:
+                mapping[name] = candidate
+                break
+        else:
+            raise ValueError(f"Missing column for '{name}' (expected one of {candidates}).")
+    return mapping
+
+def read_results(path):
+    """
+    Lit un fichier CSV de résultats ligne par ligne (sans tout charger en mémoire).
+
+    Produit des dictionnaires : date (datetime), home, away, home_goals, away_goals
+    et les colonnes supplémentaires du fichier (cotes du marché, etc.) telles quelles.
+    Les matchs sans score (non joués) sont ignorés.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        mapping = _column_map(reader.fieldnames or [])
+        for row in reader:
+            if not row[mapping["home_goals"]] or not row[mapping["away_goals"]]:
+                continue
+            result = {k: v for k, v in row.items() if k not in mapping.values()}
+            result["date"] = parse_date(row[mapping["date"]])
+            result["home"] = row[mapping["home"]].strip()
+            result["away"] = row[mapping["away"]].strip()
+            result["home_goals"] = int(row[mapping["home_goals"]])
+            result["away_goals"] = int(row[mapping["away_goals"]])
+            yield result
+
+def load_results(path):
+    """Résultats d'un fichier sous forme de DataFrame trié par date."""
+    import pandas as pd
+
+    results = pd.DataFrame(list(read_results(path)))
+    return results.sort_values("date", kind="stable").reset_index(drop=True)
@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+from core import HEADER_ALIASES, read_csv_rows  # noqa: F401
+from instrumentation import count, span
+from teams import TeamRegistry
+
+DATA_DIR = "data"
+STORE_DIR = os.path.join(DATA_DIR, ".store")
+
+# Colonnes numériques conservées (ordre des CSV), Diff est recalculée si absente
+COLUMNS = ["Number", "M", "W", "D", "L", "G", "GA", "PTS", "Diff"]
+
+# Fichiers de saison : <ligue>-<saison>.csv, par ex. ligue1-2024-2025.csv
+SEASON_FILE_PATTERN = re.compile(r"^(?P<league>[a-z0-9_]+?)-(?P<season>\d{4}(?:-\d{4})?)\.(?:csv|json)$", re.I)
+
+def parse_season_filename(path):
+    """Retourne (ligue, saison) à partir du nom de fichier, ValueError sinon."""
+    match = SEASON_FILE_PATTERN.match(os.path.basename(path))
+    if not match:
+        raise ValueError(f"Cannot infer league and season from '{path}'.")
+    return match.group("league").lower(), match.group("season")
+
+def previous_season(season):
+    """Saison précédente : '2024-2025' -> '2023-2024', '2024' -> '2023'."""
+    years = [int(part) for part in str(season).split("-")]
+    return "-".join(str(year - 1) for year in years)
+
+def _api_football_row(team):
+    row = {
+        "Number": team["rank"],
+        "Team": team["team"]["name"],
+        "M": team["all"]["played"],
+        "W": team["all"]["win"],
+        "D": team["all"]["draw"],
+        "L": team["all"]["lose"],
+        "G": team["all"]["goals"]["for"],
+        "GA": team["all"]["goals"]["against"],
+        "PTS": team["points"],
+        "Diff": team["goalsDiff"],
+    }
+    # Répartition domicile / extérieur fournie par API-Football
+    for side in ("home", "away"):
+        split = team.get(side)
+        if split:
+            row[f"{side}_M"] = split["played"]
+            row[f"{side}_W"] = split["win"]
+            row[f"{side}_D"] = split["draw"]
+            row[f"{side}_L"] = split["lose"]
+            row[f"{side}_G"] = split["goals"]["for"]
+            row[f"{side}_GA"] = split["goals"]["against"]
+    return row
+
+def _thesportsdb_row(team):
+    return {
+        "Number": team["intRank"],
+        "Team": team["strTeam"],
+        "M": team["intPlayed"],
+        "W": team["intWin"],
+        "D": team["intDraw"],
+        "L": team["intLoss"],
+        "G": team["intGoalsFor"],
+        "GA": team["intGoalsAgainst"],
+        "PTS": team["intPoints"],
+        "Diff": team["intGoalDifference"],
+    }
+
+def standings_rows(payload):
+    """
+    Lignes de classement à partir d'un JSON API-Football (cache
+    {"timestamp", "standings"} ou réponse brute) ou TheSportsDB ({"table"}).
+    """
+    if "table" in payload:
+        return [_thesportsdb_row(team) for team in payload["table"] or []]
+    if "standings" in payload:
+        standings = payload["standings"]
+    else:
+        try:
+            standings = payload["response"][0]["league"]["standings"][0]
+        except (KeyError, IndexError):
+            raise ValueError("Aucune donnée de classement trouvée.")
+    return [_api_football_row(team) for team in standings]
+
+def read_json_rows(path):
+    with open(path, encoding="utf-8") as f:
+        return standings_rows(json.load(f))
+
+def rows_to_columns(rows):
+    """Convertit des lignes en colonnes typées : noms d'équipes + tableaux int32."""
+    if not rows:
+        # Classement vide (fichier réduit à son en-tête) : colonnes habituelles, sans ligne
+        return [], {name: np.zeros(0, dtype=np.int32) for name in COLUMNS}
+    teams = [str(row["Team"]).strip() for row in rows]
+    names = [c for c in COLUMNS if c != "Diff"]
+    names += sorted({k for row in rows for k in row} - set(COLUMNS) - {"Team"})
+
+    columns = {}
+    for name in names:
+        if all(name in row for row in rows):
+            values = [row[name] for row in rows]
+            columns[name] = np.array([int(float(v or 0)) for v in values], dtype=np.int32)
+
+    if all("Diff" in row for row in rows) and rows:
+        columns["Diff"] = np.array([int(float(row["Diff"] or 0)) for row in rows], dtype=np.int32)
+    elif "G" in columns and "GA" in columns:
+        columns["Diff"] = columns["G"] - columns["GA"]
+    return teams, columns
+
+def file_digest(path):
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+class Season:
+    """
+    Classement d'une saison sous forme de colonnes NumPy typées.
+
+    Les colonnes sont des tableaux en lecture seule (lignes d'une même
+    matrice partagée via np.load(mmap_mode="r") lorsque la saison vient du
+    stockage sur disque).
+    """
+
+    def __init__(self, league, season, teams, columns):
+        self.league = league
+        self.season = season
+        self.teams = teams
+        self.columns = columns
+        self.registry = TeamRegistry(teams)
+        self._frame = None
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def row(self, team_name):
+        """Statistiques d'une équipe sous forme de dictionnaire."""
+        team_id = self.registry.id(team_name)
+        row = {"Team": self.teams[team_id]}
+        row.update((name, int(values[team_id])) for name, values in self.columns.items())
+        return row
+
+    def to_frame(self):
+        """DataFrame pandas de la saison (construit une seule fois)."""
+        if self._frame is None:
+            import pandas as pd
+
+            data = {"Team": np.array(self.teams, dtype=object)}
+            data.update((name, np.asarray(values)) for name, values in self.columns.items())
+            self._frame = pd.DataFrame(data, copy=False)
+        return self._frame
+
+class SeasonStore:
+    """
+    Stockage des saisons indexé par (ligue, saison).
+
+    Chaque source (CSV ou JSON de classement) est convertie une seule fois
+    en une matrice .npy (une ligne par colonne) sous store_dir, puis
+    rechargée en mémoire partagée. Une source n'est relue que si sa date de
+    modification change et que son contenu (SHA-1) est différent.
+
+    Chaque contenu a son propre dossier <store_dir>/<ligue>/<saison>/<sha1>/,
+    écrit dans un dossier temporaire puis renommé : un fichier déjà projeté
+    en mémoire par une Season plus ancienne n'est jamais réécrit.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, store_dir=None):
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, ".store")
+        self._sources = {}
+        self._seasons = {}
+        self.discover()
+
+    def discover(self):
+        """Enregistre tous les fichiers <ligue>-<saison>.csv|json du dossier de données."""
+        if not os.path.isdir(self.data_dir):
+            return
+        for root, dirs, files in os.walk(self.data_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for filename in sorted(files):
+                if SEASON_FILE_PATTERN.match(filename):
+                    league, season = parse_season_filename(filename)
+                    self._sources.setdefault((league, season), os.path.join(root, filename))
+
+    def register(self, league, season, path):
+        """Associe explicitement une source (CSV ou JSON) à (ligue, saison)."""
+        key = (league.lower(), str(season))
+        self._sources[key] = path
+        self._seasons.pop(key, None)
+        return key
+
+    def keys(self):
+        return sorted(self._sources)
+
+    def source(self, league, season):
+        """Chemin du fichier source enregistré pour (ligue, saison)."""
+        key = (league.lower(), str(season))
+        if key not in self._sources:
+            raise FileNotFoundError(f"No data registered for league '{league}' season '{season}'.")
+        return self._sources[key]
+
+    def get(self, league, season):
+        """Saison (objet Season), rechargée uniquement si la source a changé."""
+        key = (league.lower(), str(season))
+        if key not in self._sources:
+            raise FileNotFoundError(f"No data registered for league '{league}' season '{season}'.")
+        path = self._sources[key]
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File '{path}' not found.")
+
+        cached = self._seasons.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns:
+            return cached[1]
+
+        with span("load"):
+            season = self._load(key, path, stat)
+        self._seasons[key] = (stat.st_mtime_ns, season)
+        return season
+
+    def frame(self, league, season):
+        """DataFrame pandas d'une saison."""
+        return self.get(league, season).to_frame()
+
+    def load_path(self, path):
+        """Saison correspondant à un chemin de fichier (enregistré au besoin)."""
+        key = parse_season_filename(path)
+        if os.path.abspath(self._sources.get(key, "")) != os.path.abspath(path):
+            self.register(*key, path)
+        return self.get(*key)
+
+    def _season_dir(self, key):
+        return os.path.join(self.store_dir, *key)
+
+    def _load(self, key, path, stat):
+        season_dir = self._season_dir(key)
+        meta_path = os.path.join(season_dir, "meta.json")
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+
+        if meta is not None and meta["source"] == os.path.abspath(path) and "version" in meta:
+            if meta["mtime_ns"] == stat.st_mtime_ns or meta["sha1"] == file_digest(path):
+                if meta["mtime_ns"] != stat.st_mtime_ns:
+                    # Fichier touché mais contenu identique : pas de réingestion
+                    meta["mtime_ns"] = stat.st_mtime_ns
+                    self._write_meta(meta_path, meta)
+                matrix = np.load(os.path.join(season_dir, meta["version"], "columns.npy"), mmap_mode="r")
+                return Season(key[0], key[1], meta["teams"], dict(zip(meta["columns"], matrix)))
+
+        return self._ingest(key, path, stat, season_dir, meta_path)
+
+    def _ingest(self, key, path, stat, season_dir, meta_path):
+        with span("load.parse"):
+            if path.lower().endswith(".json"):
+                rows = read_json_rows(path)
+            else:
+                rows = read_csv_rows(path)
+            teams, columns = rows_to_columns(rows)
+        if not columns:
+            raise ValueError(f"File '{path}' has no standings columns (expected {', '.join(COLUMNS)}).")
+        count("rows.loaded", len(rows))
+
+        digest = file_digest(path)
+        version = digest[:16]
+        version_dir = os.path.join(season_dir, version)
+        if not os.path.isdir(version_dir):
+            tmp_dir = f"{version_dir}.{os.getpid()}.tmp"
+            os.makedirs(tmp_dir, exist_ok=True)
+            np.save(os.path.join(tmp_dir, "columns.npy"), np.stack(list(columns.values())))
+            try:
+                os.rename(tmp_dir, version_dir)
+            except OSError:
+                # Même contenu déjà écrit par un autre processus
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._write_meta(meta_path, {
+            "source": os.path.abspath(path),
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": digest,
+            "version": version,
+            "teams": teams,
+            "columns": list(columns),
+        })
+        self._prune(season_dir, version)
+        return Season(key[0], key[1], teams, columns)
+
+    @staticmethod
+    def _prune(season_dir, version):
+        """
+        Supprime les versions précédentes : les Season qui les projettent en
+        mémoire gardent leurs données (POSIX) ; ailleurs la suppression
+        échoue sans erreur et sera retentée à la prochaine ingestion.
+        """
+        for name in os.listdir(season_dir):
+            path = os.path.join(season_dir, name)
+            if name != version and os.path.isdir(path) and not name.endswith(".tmp"):
+                shutil.rmtree(path, ignore_errors=True)
+            elif name.endswith(".npy"):  # ancien format : un fichier par colonne
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _write_meta(meta_path, meta):
+        # Fichier temporaire propre à chaque écrivain : deux processus qui
+        # ingèrent la même saison ne se croisent pas avant os.replace
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(meta_path), prefix="meta.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+_default_store = None
+
+def default_store():
+    """Stockage partagé du dossier data/ (créé au premier appel)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = SeasonStore()
+    return _default_store
@@ -0,0 +1,433 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from aiohttp import web
+from algorithms import generate_odds_matrix, home_away_probability_matrix
+from catalogue import SeasonCatalogue
+from instrumentation import count, prometheus_text, span, timed
+from margins import METHODS, apply_margin
+from odds_cache import default_odds_cache
+from priors import PriorStore
+from poisson import compute_team_strengths, match_markets, score_matrices
+from season_store import default_store
+from teams import TeamRegistry
+
+logger = logging.getLogger(__name__)
+
+# Modèles servis : mêmes numéros que odds-fr-old.py (1 = saison historique,
+# 2 = saison en cours, 3 = combinaison des deux), toutes les saisons avec
+# des poids exponentiels (weighted), plus les moteurs vectorisés
+MODELS = ("1", "2", "3", "weighted", "strength", "poisson")
+DEFAULT_MODEL = "3"
+
+class ModelSet:
+    """
+    Instantané immuable des modèles : pour chaque modèle, les équipes et les
+    matrices N×N de probabilités et de cotes (tableaux (3, N, N) : 1, X, 2).
+
+    Un ModelSet n'est jamais modifié après construction : le service remplace
+    la référence entière (OddsService.swap), les requêtes en cours terminent
+    donc sur l'ancien instantané.
+    """
+
+    def __init__(self, league, historical, current, models, sources=()):
+        self.league = league
+        self.historical = historical
+        self.current = current
+        self.models = models
+        self.sources = tuple(sources)
+        self.loaded_at = time.time()
+        self._rounds = {}
+
+    def teams(self, model):
+        return self._model(model)["teams"]
+
+    def _model(self, model):
+        try:
+            return self.models[str(model)]
+        except KeyError:
+            raise ValueError(f"Unknown model '{model}'.")
+
+    def gather(self, model, homes, aways):
+        """
+        Indexation vectorisée de plusieurs rencontres.
+
+        Retourne (rows, home_idx, away_idx, probs, odds) : rows sont les
+        positions des rencontres valides (équipes connues et distinctes),
+        probs et odds des tableaux (len(rows), 3) dans l'ordre 1, X, 2.
+        """
+        entry = self._model(model)
+        registry = entry["registry"]
+        # Chaque nom distinct n'est normalisé qu'une fois par lot ; un nom qui
+        # n'est pas une chaîne (JSONL mal formé...) est une équipe inconnue
+        with span("team_lookup"):
+            names = {name for name in (*homes, *aways) if isinstance(name, str)}
+            ids = {name: registry.get(name) for name in names}
+            home_ids = [ids.get(name) if isinstance(name, str) else None for name in homes]
+            away_ids = [ids.get(name) if isinstance(name, str) else None for name in aways]
+            valid = [h is not None and a is not None and h != a for h, a in zip(home_ids, away_ids)]
+            rows = np.flatnonzero(valid)
+        count("fixtures.priced", len(rows))
+
+        h = np.fromiter((home_ids[i] for i in rows), dtype=np.intp, count=len(rows))
+        a = np.fromiter((away_ids[i] for i in rows), dtype=np.intp, count=len(rows))
+        return rows, h, a, entry["probs"][:, h, a].T, entry["odds"][:, h, a].T
+
+    def price(self, model, homes, aways):
+        """
+        Cotes de plusieurs rencontres en une seule indexation NumPy.
+
+        Retourne une liste de dictionnaires (None pour une rencontre dont une
+        équipe est inconnue).
+        """
+        homes, aways = list(homes), list(aways)
+        rows, h, a, probs, odds = self.gather(model, homes, aways)
+        probs = probs.tolist()
+        odds = np.round(odds, 2).tolist()
+
+        teams = self._model(model)["teams"]
+        result = [None] * len(homes)
+        for k, i in enumerate(rows):
+            p, o = probs[k], odds[k]
+            result[i] = {
+                "home": teams[h[k]], "away": teams[a[k]], "model": str(model),
+                "p1": p[0], "pX": p[1], "p2": p[2], "1": o[0], "X": o[1], "2": o[2],
+            }
+        return result
+
+    def round_json(self, model):
+        """Toutes les rencontres ordonnées du modèle (JSON encodé une seule fois)."""
+        model = str(model)
+        body = self._rounds.get(model)
+        if body is None:
+            teams = self.teams(model)
+            home, away = np.nonzero(~np.eye(len(teams), dtype=bool))
+            fixtures = self.price(model, [teams[i] for i in home], [teams[j] for j in away])
+            body = json.dumps({"model": model, "fixtures": fixtures}).encode()
+            self._rounds[model] = body
+        return body
+
+def _entry(teams, probs, odds):
+    return {
+        "teams": teams,
+        "registry": TeamRegistry(teams),
+        "probs": np.ascontiguousarray(probs),
+        "odds": np.ascontiguousarray(odds),
+    }
+
+def _home_away_entry(season_data, pricing, previous_season=None, prior=None):
+    matrices = home_away_probability_matrix(season_data, previous_season=previous_season, prior=prior)
+    probs = np.stack([matrices["p1"], matrices["pX"], matrices["p2"]])
+    return _entry(matrices["teams"], probs, apply_margin(probs, *pricing, axis=0))
+
+def _weighted_entry(store, league, current, decay, priors, pricing):
+    stacked = SeasonCatalogue(store).load([league])
+    matrices = stacked.probability_matrix(league, decay, as_of=current, priors=priors)
+    probs = np.stack([matrices["p1"], matrices["pX"], matrices["p2"]])
+    return _entry(matrices["teams"], probs, apply_margin(probs, *pricing, axis=0))
+
+def _strength_entry(season_data, margin):
+    matrices = generate_odds_matrix(season_data, margin)
+    probs = np.stack([matrices["p1"], matrices["pX"], matrices["p2"]])
+    odds = np.stack([matrices["odds1"], matrices["oddsX"], matrices["odds2"]])
+    return _entry(matrices["teams"], probs, odds)
+
+def _poisson_entry(season_data, pricing):
+    strengths = compute_team_strengths(season_data)
+    n_teams = len(strengths["teams"])
+    home, away = np.nonzero(~np.eye(n_teams, dtype=bool))
+    exp_home = strengths["attack"][home] * strengths["defense"][away] * strengths["league_avg_goals"]
+    exp_away = strengths["attack"][away] * strengths["defense"][home] * strengths["league_avg_goals"]
+    markets = match_markets(score_matrices(exp_home, exp_away))
+
+    probs = np.full((3, n_teams, n_teams), np.nan)
+    for k, market in enumerate(("p1", "pX", "p2")):
+        probs[k, home, away] = markets[market]
+    return _entry(strengths["teams"], probs, apply_margin(probs, *pricing, axis=0))
+
+@timed("models.build")
+def build_models(league="ligue1", historical="2023-2024", current="2024-2025", margin=1.05, store=None, decay=2 / 3,
+                 overround=1.0, margin_method="proportional", priors=None):
+    """
+    Charge les saisons et précalcule les matrices de tous les modèles
+    (weighted : toutes les saisons de la ligue jusqu'à current, chacune
+    pesant decay fois la suivante).
+
+    Les équipes promues sont rétrécies vers leur prior (priors.py) dans
+    les modèles combinés (3, weighted). Sans données pour la saison
+    historique, seuls les modèles de la saison en cours (2, weighted,
+    strength, poisson) sont construits.
+
+    Les cotes des modèles de probabilités sont calculées par
+    margins.apply_margin (overround, margin_method ; 1.0 = cotes justes) ;
+    le modèle strength prend margin comme overround (proportionnel).
+    priors : priors.PriorStore (par défaut sur store, cache dans .cache/priors).
+    """
+    pricing = (overround, margin_method)
+    store = store or default_store()
+    priors = priors or PriorStore(store)
+    current_data = store.frame(league, current)
+    if "Diff" not in current_data:
+        current_data = current_data.assign(Diff=current_data["G"] - current_data["GA"])
+    try:
+        historical_data = store.frame(league, historical)
+    except FileNotFoundError:
+        historical_data = None
+
+    models = {
+        "2": _home_away_entry(current_data, pricing),
+        "strength": _strength_entry(current_data, margin),
+        "weighted": _weighted_entry(store, league, current, decay, priors, pricing),
+        "poisson": _poisson_entry(current_data, pricing),
+    }
+    sources = [store.source(league, current)]
+    if historical_data is not None:
+        models["1"] = _home_away_entry(historical_data, pricing)
+        prior = priors.team_prior(league, current, current_data["Team"].tolist())
+        models["3"] = _home_away_entry(current_data, pricing, previous_season=historical_data, prior=prior)
+        sources.insert(0, store.source(league, historical))
+    return ModelSet(league, historical, current, models, sources)
+
+class MicroBatcher:
+    """
+    Regroupe les demandes de cotes unitaires arrivées pendant max_delay
+    secondes (0 = même tour de boucle) et les calcule en une indexation par
+    modèle, sur l'instantané courant au moment du calcul.
+    """
+
+    def __init__(self, service, max_delay=0.0, max_batch=4096):
+        self.service = service
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending = []
+        self._scheduled = None
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, model, home, away):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((str(model), home, away, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._scheduled is None:
+            if self.max_delay:
+                self._scheduled = loop.call_later(self.max_delay, self._flush)
+            else:
+                self._scheduled = loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.requests += len(pending)
+
+        models = self.service.models
+        groups = {}
+        for item in pending:
+            groups.setdefault(item[0], []).append(item)
+        for model, items in groups.items():
+            try:
+                results = models.price(model, [i[1] for i in items], [i[2] for i in items])
+            except Exception as e:
+                # Toute erreur est transmise aux requêtes du groupe (les autres
+                # groupes sont calculés normalement) : aucun client n'attend indéfiniment
+                results = [e] * len(items)
+            for (_, home, away, future), result in zip(items, results):
+                if future.done():
+                    continue
+                if result is None:
+                    result = ValueError(f"Unknown fixture '{home}' - '{away}'.")
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+class OddsService:
+    """
+    Service de cotes : modèles chargés une fois, remplacés atomiquement
+    quand une source de classement change (surveillance des mtime) ou sur
+    POST /reload. Chaque nouvelle version des sources est aussi enregistrée
+    dans le cache des cotes par rencontre (odds_cache.default_odds_cache) :
+    les entrées des équipes modifiées y sont effacées, y compris dans la
+    base sqlite partagée avec les scripts (SOCCER_ODDS_CACHE).
+    """
+
+    def __init__(self, league="ligue1", historical="2023-2024", current="2024-2025",
+                 margin=1.05, watch_interval=5.0, max_delay=0.0, overround=1.0, margin_method="proportional"):
+        self.options = {
+            "league": league, "historical": historical, "current": current, "margin": margin,
+            "overround": overround, "margin_method": margin_method,
+        }
+        self.watch_interval = watch_interval
+        self.odds_cache = default_odds_cache()
+        self.models = self._build()
+        self.version = 1
+        self.batcher = MicroBatcher(self, max_delay)
+        self._mtimes = self._source_mtimes()
+        self._reload_lock = asyncio.Lock()
+        self._watcher = None
+
+    def _source_mtimes(self):
+        mtimes = []
+        for path in self.models.sources:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return mtimes
+
+    def _build(self):
+        models = build_models(**self.options)
+        self.odds_cache.refresh(models.sources)
+        return models
+
+    def swap(self, models):
+        """Remplace l'instantané (une seule affectation : atomique pour les requêtes)."""
+        self.models = models
+        self.version += 1
+
+    async def reload(self):
+        """Reconstruit les modèles hors de la boucle d'événements puis les publie."""
+        async with self._reload_lock:
+            models = await asyncio.to_thread(self._build)
+            self.swap(models)
+            self._mtimes = self._source_mtimes()
+            return self.version
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if self._source_mtimes() != self._mtimes:
+                try:
+                    await self.reload()
+                except Exception:
+                    logger.exception("Rechargement des modèles impossible ; l'instantané précédent reste servi.")
+
+    async def start(self, app):
+        if self.watch_interval:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self, app):
+        if self._watcher is not None:
+            self._watcher.cancel()
+
+    # Gestionnaires HTTP
+
+    async def odds(self, request):
+        query = request.query
+        if "home" not in query or "away" not in query:
+            raise web.HTTPBadRequest(text="Parameters 'home' and 'away' are required.")
+        try:
+            result = await self.batcher.submit(query.get("model", DEFAULT_MODEL), query["home"], query["away"])
+        except ValueError as e:
+            raise web.HTTPNotFound(text=str(e))
+        return web.json_response(result)
+
+    async def odds_batch(self, request):
+        try:
+            payload = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Invalid JSON body.")
+        if isinstance(payload, list):
+            payload = {"fixtures": payload}
+        fixtures = payload.get("fixtures", []) if isinstance(payload, dict) else None
+        if not isinstance(fixtures, list):
+            raise web.HTTPBadRequest(text="Expected a list of fixtures.")
+        homes, aways = [], []
+        for fixture in fixtures:
+            if isinstance(fixture, dict):
+                home, away = fixture.get("home"), fixture.get("away")
+            elif isinstance(fixture, list) and len(fixture) == 2:
+                home, away = fixture
+            else:
+                raise web.HTTPBadRequest(text=f"Invalid fixture {fixture!r}: expected {{'home', 'away'}} or [home, away].")
+            if not isinstance(home, str) or not isinstance(away, str):
+                raise web.HTTPBadRequest(text=f"Invalid fixture {fixture!r}: team names must be strings.")
+            homes.append(home)
+            aways.append(away)
+        try:
+            results = self.models.price(payload.get("model", DEFAULT_MODEL), homes, aways)
+        except ValueError as e:
+            raise web.HTTPNotFound(text=str(e))
+        return web.json_response({"fixtures": results})
+
+    async def odds_round(self, request):
+        try:
+            body = self.models.round_json(request.query.get("model", DEFAULT_MODEL))
+        except ValueError as e:
+            raise web.HTTPNotFound(text=str(e))
+        return web.Response(body=body, content_type="application/json")
+
+    async def health(self, request):
+        models = self.models
+        return web.json_response({
+            "status": "ok",
+            "version": self.version,
+            "league": models.league,
+            "seasons": [models.historical, models.current],
+            "loaded_at": models.loaded_at,
+            "models": {name: len(entry["teams"]) for name, entry in models.models.items()},
+            "batches": self.batcher.batches,
+            "batched_requests": self.batcher.requests,
+            "odds_cache": self.odds_cache.stats(),
+        })
+
+    async def metrics(self, request):
+        """Mesures d'instrumentation (texte Prometheus ; vide si SOCCER_METRICS=off)."""
+        return web.Response(text=prometheus_text(), content_type="text/plain")
+
+    async def reload_handler(self, request):
+        version = await self.reload()
+        return web.json_response({"status": "reloaded", "version": version})
+
+    def app(self):
+        app = web.Application()
+        app.add_routes([
+            web.get("/odds", self.odds),
+            web.post("/odds/batch", self.odds_batch),
+            web.get("/odds/round", self.odds_round),
+            web.get("/health", self.health),
+            web.get("/metrics", self.metrics),
+            web.post("/reload", self.reload_handler),
+        ])
+        app.on_startup.append(self.start)
+        app.on_cleanup.append(self.stop)
+        return app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON de cotes (modèles préchargés).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--league", default="ligue1")
+    parser.add_argument("--historical", default="2023-2024", help="saison historique (modèle 1)")
+    parser.add_argument("--current", default="2024-2025", help="saison en cours (modèle 2)")
+    parser.add_argument("--margin", type=float, default=1.05, help="overround du modèle strength (1.05 = marge de 5 %%)")
+    parser.add_argument("--overround", type=float, default=1.0, help="overround des autres modèles (1.05 = marge de 5 %%)")
+    parser.add_argument("--margin-method", choices=METHODS, default="proportional", help="répartition de la marge (margins.py)")
+    parser.add_argument("--watch", type=float, default=5.0, help="intervalle de surveillance des sources (0 = désactivé)")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="attente maximale d'un micro-lot (secondes)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def make_app():
+        service = OddsService(
+            args.league, args.historical, args.current, args.margin, args.watch, args.batch_delay,
+            args.overround, args.margin_method,
+        )
+        return service.app()
+
+    web.run_app(make_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
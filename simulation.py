@@ -0,0 +1,162 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from algorithms import compute_odds_from_strengths, team_strengths
+from poisson import compute_team_strengths, expected_goals
+from teams import TeamRegistry
+
+# Zones du classement de Ligue 1 (positions 1-indexées, bornes incluses)
+LIGUE1_ZONES = {
+    "title": (1, 1),
+    "champions_league": (1, 4),
+    "europe": (1, 6),
+    "relegation_playoff": (16, 16),
+    "relegation": (17, 18),
+}
+
+def remaining_fixtures(data, rounds=2):
+    """
+    Calendrier approximatif des matchs restants quand le vrai calendrier
+    n'est pas fourni : chaque équipe doit jouer rounds * (N - 1) matchs, on
+    apparie de façon déterministe les équipes auxquelles il en manque le plus
+    (chaque rencontre ordonnée domicile/extérieur au plus une fois).
+
+    Retourne deux tableaux d'indices (domicile, extérieur).
+    """
+    n_teams = len(data)
+    need = rounds * (n_teams - 1) - data["M"].to_numpy(dtype=int)
+    need = np.maximum(need, 0)
+    used = np.eye(n_teams, dtype=bool)
+    home, away = [], []
+
+    while need.sum() > 1:
+        i = int(np.argmax(need))
+        free = ~(used[i] & used[:, i]) & (need > 0)
+        free[i] = False
+        if not free.any():
+            break
+        j = int(np.argmax(np.where(free, need, -1)))
+        h, a = (i, j) if not used[i, j] else (j, i)
+        used[h, a] = True
+        home.append(h)
+        away.append(a)
+        need[i] -= 1
+        need[j] -= 1
+    return np.array(home, dtype=np.intp), np.array(away, dtype=np.intp)
+
+def _simulate_chunk(args):
+    (seed, n_sims, base, home, away, model, params) = args
+    rng = np.random.default_rng(seed)
+    n_teams = base.shape[2]
+    n_fixtures = len(home)
+
+    # Incidence équipe / rencontre pour cumuler les résultats par produit matriciel
+    home_onehot = np.zeros((n_fixtures, n_teams))
+    home_onehot[np.arange(n_fixtures), home] = 1
+    away_onehot = np.zeros((n_fixtures, n_teams))
+    away_onehot[np.arange(n_fixtures), away] = 1
+
+    if model == "poisson":
+        goals_home = rng.poisson(params["exp_home"], size=(n_sims, n_fixtures))
+        goals_away = rng.poisson(params["exp_away"], size=(n_sims, n_fixtures))
+        home_win = goals_home > goals_away
+        draw = goals_home == goals_away
+    else:
+        u = rng.random((n_sims, n_fixtures))
+        home_win = u < params["p1"]
+        draw = ~home_win & (u < params["p1"] + params["pX"])
+        goals_home = goals_away = np.zeros((n_sims, n_fixtures))
+
+    away_win = ~home_win & ~draw
+    home_points = 3 * home_win + draw
+    away_points = 3 * away_win + draw
+
+    points = base[0] + home_points @ home_onehot + away_points @ away_onehot
+    goal_diff = base[1] + (goals_home - goals_away) @ home_onehot + (goals_away - goals_home) @ away_onehot
+    goals_for = base[2] + goals_home @ home_onehot + goals_away @ away_onehot
+
+    # Départage : points, différence de buts, buts marqués, puis tirage au sort
+    lots = rng.random((n_sims, n_teams))
+    order = np.lexsort((lots, -goals_for, -goal_diff, -points), axis=-1)
+
+    counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    np.add.at(counts, (order, np.arange(n_teams)[None, :]), 1)
+    return counts, points.sum(axis=0)
+
+def simulate_season(data, n_sims=100_000, fixtures=None, model="poisson", seed=None,
+                    chunk_size=20_000, max_workers=None, zones=LIGUE1_ZONES):
+    """
+    Simule la fin de saison n_sims fois (Monte Carlo vectorisé par lots).
+
+    data : DataFrame du classement actuel ('Team', 'M', 'G', 'GA', 'PTS', 'Diff')
+    fixtures : liste de (domicile, extérieur) restant à jouer ; si None, un
+               calendrier approximatif est déduit des matchs joués (remaining_fixtures)
+    model : "poisson" (buts simulés, forces de poisson.py) ou "strength"
+            (issues 1X2 de algorithms.generate_odds_matrix, différence de buts figée)
+    seed : graine ; les lots ont chacun une sous-graine (SeedSequence.spawn),
+           le résultat est donc reproductible quel que soit le nombre de processus
+    max_workers : processus utilisés (1 = pas de pool)
+
+    Retourne un DataFrame : une ligne par équipe, la probabilité de chaque
+    position (colonnes 1..N), les points moyens et la probabilité de chaque zone.
+    """
+    data = data.reset_index(drop=True)
+    if "Diff" not in data:
+        data = data.assign(Diff=data["G"] - data["GA"])
+    teams = data["Team"].tolist()
+
+    if fixtures is None:
+        home, away = remaining_fixtures(data)
+    else:
+        registry = TeamRegistry(teams)
+        home = np.array(registry.ids([h for h, _ in fixtures]), dtype=np.intp)
+        away = np.array(registry.ids([a for _, a in fixtures]), dtype=np.intp)
+
+    if model == "poisson":
+        exp_home, exp_away = expected_goals(home, away, compute_team_strengths(data))
+        params = {"exp_home": exp_home, "exp_away": exp_away}
+    elif model == "strength":
+        strengths = team_strengths(data)
+        probs = compute_odds_from_strengths(strengths[home], strengths[away])
+        params = {"p1": probs["p1"], "pX": probs["pX"]}
+    else:
+        raise ValueError(f"Unknown model '{model}'.")
+
+    base = np.stack([
+        data["PTS"].to_numpy(dtype=float),
+        data["Diff"].to_numpy(dtype=float),
+        data["G"].to_numpy(dtype=float),
+    ])[:, None, :]
+
+    sizes = [chunk_size] * (n_sims // chunk_size)
+    if n_sims % chunk_size:
+        sizes.append(n_sims % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(s, size, base, home, away, model, params) for s, size in zip(seeds, sizes)]
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+    else:
+        results = [_simulate_chunk(task) for task in tasks]
+
+    counts = sum(r[0] for r in results)
+    total_points = sum(r[1] for r in results)
+
+    n_teams = len(teams)
+    result = pd.DataFrame(counts / n_sims, columns=range(1, n_teams + 1))
+    result.insert(0, "Team", teams)
+    result["exp_PTS"] = total_points / n_sims
+    for zone, (first, last) in (zones or {}).items():
+        if last <= n_teams:
+            result[zone] = result[list(range(first, last + 1))].sum(axis=1)
+    return result.sort_values("exp_PTS", ascending=False).reset_index(drop=True)
+
+if __name__ == "__main__":
+    from season_store import default_store
+
+    table = simulate_season(default_store().frame("ligue1", "2024-2025"), n_sims=200_000, seed=2025)
+    print(table[["Team", "exp_PTS", "title", "europe", "relegation_playoff", "relegation"]].round(3))
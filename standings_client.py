@@ -0,0 +1,208 @@
+import asyncio
+import os
+import random
+import time
+
+import aiohttp
+from cache import CACHE_DURATION, DiskTTLCache, TieredCache, cache_key
+
+# Fournisseurs de classements : URL de base et limite de requêtes (par seconde)
+PROVIDERS = {
+    "api-football": {
+        "base_url": "https://v3.football.api-sports.io",
+        "rate": 10 / 60,  # offre gratuite : 10 requêtes par minute
+        "burst": 10,
+    },
+    "thesportsdb": {
+        "base_url": "https://www.thesportsdb.com/api/v1/json/3",
+        "rate": 30 / 60,
+        "burst": 5,
+    },
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class FetchError(Exception):
+    """Échec définitif d'une requête (après les tentatives de reprise)."""
+
+class RateLimiter:
+    """Seau à jetons asynchrone : rate requêtes par seconde, rafales de burst."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class StandingsClient:
+    """
+    Client asynchrone des classements (API-Football et TheSportsDB).
+
+    Une seule session HTTP (pool de connexions) est partagée par toutes les
+    requêtes ; chaque fournisseur a sa propre limite de débit, les erreurs
+    transitoires (429, 5xx, réseau) sont retentées avec un délai exponentiel,
+    et les réponses sont écrites dans un cache disque à durée de validité.
+
+    providers : surcharge de PROVIDERS (par ex. base_url d'un serveur de test)
+    history : StandingsHistory où chaque classement téléchargé est ajouté
+              (une version par changement, voir standings_history.py)
+    """
+
+    def __init__(self, cache=None, providers=None, api_key=None, api_host=None,
+                 max_connections=10, retries=3, backoff=0.5, timeout=10, history=None):
+        self.cache = cache if cache is not None else DiskTTLCache()
+        self.history = history
+        self.providers = {name: dict(conf) for name, conf in PROVIDERS.items()}
+        for name, conf in (providers or {}).items():
+            self.providers.setdefault(name, {}).update(conf)
+        self.api_key = api_key or os.getenv("API_FOOTBALL_KEY")
+        self.api_host = api_host or os.getenv("API_FOOTBALL_HOST")
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._limiters = {
+            name: RateLimiter(conf.get("rate", 1), conf.get("burst", 1))
+            for name, conf in self.providers.items()
+        }
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
+
+    async def _get_json(self, provider, path, params=None):
+        conf = self.providers[provider]
+        url = conf["base_url"].rstrip("/") + path
+        headers = {}
+        if provider == "api-football":
+            headers = {"x-rapidapi-key": self.api_key or "", "x-rapidapi-host": self.api_host or ""}
+
+        for attempt in range(self.retries + 1):
+            await self._limiters[provider].acquire()
+            retry_after = None
+            try:
+                async with self._session.get(url, params=params, headers=headers) as response:
+                    if response.status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    error = FetchError(f"HTTP {response.status} for {url}")
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in RETRY_STATUSES:
+                    raise FetchError(f"HTTP {e.status} for {url}") from e
+
+            if attempt == self.retries:
+                raise FetchError(f"Giving up on {url} after {attempt + 1} attempts: {error}") from error
+            delay = self.backoff * 2 ** attempt * (1 + random.random() / 2)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            await asyncio.sleep(delay)
+
+    async def _cached(self, key, fetch, use_cache):
+        if use_cache:
+            value = self.cache.get(key)
+            if value is not None:
+                return value
+        value = await fetch()
+        self.cache.set(key, value)
+        return value
+
+    async def download_standings(self, provider, league, season):
+        """
+        Classement d'une ligue pour une saison, téléchargé sans passer par le cache.
+
+        Retourne la liste brute du fournisseur : entrées de
+        response[0].league.standings[0] (API-Football) ou de table (TheSportsDB).
+        """
+        if provider == "api-football":
+            data = await self._get_json(provider, "/standings", {"league": league, "season": season})
+            try:
+                standings = data["response"][0]["league"]["standings"][0]
+            except (KeyError, IndexError, TypeError):
+                raise ValueError(f"Aucune donnée de classement trouvée ({league}, {season}).")
+            payload = {"standings": standings}
+        else:
+            data = await self._get_json(provider, "/lookuptable.php", {"l": league, "s": season})
+            if not data or not data.get("table"):
+                raise ValueError(f"Aucune donnée de classement trouvée ({league}, {season}).")
+            standings = data["table"]
+            payload = {"table": standings}
+        if self.history is not None:
+            self.history.record_payload(f"{provider}-{league}", season, payload)
+        return standings
+
+    async def fetch_standings(self, provider, league, season, use_cache=True):
+        """Classement d'une ligue pour une saison (voir download_standings), via le cache disque."""
+        return await self._cached(
+            cache_key(provider, "standings", league, season),
+            lambda: self.download_standings(provider, league, season),
+            use_cache,
+        )
+
+    async def fetch_teams(self, provider, league, season=None, use_cache=True):
+        """Liste des noms d'équipes d'une ligue (season requis pour API-Football)."""
+        async def fetch():
+            if provider == "api-football":
+                data = await self._get_json(provider, "/teams", {"league": league, "season": season})
+                return [entry["team"]["name"] for entry in data.get("response", [])]
+            data = await self._get_json(provider, "/lookup_all_teams.php", {"id": league})
+            return [team["strTeam"] for team in data.get("teams") or []]
+
+        return await self._cached(cache_key(provider, "teams", league, season), fetch, use_cache)
+
+    async def fetch_many(self, requests, kind="standings", use_cache=True):
+        """
+        Récupère en parallèle plusieurs (fournisseur, ligue, saison).
+
+        Retourne {(fournisseur, ligue, saison): résultat ou exception}.
+        """
+        fetch = self.fetch_standings if kind == "standings" else self.fetch_teams
+        results = await asyncio.gather(
+            *(fetch(provider, league, season, use_cache=use_cache) for provider, league, season in requests),
+            return_exceptions=True,
+        )
+        return dict(zip(map(tuple, requests), results))
+
+class StandingsCache(TieredCache):
+    """
+    Cache à niveaux des classements pour un processus serveur : les clés sont
+    (fournisseur, "standings", ligue, saison), servies depuis la mémoire ou le
+    disque, et rafraîchies en arrière-plan par le client une fois périmées.
+    """
+
+    def __init__(self, client, disk=None, memory_size=128, ttl=CACHE_DURATION):
+        super().__init__(self._download, disk if disk is not None else client.cache, memory_size, ttl)
+        self.client = client
+
+    async def _download(self, key):
+        provider, _, league, season = key
+        return await self.client.download_standings(provider, league, season)
+
+    async def standings(self, provider, league, season):
+        return await self.get((provider, "standings", league, season))
+
+def fetch_all_standings(requests, **client_options):
+    """Version synchrone de StandingsClient.fetch_many pour les scripts et notebooks."""
+    async def run():
+        async with StandingsClient(**client_options) as client:
+            return await client.fetch_many(requests)
+    return asyncio.run(run())
@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import struct
+import time
+from datetime import date, datetime, timezone
+
+from cache import LRUCache
+from core import RECORD_COLUMNS, SeasonTable, TeamRecord, read_csv_rows
+
+# Historique des classements : un journal par (ligue, saison), en ajout seul.
+# <ligue>-<saison>.log contient une ligne JSON par classement reçu : les
+# seules colonnes modifiées des équipes modifiées (delta), ou une image
+# complète (keyframe) quand elle n'est pas plus longue que le delta (journée
+# complète) et au moins toutes les KEYFRAME_EVERY versions. <ligue>-<saison>.idx contient un
+# enregistrement binaire de taille fixe par version (horodatage, position de
+# la ligne, numéro de la keyframe) : « classement au jour X » est une
+# recherche dichotomique dans l'index puis une seule lecture de la keyframe
+# jusqu'à la version voulue.
+HISTORY_DIR = os.path.join("data", ".history")
+KEYFRAME_EVERY = 16
+
+_INDEX = struct.Struct("<dqq")  # horodatage, position dans le journal, numéro de la keyframe
+
+def _slug(league, season):
+    return f"{league}-{season}".lower().replace(os.sep, "_")
+
+def to_timestamp(when):
+    """
+    Horodatage Unix d'un instant : nombre, datetime (UTC si sans fuseau), date
+    ou texte ISO. Une date seule désigne la fin de la journée (UTC).
+    """
+    if isinstance(when, (int, float)):
+        return float(when)
+    if isinstance(when, str):
+        text = when.strip()
+        when = date.fromisoformat(text) if len(text) == 10 else datetime.fromisoformat(text)
+    if isinstance(when, datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return when.timestamp()
+    if isinstance(when, date):
+        return datetime(when.year, when.month, when.day, 23, 59, 59, 999999, tzinfo=timezone.utc).timestamp()
+    raise TypeError(f"Unsupported timestamp: {when!r}")
+
+def _table_rows(standings):
+    """{équipe: valeurs de RECORD_COLUMNS} d'une SeasonTable, de TeamRecord ou de lignes (dictionnaires)."""
+    records = standings.records if isinstance(standings, SeasonTable) else standings
+    rows = {}
+    for record in records:
+        if not isinstance(record, TeamRecord):
+            record = TeamRecord.from_row(record)
+        rows[record.Team] = [getattr(record, name) for name in RECORD_COLUMNS]
+    return rows
+
+def _encode(entry):
+    return (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+def _to_table(rows, path):
+    records = [TeamRecord(team, **dict(zip(RECORD_COLUMNS, values))) for team, values in rows.items()]
+    if all(record.Number is not None for record in records):
+        records.sort(key=lambda record: record.Number)
+    return SeasonTable(records, path)
+
+def _apply(rows, entry):
+    """Applique une ligne du journal (keyframe ou delta) à l'état courant."""
+    if entry.get("key"):
+        return {row[0]: row[1:] for row in entry["rows"]}
+    for team in entry.get("del", ()):
+        rows.pop(team, None)
+    for team, changes in entry.get("set", {}).items():
+        values = rows.setdefault(team, [None] * len(RECORD_COLUMNS))
+        for name, value in changes.items():
+            values[RECORD_COLUMNS.index(name)] = value
+    return rows
+
+class StandingsHistory:
+    """
+    Classements successifs de chaque (ligue, saison), en ajout seul.
+
+    record() ajoute une version (ignorée si rien n'a changé) ; as_of() rend
+    le classement en vigueur à un instant (SeasonTable) en O(log n) lectures
+    d'index plus au plus keyframe_every lignes du journal. Un seul processus
+    doit écrire une même série ; les lecteurs peuvent être nombreux.
+    """
+
+    def __init__(self, directory=HISTORY_DIR, keyframe_every=KEYFRAME_EVERY, memory_size=64):
+        self.directory = directory
+        self.keyframe_every = keyframe_every
+        self._tables = LRUCache(memory_size)
+        self._latest = {}
+        self._repaired = set()
+
+    def _paths(self, league, season):
+        slug = _slug(league, season)
+        return os.path.join(self.directory, f"{slug}.log"), os.path.join(self.directory, f"{slug}.idx")
+
+    def _count(self, index_path):
+        try:
+            return os.path.getsize(index_path) // _INDEX.size
+        except FileNotFoundError:
+            return 0
+
+    def _repair(self, log_path, index_path):
+        """
+        Écarte la fin d'une écriture interrompue avant d'écrire dans une série :
+        enregistrement d'index incomplet, puis lignes du journal non indexées.
+        """
+        try:
+            size = os.path.getsize(index_path)
+        except FileNotFoundError:
+            size = 0
+        count = size // _INDEX.size
+        if size != count * _INDEX.size:
+            os.truncate(index_path, count * _INDEX.size)
+        end = 0
+        if count:
+            with open(index_path, "rb") as f:
+                offset = self._entry(f, count - 1)[1]
+            with open(log_path, "rb") as f:
+                f.seek(offset)
+                end = offset + len(f.readline())
+        if os.path.exists(log_path) and os.path.getsize(log_path) > end:
+            os.truncate(log_path, end)
+        self._latest.pop(log_path, None)
+        self._repaired.add(log_path)
+
+    def _entry(self, f, n):
+        f.seek(n * _INDEX.size)
+        return _INDEX.unpack(f.read(_INDEX.size))
+
+    def _search(self, index_path, timestamp):
+        """Numéro de la dernière version d'horodatage <= timestamp (-1 si aucune)."""
+        lo, hi = 0, self._count(index_path)
+        if not hi:
+            return -1, None
+        with open(index_path, "rb") as f:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._entry(f, mid)[0] <= timestamp:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if not lo:
+                return -1, None
+            return lo - 1, self._entry(f, lo - 1)
+
+    def _read_version(self, league, season, n, entry):
+        """Classement de la version n : lecture de sa keyframe jusqu'à elle, application des deltas."""
+        log_path, index_path = self._paths(league, season)
+        key = (log_path, n)
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        _, offset, keyframe = entry
+        with open(index_path, "rb") as f:
+            start = self._entry(f, keyframe)[1]
+        with open(log_path, "rb") as f:
+            f.seek(start)
+            chunk = f.read(offset - start)
+            last = f.readline()
+        rows = {}
+        for line in chunk.splitlines() + [last]:
+            rows = _apply(rows, json.loads(line))
+        table = _to_table(rows, log_path)
+        self._tables.set(key, table)
+        return table
+
+    def as_of(self, league, season, when):
+        """Classement (SeasonTable) en vigueur à l'instant when ; ValueError s'il n'y en a pas encore."""
+        _, index_path = self._paths(league, season)
+        n, entry = self._search(index_path, to_timestamp(when))
+        if n < 0:
+            raise ValueError(f"No standings recorded for {league} {season} as of {when}.")
+        return self._read_version(league, season, n, entry)
+
+    def latest(self, league, season):
+        return self.as_of(league, season, float("inf"))
+
+    def timeline(self, league, season):
+        """Horodatages des versions enregistrées, dans l'ordre."""
+        _, index_path = self._paths(league, season)
+        try:
+            with open(index_path, "rb") as f:
+                return [entry[0] for entry in _INDEX.iter_unpack(f.read())]
+        except FileNotFoundError:
+            return []
+
+    def series(self):
+        """Séries enregistrées : noms <ligue>-<saison>."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-4] for name in names if name.endswith(".idx"))
+
+    def _state(self, league, season):
+        """(lignes, horodatage, numéro de version, numéro de keyframe) de la dernière version."""
+        log_path, index_path = self._paths(league, season)
+        state = self._latest.get(log_path)
+        count = self._count(index_path)
+        if state is None or state[2] != count - 1:
+            if not count:
+                return {}, float("-inf"), -1, -1
+            with open(index_path, "rb") as f:
+                entry = self._entry(f, count - 1)
+            table = self._read_version(league, season, count - 1, entry)
+            state = _table_rows(table), entry[0], count - 1, entry[2]
+            self._latest[log_path] = state
+        return state
+
+    def record(self, league, season, standings, timestamp=None):
+        """
+        Ajoute une version du classement (SeasonTable ou lignes
+        {"Team", "M", "W"...}) à l'instant timestamp (maintenant par défaut).
+        Retourne False si elle est identique à la précédente (rien n'est écrit).
+        """
+        timestamp = time.time() if timestamp is None else to_timestamp(timestamp)
+        rows = _table_rows(standings)
+        log_path, index_path = self._paths(league, season)
+        if log_path not in self._repaired:
+            self._repair(log_path, index_path)
+        previous, last_timestamp, n, keyframe = self._state(league, season)
+        if timestamp < last_timestamp:
+            raise ValueError(f"Standings for {league} {season} must be recorded in chronological order.")
+        if rows == previous:
+            return False
+
+        n += 1
+        delta = None
+        line = _encode({"t": timestamp, "key": True, "rows": [[team, *values] for team, values in rows.items()]})
+        if keyframe >= 0 and n - keyframe < self.keyframe_every:
+            # Delta (colonnes modifiées des lignes modifiées), écrit seulement s'il est plus court que l'image complète
+            entry = {"t": timestamp, "set": {
+                team: {
+                    name: value for name, value, old in zip(RECORD_COLUMNS, values, previous.get(team) or [None] * len(values))
+                    if value != old
+                }
+                for team, values in rows.items() if previous.get(team) != values
+            }}
+            removed = [team for team in previous if team not in rows]
+            if removed:
+                entry["del"] = removed
+            delta = _encode(entry)
+            if len(delta) < len(line):
+                line = delta
+        if line is not delta:
+            keyframe = n
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(log_path, "ab") as log:
+            offset = log.tell()
+            log.write(line)
+        with open(index_path, "ab") as index:
+            index.write(_INDEX.pack(timestamp, offset, keyframe))
+        self._latest[log_path] = rows, timestamp, n, keyframe
+        return True
+
+    def record_payload(self, league, season, payload, timestamp=None):
+        """Ajoute un classement au format des fournisseurs (voir season_store.standings_rows)."""
+        from season_store import standings_rows
+
+        return self.record(league, season, standings_rows(payload), timestamp)
+
+_default_history = None
+
+def default_history():
+    global _default_history
+    if _default_history is None:
+        _default_history = StandingsHistory()
+    return _default_history
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Historique des classements : enregistrement et consultation à une date.")
+    parser.add_argument("--directory", default=HISTORY_DIR, help="Dossier de l'historique")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Enregistre un classement (CSV ou JSON d'un fournisseur)")
+    record.add_argument("league")
+    record.add_argument("season")
+    record.add_argument("path")
+    record.add_argument("--timestamp", help="Date de la version (ISO ; par défaut celle du JSON ou maintenant)")
+
+    as_of = commands.add_parser("as-of", help="Classement en vigueur à une date")
+    as_of.add_argument("league")
+    as_of.add_argument("season")
+    as_of.add_argument("when", help="Date ou instant ISO (2025-03-01, 2025-03-01T18:00)")
+
+    timeline = commands.add_parser("timeline", help="Dates des versions enregistrées")
+    timeline.add_argument("league")
+    timeline.add_argument("season")
+    args = parser.parse_args(argv)
+
+    history = StandingsHistory(args.directory)
+    if args.command == "record":
+        if args.path.lower().endswith(".json"):
+            with open(args.path, encoding="utf-8") as f:
+                payload = json.load(f)
+            added = history.record_payload(args.league, args.season, payload, args.timestamp or payload.get("timestamp"))
+        else:
+            added = history.record(args.league, args.season, read_csv_rows(args.path), args.timestamp)
+        print("Version enregistrée." if added else "Classement inchangé : rien à enregistrer.")
+    elif args.command == "as-of":
+        for record in history.as_of(args.league, args.season, args.when):
+            print(record.to_dict())
+    else:
+        for timestamp in history.timeline(args.league, args.season):
+            print(datetime.fromtimestamp(timestamp, timezone.utc).isoformat())
+
+if __name__ == "__main__":
+    main()
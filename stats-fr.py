@@ -1,58 +1,96 @@
-import pandas as pd
+import sys
+
+from core import calculate_team_probabilities, load_season
 
 def get_team_stats(team_name, season_data):
     """
     Récupère les statistiques d'une équipe à partir des données d'une saison.
     :param team_name: Nom de l'équipe (chaîne de caractères).
-    :param season_data: Données de la saison (DataFrame pandas).
+    :param season_data: Données de la saison (core.SeasonTable).
     :return: Dictionnaire contenant les statistiques de l'équipe.
     """
-    # Normaliser les noms d'équipe
-    team_stats = season_data[season_data['Team'].str.strip().str.lower() == team_name.strip().lower()]
-    
-    if team_stats.empty:
-        raise ValueError(f"Team '{team_name}' not found in the dataset.")
-    
-    # Retourner les statistiques sous forme de dictionnaire
-    return team_stats.iloc[0].to_dict()
-
-def calculate_team_probabilities(team_stats):
-    """
-    Calcule les probabilités de victoire, de match nul et de défaite pour une équipe.
-    :param team_stats: Dictionnaire contenant les statistiques de l'équipe.
-    :return: Dictionnaire avec les probabilités.
-    """
-    total_matches = team_stats['M']
-    win_prob = team_stats['W'] / total_matches
-    draw_prob = team_stats['D'] / total_matches
-    lose_prob = (total_matches - team_stats['W'] - team_stats['D']) / total_matches
-
-    return {
-        'win_prob': win_prob,
-        'draw_prob': draw_prob,
-        'lose_prob': lose_prob
-    }
+    # Recherche indexée (noms normalisés et alias), construite une fois par saison
+    return season_data.team(team_name).to_dict()
 
 def load_season_data(file_path):
     """
     Charge les données d'une saison à partir d'un fichier CSV.
     :param file_path: Chemin vers le fichier CSV.
-    :return: DataFrame pandas contenant les données de la saison.
+    :return: Classement de la saison (core.SeasonTable, sans pandas).
     """
     try:
-        return pd.read_csv(file_path)
+        # Lecture avec le module csv, relue seulement si le fichier change
+        return load_season(file_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Le fichier '{file_path}' est introuvable.")
-    except pd.errors.EmptyDataError:
+    except (ValueError, KeyError):
         raise ValueError(f"Le fichier '{file_path}' est vide ou corrompu.")
     
-def main():
+def season_report(leagues=None, seasons=None, last=None, group_by=None):
+    """
+    Rapport de toutes les équipes de toutes les saisons chargées (DataFrame) :
+    taux de victoire / nul / défaite, buts et points par match, écarts avec
+    la saison précédente. group_by : ("league",), ("season",), ("league",
+    "season") ou () pour des statistiques agrégées plutôt que par équipe.
+    Les saisons sont empilées (catalogue.StackedSeasons) et tout est calculé
+    en colonnes, sans boucle par équipe.
+    """
+    import pandas as pd
+    from catalogue import SeasonCatalogue
+
+    stacked = SeasonCatalogue().load(leagues, seasons, last)
+    report = stacked.team_report() if group_by is None else stacked.group_report(group_by)
+    return pd.DataFrame(report)
+
+def write_report(report, path):
+    """Écrit le rapport en CSV ou en Parquet (selon l'extension) ; '-' = sortie standard (CSV)."""
+    if path == "-":
+        report.to_csv(sys.stdout, index=False)
+    elif path.lower().endswith(".parquet"):
+        report.to_parquet(path, index=False)
+    else:
+        report.to_csv(path, index=False)
+
+def report_main(args):
+    report = season_report(args.league, args.season, args.last, args.group_by)
+    if args.output:
+        write_report(report, args.output)
+    else:
+        import pandas as pd
+
+        with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_rows", None):
+            print(report.round(3).to_string(index=False))
+
+def parse_args(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Statistiques d'une équipe (mode interactif) ou rapport de toutes les équipes et saisons (--report).")
+    parser.add_argument("--report", action="store_true", help="Rapport de toutes les équipes de toutes les saisons chargées")
+    parser.add_argument("--league", action="append", help="Ligue à inclure (toutes par défaut ; option répétable)")
+    parser.add_argument("--season", action="append", help="Saison à inclure (toutes par défaut ; option répétable)")
+    parser.add_argument("--last", type=int, help="Seulement les N saisons les plus récentes de chaque ligue")
+    parser.add_argument("--group-by", nargs="*", choices=("league", "season"), help="Agréger par ligue et / ou saison (sans valeur : tout)")
+    parser.add_argument("-o", "--output", help="Fichier du rapport (.csv ou .parquet ; '-' = CSV sur la sortie standard)")
+    args = parser.parse_args(argv)
+    if not args.report:
+        # Options du rapport sans --report : erreur plutôt que le mode interactif
+        parser.error("--league, --season, --last, --group-by and --output require --report")
+    return args
+
+def main(argv=None):
+    # Sans argument : mode interactif (argparse n'est importé que si besoin)
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        args = parse_args(argv)
+        if args.report:
+            return report_main(args)
+
     # Demander à l'utilisateur de saisir la saison et l'équipe
     season = input("Entrez la saison (par exemple, '2024-2025'): ").strip()
     team_name = input("Entrez le nom de l'équipe : ").strip()
 
     # Construire le chemin du fichier CSV en fonction de la saison
-    file_path = f"data/france/ligue1-{season}.csv"
+    file_path = f"data/ligue1-{season}.csv"
 
     try:
         # Charger les données de la saison
@@ -0,0 +1,138 @@
+import re
+import unicodedata
+import weakref
+from functools import lru_cache
+
+# Noms canoniques (ceux des CSV et du cache API-Football) et leurs variantes
+# rencontrées dans les autres sources (TheSportsDB, saisie utilisateur...)
+TEAM_ALIASES = {
+    "Paris Saint Germain": ["Paris SG", "PSG", "Paris Saint-Germain"],
+    "Marseille": ["Olympique de Marseille", "OM"],
+    "Lyon": ["Olympique Lyonnais", "OL"],
+    "Monaco": ["AS Monaco"],
+    "Lille": ["LOSC", "Lille OSC"],
+    "Nice": ["OGC Nice"],
+    "Lens": ["RC Lens"],
+    "Rennes": ["Stade Rennais", "Stade Rennais FC"],
+    "Brest": ["Stade Brestois", "Stade Brestois 29"],
+    "Strasbourg": ["RC Strasbourg", "Racing Strasbourg", "RC Strasbourg Alsace"],
+    "Nantes": ["FC Nantes"],
+    "Toulouse": ["Toulouse FC", "TFC"],
+    "Montpellier": ["Montpellier HSC", "MHSC"],
+    "Reims": ["Stade de Reims", "Stade Reims"],
+    "Saint-Etienne": ["Saint Etienne", "St Etienne", "AS Saint-Étienne", "ASSE"],
+    "Le Havre": ["Le Havre AC", "HAC"],
+    "Auxerre": ["AJ Auxerre", "AJA"],
+    "Angers": ["Angers SCO", "SCO Angers"],
+    "Lorient": ["FC Lorient"],
+    "Metz": ["FC Metz"],
+    "Clermont Foot": ["Clermont", "Clermont Foot 63"],
+    "Paris FC": ["PFC"],
+}
+
+def normalize_team_name(name):
+    """
+    Normalise un nom d'équipe : accents supprimés, minuscules, ponctuation
+    (tirets, points, apostrophes) et espaces multiples remplacés par un espace.
+    """
+    name = unicodedata.normalize("NFKD", str(name))
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"[-_.'’]", " ", name.lower())
+    return " ".join(name.split())
+
+def _build_alias_groups(aliases):
+    groups = {}
+    for canonical, variants in aliases.items():
+        group = {normalize_team_name(canonical)}
+        group.update(normalize_team_name(v) for v in variants)
+        for key in group:
+            groups[key] = group
+    return groups
+
+_ALIAS_GROUPS = _build_alias_groups(TEAM_ALIASES)
+_CANONICAL_KEYS = {
+    normalize_team_name(variant): normalize_team_name(canonical)
+    for canonical, variants in TEAM_ALIASES.items()
+    for variant in variants
+}
+
+@lru_cache(maxsize=4096)
+def canonical_team_key(name):
+    """Clé normalisée commune à un nom et à tous ses alias connus ('Paris SG' -> 'paris saint germain')."""
+    key = normalize_team_name(name)
+    return _CANONICAL_KEYS.get(key, key)
+
+class TeamRegistry:
+    """
+    Index des équipes d'une saison : nom (ou alias) -> identifiant entier.
+
+    Les identifiants sont les positions des équipes dans la liste fournie
+    (donc les positions des lignes du DataFrame de la saison).
+    """
+
+    def __init__(self, names, aliases=None):
+        self.names = [str(n).strip() for n in names]
+        groups = _ALIAS_GROUPS if aliases is None else _build_alias_groups(aliases)
+
+        self._index = {}
+        # Les noms exacts passent avant les alias
+        for team_id, name in enumerate(self.names):
+            self._index.setdefault(normalize_team_name(name), team_id)
+        for team_id, name in enumerate(self.names):
+            for alias in groups.get(normalize_team_name(name), ()):
+                self._index.setdefault(alias, team_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def get(self, name, default=None):
+        """Identifiant de l'équipe, ou default si elle est inconnue."""
+        team_id = self._index.get(name)  # chemin rapide : clé déjà normalisée
+        if team_id is None:
+            team_id = self._index.get(normalize_team_name(name), default)
+        return team_id
+
+    def id(self, name):
+        """Identifiant de l'équipe ; ValueError si elle est inconnue."""
+        team_id = self.get(name)
+        if team_id is None:
+            raise ValueError(f"Team '{name}' not found in the dataset.")
+        return team_id
+
+    def ids(self, names):
+        """Identifiants d'une liste de noms (ValueError au premier nom inconnu)."""
+        return [self.id(name) for name in names]
+
+    def name(self, team_id):
+        """Nom canonique (celui de la saison) d'un identifiant."""
+        return self.names[team_id]
+
+    def add_alias(self, alias, name):
+        """Ajoute un alias supplémentaire pour une équipe déjà présente."""
+        self._index[normalize_team_name(alias)] = self.id(name)
+
+    @classmethod
+    def for_frame(cls, season_data, column="Team"):
+        """
+        Registre d'un DataFrame de saison, construit une seule fois puis
+        réutilisé tant que le DataFrame existe et garde le même nombre de
+        lignes et le même index (un tri ou un filtrage sur place reconstruit
+        l'index). Contrôle en O(1) : la colonne des noms n'est pas relue ;
+        pour renommer des équipes, travailler sur une copie du DataFrame.
+        """
+        key = id(season_data)
+        fingerprint = (len(season_data), id(season_data.index), id(season_data.columns))
+        entry = _frame_registries.get(key)
+        if entry is not None and entry[0]() is season_data and entry[1] == fingerprint:
+            return entry[2]
+
+        registry = cls(season_data[column].tolist())
+        ref = weakref.ref(season_data, lambda _, key=key: _frame_registries.pop(key, None))
+        # L'index est gardé en vie avec l'entrée : son id ne peut pas être réattribué
+        _frame_registries[key] = (ref, fingerprint, registry, season_data.index, season_data.columns)
+        return registry
+
+_frame_registries = {}
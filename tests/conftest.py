@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les modules du dépôt sont à la racine (pas de paquet installé)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
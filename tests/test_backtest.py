@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from backtest import build_features, evaluate, load_features, predict_probabilities
+
+def match(day, home, away, home_goals, away_goals, season, odds=None):
+    result = {"date": datetime(2024, 1, 1 + day), "home": home, "away": away,
+              "home_goals": home_goals, "away_goals": away_goals, "season": season}
+    if odds:
+        result.update(zip(("odds_1", "odds_x", "odds_2"), map(str, odds)))
+    return result
+
+RESULTS = [
+    match(0, "A", "B", 2, 0, "s1", (1.5, 4.0, 6.0)),
+    match(1, "B", "A", 1, 1, "s1", (2.5, 3.0, 3.0)),
+    match(2, "A", "C", 0, 1, "s2", (1.8, 3.5, 4.5)),
+    match(3, "C", "A", 3, 0, "s2"),  # pas de cotes du marché
+    match(4, "A", "C", 2, 1, "s2", (2.0, 3.4, 3.8)),
+]
+
+def test_features_use_only_past_matches():
+    features = build_features(RESULTS)
+    np.testing.assert_array_equal(features["home_M"], [0, 1, 0, 1, 2])
+    np.testing.assert_array_equal(features["home_prev_M"], [0, 0, 2, 0, 2])  # C est promue en s2
+    np.testing.assert_array_equal(features["outcome"], [0, 1, 2, 0, 0])
+
+def test_roi_ignores_fixtures_without_odds():
+    features = build_features(RESULTS)
+    result = evaluate(features, "home_away", min_matches=0, value_threshold=-1.0)
+    assert result["bets"] == 12  # toutes les issues des 4 matchs cotés
+    assert result["roi"] == pytest.approx((1.5 + 3.0 + 4.5 + 2.0 - 12) / 12)
+    probs = predict_probabilities(features, "home_away")
+    assert result["log_loss"] == pytest.approx(-np.log(probs[np.arange(5), features["outcome"]]).mean())
+
+def test_combined_does_not_blend_a_missing_previous_season():
+    features = build_features(RESULTS)
+    combined = predict_probabilities(features, "combined")
+    # 4e match : C (promue) - A ; la victoire de C ne doit pas être tirée vers 0
+    c_win = features["home_W"][3] / features["home_M"][3]
+    a_prev_draw = features["away_prev_D"][3] / features["away_prev_M"][3]
+    a_prev_win = features["away_prev_W"][3] / features["away_prev_M"][3]
+    draw = (features["home_D"][3] + features["away_D"][3]) / (features["home_M"][3] + features["away_M"][3])
+    draw = 0.6 * draw + 0.4 * a_prev_draw
+    away = 0.6 * features["away_W"][3] / features["away_M"][3] + 0.4 * a_prev_win
+    expected = np.array([c_win + 0.1, draw, away - 0.05])
+    np.testing.assert_allclose(combined[3], expected / expected.sum())
+
+def test_features_cached_by_content(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("Date,HomeTeam,AwayTeam,FTHG,FTAG\n01/08/2024,A,B,1,0\n08/08/2024,B,A,2,2\n", encoding="utf-8")
+    first = load_features(str(path), cache_dir=str(tmp_path / "cache"))
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    second = load_features(str(path), cache_dir=str(tmp_path / "cache"))
+    np.testing.assert_array_equal(first["outcome"], second["outcome"])
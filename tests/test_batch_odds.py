@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import os
+import shutil
+
+import batch_odds
+import pyarrow.parquet as pq
+import pytest
+from batch_odds import FixturePricer, read_fixtures, write_chunks
+from season_store import SeasonStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture
+def pricer(tmp_path, monkeypatch):
+    # Copie des données : le stockage et le cache des priors sont écrits sous tmp_path
+    shutil.copytree(DATA_DIR, tmp_path / "data", ignore=shutil.ignore_patterns(".*"))
+    monkeypatch.chdir(tmp_path)
+    store = SeasonStore("data")
+    monkeypatch.setattr(batch_odds, "default_store", lambda: store)
+    return FixturePricer(store=store)
+
+FIXTURES = "HomeTeam,AwayTeam,Model\nPSG,Lyon,2\nNice,Lens,\nPSG,Nowhere,\n"
+
+def test_csv_output(pricer):
+    out = io.StringIO()
+    chunks = pricer.price(read_fixtures(io.StringIO(FIXTURES)), chunk_size=2)
+    assert write_chunks(chunks, out) == 3
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert list(rows[0])[:len(batch_odds.OUTPUT_COLUMNS)] == batch_odds.OUTPUT_COLUMNS
+    assert [(row["home"], row["model"]) for row in rows] == [("Paris Saint Germain", "2"), ("Nice", "3"), ("PSG", "3")]
+    assert sum(1 / float(rows[0][name]) for name in ("1", "X", "2")) == pytest.approx(1.0, abs=0.02)
+    assert rows[2]["error"].startswith("Unknown fixture") and rows[2]["p1"] == ""
+
+def test_parquet_output(pricer, tmp_path):
+    path = str(tmp_path / "odds.parquet")
+    chunks = pricer.price(read_fixtures(io.StringIO(FIXTURES)), chunk_size=2)
+    assert write_chunks(chunks, fmt="parquet", path=path) == 3
+    parquet = pq.ParquetFile(path)
+    assert parquet.num_row_groups == 2  # un groupe de lignes par lot
+    table = parquet.read().to_pylist()
+    assert table[0]["home"] == "Paris Saint Germain"
+    assert table[0]["p1"] + table[0]["pX"] + table[0]["p2"] == pytest.approx(1.0)
+    assert table[2]["p1"] is None and table[2]["error"]
+
+def test_jsonl_output_keeps_every_key(pricer):
+    fixtures = '{"home": "PSG", "away": "Lyon"}\n{"home": "Nice", "away": "Lens", "ref": 7}\n'
+    out = io.StringIO()
+    write_chunks(pricer.price(read_fixtures(io.StringIO(fixtures)), chunk_size=1), out, "jsonl")
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert "ref" not in rows[0] and rows[1]["ref"] == 7
+
+JSONL_NEW_COLUMN = '{"home": "PSG", "away": "Lyon"}\n{"home": "Nice", "away": "Lens", "ref": "7"}\n'
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_column_after_the_first_chunk_fails_loudly(pricer, tmp_path, fmt):
+    chunks = pricer.price(read_fixtures(io.StringIO(JSONL_NEW_COLUMN)), chunk_size=1)
+    with pytest.raises(ValueError, match="ref"):
+        write_chunks(chunks, io.StringIO(), fmt, path=str(tmp_path / "odds.parquet"))
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_cli_writes_the_union_of_columns(pricer, tmp_path, fmt):
+    (tmp_path / "fixtures.jsonl").write_text(JSONL_NEW_COLUMN, encoding="utf-8")
+    output = str(tmp_path / f"odds.{fmt}")
+    batch_odds.main(["fixtures.jsonl", "-o", output, "--chunk-size", "1"])
+    if fmt == "csv":
+        with open(output, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = pq.read_table(output).to_pylist()
+    assert [row["ref"] or None for row in rows] == [None, "7"]
@@ -0,0 +1,69 @@
+import asyncio
+
+from cache import DiskTTLCache, LRUCache, TieredCache
+
+class Loader:
+    """Loader de test : compte les appels et attend release (ouvert par défaut)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, key):
+        self.calls += 1
+        await self.release.wait()
+        return {"key": list(key), "version": self.calls}
+
+def test_concurrent_misses_share_one_load(tmp_path):
+    async def main():
+        loader = Loader()
+        cache = TieredCache(loader, DiskTTLCache(str(tmp_path), ttl=3600), ttl=3600)
+        values = await asyncio.gather(*(cache.get(("thesportsdb", "4334", "2024-2025")) for _ in range(10)))
+        return loader.calls, values, cache.stats()
+
+    calls, values, stats = asyncio.run(main())
+    assert calls == 1
+    assert all(value == values[0] for value in values)
+    assert stats["misses"] == 10 and stats["refreshes"] == 1 and stats["inflight"] == 0
+
+def test_stale_value_served_while_revalidating(tmp_path):
+    async def main():
+        loader = Loader()
+        cache = TieredCache(loader, DiskTTLCache(str(tmp_path), ttl=3600), ttl=3600)
+        key = ("thesportsdb", "4334", "2024-2025")
+        first = await cache.get(key)
+
+        cache.ttl = 0  # toute valeur en cache est désormais périmée
+        loader.release.clear()
+        stale = await asyncio.gather(*(cache.get(key) for _ in range(5)))
+        pending = cache.stats()["inflight"]
+        loader.release.set()
+        await cache.refresh(key)
+        cache.ttl = 3600
+        return first, stale, pending, await cache.get(key), loader.calls, cache.stats()
+
+    first, stale, pending, fresh, calls, stats = asyncio.run(main())
+    assert stale == [first] * 5  # servies sans attendre le loader
+    assert pending == 1  # un seul rafraîchissement pour les cinq requêtes
+    assert calls == 2 and fresh["version"] == 2
+    assert stats["stale_hits"] == 5
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    async def main():
+        loader = Loader()
+        await TieredCache(loader, DiskTTLCache(str(tmp_path), ttl=3600), ttl=3600).get(("a", "b"))
+        cache = TieredCache(loader, DiskTTLCache(str(tmp_path), ttl=3600), ttl=3600)
+        return await cache.get(("a", "b")), loader.calls, cache.stats()["disk_hits"]
+
+    value, calls, disk_hits = asyncio.run(main())
+    assert value == {"key": ["a", "b"], "version": 1}
+    assert (calls, disk_hits) == (1, 1)
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.keys() == ["a", "c"]
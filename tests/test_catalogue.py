@@ -0,0 +1,26 @@
+import os
+import shutil
+
+import numpy as np
+from catalogue import SeasonCatalogue
+from season_store import SeasonStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def catalogue(tmp_path, seasons):
+    """Catalogue des saisons données, toutes copiées du classement 2024-2025."""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for season in seasons:
+        shutil.copy(os.path.join(DATA_DIR, "ligue1-2024-2025.csv"), data_dir / f"ligue1-{season}.csv")
+    return SeasonCatalogue(SeasonStore(str(data_dir), str(tmp_path / "store")))
+
+def test_delta_only_between_consecutive_seasons(tmp_path):
+    report = catalogue(tmp_path, ["2020-2021", "2023-2024", "2024-2025"]).load().team_report()
+    deltas = {season: report["win_rate_delta"][report["season"] == season] for season in ("2023-2024", "2024-2025")}
+    assert np.isnan(deltas["2023-2024"]).all()  # 2020-2021 n'est pas la saison précédente
+    np.testing.assert_array_equal(deltas["2024-2025"], 0.0)
+
+def test_group_report_delta_skips_missing_seasons(tmp_path):
+    report = catalogue(tmp_path, ["2020-2021", "2024-2025"]).load().group_report(("league", "season"))
+    assert np.isnan(report["points_per_match_delta"]).all()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from combos import ComboPricer
+from poisson import predict_matches
+
+STANDINGS = pd.DataFrame({
+    "Team": ["Paris Saint Germain", "Lens", "Nice", "Brest"],
+    "M": [10, 10, 10, 10],
+    "G": [25, 14, 12, 9],
+    "GA": [8, 11, 13, 18],
+})
+
+def single(home, away, market):
+    return predict_matches([home], [away], STANDINGS)[market][0]
+
+def test_legs_on_different_fixtures_multiply():
+    pricer = ComboPricer.from_standings(STANDINGS)
+    combo = pricer.price([("PSG", "Brest", "1"), ("Nice", "Lens", "over_2.5"), ("Lens", "PSG", "btts_yes")], overround=1.05)
+    expected = single("PSG", "Brest", "p1") * single("Nice", "Lens", "over_2.5") * single("Lens", "PSG", "btts_yes")
+    assert combo["probability"] == pytest.approx(expected)
+    assert combo["fixtures"] == 3
+    assert combo["odds"] == pytest.approx(1 / (expected * 1.05 ** 3))
+
+def test_same_fixture_legs_use_the_joint_probability():
+    pricer = ComboPricer.from_standings(STANDINGS)
+    combo = pricer.price([("PSG", "Brest", "1"), ("Paris Saint Germain", "Brest", "o2.5")])
+    grid = pricer.model.score_matrices(["PSG"], ["Brest"])[0]
+    home, away = np.indices(grid.shape)
+    joint = grid[(home > away) & (home + away > 2.5)].sum()
+    assert combo["probability"] == pytest.approx(joint)
+    assert combo["fixtures"] == 1
+    # Corrélées : la probabilité jointe n'est pas le produit des marges
+    assert joint > single("PSG", "Brest", "p1") * single("PSG", "Brest", "over_2.5")
+    # Sélections incompatibles sur la même rencontre
+    assert pricer.price([("Nice", "Lens", "X"), ("Nice", "Lens", "12")])["probability"] == 0.0
+
+def test_batch_matches_single_combos():
+    pricer = ComboPricer.from_standings(STANDINGS)
+    combos = [
+        [("PSG", "Brest", "1"), ("PSG", "Brest", "btts_no")],
+        [("Nice", "Lens", "X2"), ("Brest", "PSG", "under_1.5")],
+    ]
+    batch = pricer.price_many(combos)
+    for combo, result in zip(combos, batch):
+        assert result["probability"] == pytest.approx(ComboPricer.from_standings(STANDINGS).price(combo)["probability"])
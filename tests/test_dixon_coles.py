@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dixon_coles import _negative_loglik, _negative_pooled_loglik, fit_dixon_coles
+from scipy.optimize import approx_fprime
+
+N_TEAMS = 6
+
+def random_matches(n_matches=200, seed=0):
+    rng = np.random.default_rng(seed)
+    home_idx = rng.integers(0, N_TEAMS, n_matches)
+    away_idx = (home_idx + rng.integers(1, N_TEAMS, n_matches)) % N_TEAMS
+    # Beaucoup de scores faibles pour exercer la correction rho
+    home_goals = rng.poisson(1.3, n_matches).astype(float)
+    away_goals = rng.poisson(1.0, n_matches).astype(float)
+    weights = rng.uniform(0.2, 1.0, n_matches)
+    return home_idx, away_idx, home_goals, away_goals, weights
+
+def random_params(size, seed=1):
+    params = np.random.default_rng(seed).normal(0, 0.3, size)
+    params[-1] = -0.08  # rho (ou avantage domicile pour le modèle agrégé)
+    return params
+
+@pytest.mark.parametrize("fit_rho", [True, False])
+def test_loglik_gradient_matches_finite_differences(fit_rho):
+    args = (*random_matches(), N_TEAMS, fit_rho, 100.0)
+    params = random_params(2 * N_TEAMS + 2)
+    value, grad = _negative_loglik(params, *args)
+    numeric = approx_fprime(params, lambda p: _negative_loglik(p, *args)[0], 1e-6)
+    np.testing.assert_allclose(grad, numeric, rtol=1e-4, atol=1e-3)
+    if not fit_rho:
+        assert grad[-1] == 0
+
+def test_pooled_loglik_gradient_matches_finite_differences():
+    rng = np.random.default_rng(2)
+    stats = {name: rng.integers(5, 30, N_TEAMS).astype(float) for name in ("home_G", "home_GA", "away_G", "away_GA")}
+    stats["home_M"] = np.full(N_TEAMS, 17.0)
+    stats["away_M"] = np.full(N_TEAMS, 17.0)
+    params = random_params(2 * N_TEAMS + 1)
+    value, grad = _negative_pooled_loglik(params, N_TEAMS, stats, 100.0)
+    numeric = approx_fprime(params, lambda p: _negative_pooled_loglik(p, N_TEAMS, stats, 100.0)[0], 1e-6)
+    np.testing.assert_allclose(grad, numeric, rtol=1e-4, atol=1e-3)
+
+def test_fit_recovers_home_advantage():
+    rng = np.random.default_rng(3)
+    teams = [f"T{i}" for i in range(N_TEAMS)]
+    pairs = [(h, a) for h in range(N_TEAMS) for a in range(N_TEAMS) if h != a] * 40
+    home = np.array([h for h, _ in pairs])
+    away = np.array([a for _, a in pairs])
+    results = pd.DataFrame({
+        "home": [teams[i] for i in home],
+        "away": [teams[i] for i in away],
+        "home_goals": rng.poisson(np.exp(0.3), len(pairs)),
+        "away_goals": rng.poisson(1.0, len(pairs)),
+    })
+    model = fit_dixon_coles(results, xi=0)
+    assert model.home == pytest.approx(0.3, abs=0.1)
+    assert abs(model.attack.sum()) < 1e-2
@@ -0,0 +1,46 @@
+import pytest
+from inplay import MATCH_MINUTES, RED_CARD_OPPONENT, RED_CARD_OWN, InPlayEngine
+from poisson import match_markets, score_matrices
+
+def markets(exp_home, exp_away, home_goals=0, away_goals=0):
+    """Marchés d'un score de départ plus des buts restants de Poisson (calcul direct)."""
+    matrix = score_matrices([exp_home], [exp_away], max_goals=30)[0]
+    p1 = sum(matrix[i, j] for i in range(31) for j in range(31) if home_goals + i > away_goals + j)
+    pX = sum(matrix[i, j] for i in range(31) for j in range(31) if home_goals + i == away_goals + j)
+    return p1, pX
+
+def event(kind, minute, **fields):
+    return {"match": "m", "type": kind, "minute": minute, **fields}
+
+def test_kickoff_matches_pre_match_poisson():
+    engine = InPlayEngine()
+    update = engine.handle(event("kickoff", 0, home="PSG", away="Lens", exp_home=1.5, exp_away=1.0))
+    expected = match_markets(score_matrices([1.5], [1.0], max_goals=30))
+    assert (update["p1"], update["pX"], update["p2"]) == pytest.approx(
+        (expected["p1"][0], expected["pX"][0], expected["p2"][0]), abs=1e-9)
+    assert update["under_2.5"] == pytest.approx(expected["under_2.5"][0], abs=1e-9)
+
+def test_red_card_changes_both_rates():
+    engine = InPlayEngine()
+    engine.handle(event("kickoff", 0, home="PSG", away="Lens", exp_home=1.5, exp_away=1.0))
+    before = engine.handle(event("tick", 30))
+    update = engine.handle(event("red_card", 30, team="home"))
+    remaining = (MATCH_MINUTES - 30) / MATCH_MINUTES
+    p1, pX = markets(1.5 * remaining * RED_CARD_OWN, 1.0 * remaining * RED_CARD_OPPONENT)
+    assert update["p1"] == pytest.approx(p1, abs=1e-3)
+    assert update["pX"] == pytest.approx(pX, abs=1e-3)
+    assert update["p1"] < before["p1"] and update["p2"] > before["p2"]
+
+def test_goal_then_final_whistle_settles_the_prices():
+    engine = InPlayEngine()
+    engine.handle(event("kickoff", 0, home="PSG", away="Lens", exp_home=1.5, exp_away=1.0))
+    goal = engine.handle(event("goal", 80, team="home"))
+    p1, pX = markets(1.5 * 15 / MATCH_MINUTES, 1.0 * 15 / MATCH_MINUTES, home_goals=1)
+    assert (goal["p1"], goal["pX"]) == pytest.approx((p1, pX), abs=1e-3)
+
+    end = engine.handle(event("end", 94))
+    assert (end["p1"], end["pX"], end["p2"]) == (1.0, 0.0, 0.0)
+    assert end["1"] == 1.0 and end["X"] == end["2"] == float("inf")
+    assert end["over_0.5"] == 1.0 and end["under_1.5"] == 1.0
+    assert "m" not in engine.matches
+    assert engine.handle(event("goal", 95, team="away")) is None
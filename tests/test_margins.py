@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from algorithms import compute_odds_from_strengths
+from margins import METHODS, apply_margin, overround, remove_margin
+
+def random_markets(n_markets=500, seed=0):
+    probs = np.random.default_rng(seed).dirichlet([2.0, 1.0, 1.5], n_markets)
+    return np.clip(probs, 0.02, None) / np.clip(probs, 0.02, None).sum(axis=1, keepdims=True)
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("target", [1.0, 1.03, 1.08])
+def test_margin_round_trip(method, target):
+    probs = random_markets()
+    odds = apply_margin(probs, overround=target, method=method)
+    np.testing.assert_allclose(overround(odds), target, rtol=1e-9)
+    np.testing.assert_allclose(remove_margin(odds, method=method), probs, atol=1e-8)
+
+def test_margin_along_axis_and_per_market():
+    probs = random_markets(20).T  # issues sur l'axe 0
+    targets = np.linspace(1.0, 1.1, 20)
+    odds = apply_margin(probs, overround=targets, method="shin", axis=0)
+    assert odds.shape == probs.shape
+    np.testing.assert_allclose(overround(odds, axis=0), targets, rtol=1e-9)
+
+def test_strength_odds_margin_is_an_overround():
+    odds = compute_odds_from_strengths(60.0, 45.0, margin=1.05)
+    book = overround([odds["odds1"], odds["oddsX"], odds["odds2"]])
+    assert book == pytest.approx(1.05)
+    assert odds["odds1"] < 1 / odds["p1"]  # la marge réduit les cotes
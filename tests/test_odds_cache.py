@@ -0,0 +1,84 @@
+import os
+
+import pandas as pd
+from core import (
+    SeasonTable, generate_combined_odds_with_home_away_adjustment, generate_odds_with_home_away_adjustment, load_season,
+)
+from odds_cache import FixtureOddsCache, standings_digest
+
+SEASON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ligue1-2024-2025.csv")
+
+def with_extra_win(table, team):
+    """Nouvelle version du classement : une victoire de plus pour team."""
+    changed = table.team(team)
+    records = [record.replace(W=record.W + 1) if record is changed else record for record in table.records]
+    return SeasonTable(records, table.path)
+
+def test_new_snapshot_drops_only_changed_teams():
+    cache = FixtureOddsCache()
+    table = load_season(SEASON)
+    cache.home_away_odds("PSG", "Marseille", table)
+    cache.home_away_odds("Lens", "Lille", table)
+    cache.predict_match("Lens", "Lille", table)
+
+    table = with_extra_win(table, "PSG")
+    untouched = cache.memory.get(next(key for key in cache.memory.keys() if key[3] == "Lens" and key[1] == "home_away"))
+    assert cache.home_away_odds("Lens", "Lille", table) is untouched
+    assert cache.stats()["invalidated"] == 2  # PSG - Marseille et la prédiction Poisson (tout le classement)
+    assert cache.home_away_odds("PSG", "Marseille", table) == generate_odds_with_home_away_adjustment("PSG", "Marseille", table)
+
+def test_core_functions_go_through_the_cache():
+    cache = FixtureOddsCache()
+    table = load_season(SEASON)
+    first = generate_odds_with_home_away_adjustment("PSG", "Lens", table, cache=cache)
+    assert generate_odds_with_home_away_adjustment("PSG", "Lens", table, cache=cache) is first
+    assert cache.stats()["hits"] == 1
+
+def test_dataframe_modified_in_place_is_not_served_stale():
+    cache = FixtureOddsCache()
+    frame = pd.read_csv(SEASON).assign(Diff=lambda df: df["G"] - df["GA"])
+    before = cache.home_away_odds("PSG", "Lens", frame)
+    frame.loc[frame["Team"] == load_season(SEASON).team("PSG").Team, "W"] += 3
+    after = cache.home_away_odds("PSG", "Lens", frame)
+    assert after != before
+    assert after == generate_odds_with_home_away_adjustment("PSG", "Lens", frame)
+
+def test_shared_disk_tier_is_invalidated_by_another_process(tmp_path):
+    path = str(tmp_path / "odds.sqlite")
+    table = load_season(SEASON)
+    writer = FixtureOddsCache(disk=path)
+    writer.home_away_odds("PSG", "Marseille", table)
+    writer.home_away_odds("Lens", "Lille", table)
+
+    # Nouveau processus : sa première version est comparée à celle de la base
+    reader = FixtureOddsCache(disk=path)
+    reader.standings(with_extra_win(table, "Marseille"))
+    assert len(reader.disk) == 1
+    reader.home_away_odds("Lens", "Lille", table)
+    assert reader.stats()["disk_hits"] == 1
+
+def test_dataframe_digest_computed_once_per_version():
+    frame = pd.read_csv(SEASON)
+    first = standings_digest(frame)
+    assert standings_digest(frame) is first
+    frame.loc[0, "PTS"] += 1
+    assert standings_digest(frame) is not first
+
+def test_combined_odds_follow_the_promoted_team_prior(monkeypatch):
+    import priors
+
+    class Priors:
+        rates = {"win": 0.3, "draw": 0.3, "loss": 0.4}
+
+        def team_rates(self, league, season, team):
+            return self.rates if team == "Angers" else None
+
+    store = Priors()
+    monkeypatch.setattr(priors, "default_priors", lambda: store)
+    previous = SEASON.replace("2024-2025", "2023-2024")
+    cache = FixtureOddsCache()
+    before = cache.combined_odds("Angers", "PSG", previous, SEASON)
+    store.rates = {"win": 0.1, "draw": 0.2, "loss": 0.7}
+    after = cache.combined_odds("Angers", "PSG", previous, SEASON)
+    assert after != before
+    assert after == generate_combined_odds_with_home_away_adjustment("Angers", "PSG", previous, SEASON)
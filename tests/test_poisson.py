@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from poisson import match_markets, predict_match, predict_matches, score_matrices
+
+STANDINGS = pd.DataFrame({
+    "Team": ["Paris Saint Germain", "Lens", "Nice", "Brest"],
+    "M": [10, 10, 10, 10],
+    "G": [25, 14, 12, 9],
+    "GA": [8, 11, 13, 18],
+})
+
+def test_outcomes_sum_to_one():
+    teams = STANDINGS["Team"].tolist()
+    homes = [h for h in teams for a in teams if h != a]
+    aways = [a for h in teams for a in teams if h != a]
+    result = predict_matches(homes, aways, STANDINGS)
+    np.testing.assert_allclose(result[["p1", "pX", "p2"]].sum(axis=1), 1.0)
+    np.testing.assert_allclose(result["btts_yes"] + result["btts_no"], 1.0)
+    np.testing.assert_allclose(result["over_2.5"] + result["under_2.5"], 1.0)
+
+def test_markets_match_hand_calculation():
+    exp_home, exp_away = 1.7, 0.9
+    markets = match_markets(score_matrices([exp_home], [exp_away], max_goals=40))
+    # Les deux marquent : produit des probabilités de marquer au moins un but
+    assert markets["btts_yes"][0] == pytest.approx((1 - math.exp(-exp_home)) * (1 - math.exp(-exp_away)))
+    # Total de buts ~ Poisson(exp_home + exp_away)
+    mu = exp_home + exp_away
+    assert markets["under_2.5"][0] == pytest.approx(math.exp(-mu) * (1 + mu + mu ** 2 / 2))
+    assert markets["over_0.5"][0] == pytest.approx(1 - math.exp(-mu))
+    draw = sum(math.exp(-mu) * (exp_home * exp_away) ** k / math.factorial(k) ** 2 for k in range(40))
+    assert markets["pX"][0] == pytest.approx(draw)
+
+def test_single_match_agrees_with_the_batch():
+    single = predict_match("PSG", "Brest", STANDINGS, print_output=False)
+    batch = predict_matches(["PSG"], ["Brest"], STANDINGS)
+    assert list(single["probabilities"].values()) == pytest.approx(batch[["p1", "pX", "p2"]].iloc[0].tolist())
+    # PSG : attaque 2.5 / 1.5 de moyenne, Brest : défense 1.8 / 1.5
+    assert single["expected_goals"]["PSG"] == pytest.approx(2.5 * 1.8 / 1.5)
+    assert single["probability_matrix"].sum() == pytest.approx(1.0)
@@ -0,0 +1,33 @@
+import pytest
+from ratings import EloRatings
+
+RESULTS = [
+    {"home": "Paris Saint Germain", "away": "Marseille", "home_goals": 3, "away_goals": 0},
+    {"home": "Lens", "away": "PSG", "home_goals": 1, "away_goals": 1},
+    {"home": "Marseille", "away": "Lens", "home_goals": 2, "away_goals": 1},
+]
+
+def test_update_is_zero_sum():
+    elo = EloRatings(home_advantage=0.0)
+    delta = elo.update("Lens", "Lille", 1, 0)
+    assert delta == pytest.approx(10.0)  # k=20, espérance 0.5, écart d'un but
+    assert elo.rating("Lens") + elo.rating("Lille") == pytest.approx(2 * elo.initial)
+
+def test_save_and_load_round_trip(tmp_path):
+    elo = EloRatings(k=30.0, home_advantage=50.0, goal_diff=False).replay(RESULTS)
+    path = str(tmp_path / "elo.json")
+    elo.save(path)
+    assert not (tmp_path / "elo.json.tmp").exists()
+
+    loaded = EloRatings.load(path)
+    assert (loaded.k, loaded.home_advantage, loaded.initial, loaded.goal_diff) == (30.0, 50.0, 1500.0, False)
+    assert loaded.table() == elo.table()
+    assert loaded.rating("PSG") == elo.rating("Paris Saint Germain")
+    # Les mises à jour suivantes reprennent exactement où l'état sauvegardé s'était arrêté
+    assert loaded.update("PSG", "Lens", 2, 0) == elo.update("PSG", "Lens", 2, 0)
+
+def test_load_or_create(tmp_path):
+    path = str(tmp_path / "elo.json")
+    assert EloRatings.load_or_create(path, k=10.0).k == 10.0
+    EloRatings(k=40.0).save(path)
+    assert EloRatings.load_or_create(path, k=10.0).k == 40.0
@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+from season_store import SeasonStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copytree(DATA_DIR, tmp_path / "data", ignore=shutil.ignore_patterns(".*"))
+    return tmp_path / "data"
+
+def store(data_dir):
+    return SeasonStore(str(data_dir), str(data_dir.parent / "store"))
+
+def test_round_trip_through_the_store(data_dir):
+    cold = store(data_dir).get("ligue1", "2024-2025")
+    warm = store(data_dir).get("ligue1", "2024-2025")  # nouveau processus : lecture des .npy
+    assert warm.teams == cold.teams
+    for name, values in cold.columns.items():
+        np.testing.assert_array_equal(warm.columns[name], values)
+        assert warm.columns[name].dtype == np.int32
+    assert list(warm.to_frame().columns[:3]) == ["Team", "Number", "M"]
+
+def test_changed_file_is_reingested(data_dir):
+    path = data_dir / "ligue1-2024-2025.csv"
+    first = store(data_dir).get("ligue1", "2024-2025")
+    path.write_text(path.read_text(encoding="utf-8").replace("Paris Saint Germain,28,23", "Paris Saint Germain,29,24"), encoding="utf-8")
+    mtime = os.stat(path).st_mtime_ns + 10**9  # même si l'écriture tombe dans la même tranche d'horloge
+    os.utime(path, ns=(mtime, mtime))
+    second = store(data_dir).get("ligue1", "2024-2025")
+    assert (second.columns["W"][0], first.columns["W"][0]) == (24, 23)
+    season_dir = data_dir.parent / "store" / "ligue1" / "2024-2025"
+    versions = [p for p in season_dir.iterdir() if p.is_dir()]
+    assert len(versions) == 1  # l'ancienne version est supprimée
+    assert not [p for p in season_dir.iterdir() if p.name.endswith(".tmp")]
+
+def test_header_only_file_is_an_empty_season(data_dir):
+    (data_dir / "ligue1-2030-2031.csv").write_text("NUMBER,Team,M,W,D,L,G,GA,PTS\n", encoding="utf-8")
+    season = store(data_dir).get("ligue1", "2030-2031")
+    assert season.teams == [] and season.columns["PTS"].shape == (0,)
+    assert store(data_dir).get("ligue1", "2030-2031").to_frame().shape == (0, 10)
+
+def test_file_without_numeric_columns_names_the_file(data_dir):
+    (data_dir / "ligue1-2031-2032.csv").write_text("Team\nPSG\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="ligue1-2031-2032.csv"):
+        store(data_dir).get("ligue1", "2031-2032")
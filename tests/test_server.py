@@ -0,0 +1,76 @@
+import asyncio
+import os
+import shutil
+
+import pytest
+import server
+from aiohttp.test_utils import TestClient, TestServer
+from season_store import SeasonStore
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # Copie des données : le stockage et le cache des priors sont écrits sous tmp_path
+    shutil.copytree(DATA_DIR, tmp_path / "data", ignore=shutil.ignore_patterns(".*"))
+    monkeypatch.chdir(tmp_path)
+    store = SeasonStore("data")
+    monkeypatch.setattr(server, "default_store", lambda: store)
+
+    async def make():
+        return server.OddsService(watch_interval=0)
+    return make
+
+def run(make_service, scenario):
+    async def main():
+        service = await make_service()
+        async with TestClient(TestServer(service.app())) as client:
+            return await scenario(service, client)
+    return asyncio.run(main())
+
+def test_batch_rejects_malformed_fixtures(service):
+    async def scenario(_, client):
+        statuses = []
+        for body in (
+            {"fixtures": [["PSG"]]},
+            {"fixtures": ["PSG - Lyon"]},
+            {"fixtures": {"home": "PSG"}},
+            "PSG",
+            {"fixtures": [{"home": ["PSG"], "away": "Lyon"}]},
+            {"fixtures": [["PSG", 7]]},
+            {"fixtures": [{"home": "PSG"}]},
+        ):
+            response = await client.post("/odds/batch", json=body)
+            statuses.append(response.status)
+        response = await client.post("/odds/batch", json=[["PSG", "Lyon"], {"home": "Nice", "away": "Lens"}])
+        return statuses, response.status, await response.json()
+
+    statuses, status, body = run(service, scenario)
+    assert statuses == [400] * 7
+    assert status == 200
+    assert [f["home"] for f in body["fixtures"]] == ["Paris Saint Germain", "Nice"]
+
+def test_batcher_fails_pending_requests_on_unexpected_errors(service, monkeypatch):
+    async def scenario(service, client):
+        def broken(model, homes, aways):
+            if model == "2":
+                raise RuntimeError("broken model")
+            return original(model, homes, aways)
+
+        original = service.models.price
+        monkeypatch.setattr(service.models, "price", broken)
+        futures = [service.batcher.submit("2", "PSG", "Lyon"), service.batcher.submit("3", "PSG", "Lyon")]
+        results = await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), timeout=5)
+        return results
+
+    broken, ok = run(service, scenario)
+    assert isinstance(broken, RuntimeError)
+    assert ok["home"] == "Paris Saint Germain"
+
+def test_gather_treats_non_string_names_as_unknown(service):
+    async def scenario(service, _):
+        return service.models.price("3", ["PSG", ["PSG"], None], ["Lyon", "Lyon", "Lyon"])
+
+    ok, unhashable, missing = run(service, scenario)
+    assert ok["home"] == "Paris Saint Germain"
+    assert unhashable is None and missing is None
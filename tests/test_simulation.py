@@ -0,0 +1,28 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+from simulation import simulate_season
+
+SEASON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ligue1-2024-2025.csv")
+
+def test_seed_reproducible_across_workers():
+    data = pd.read_csv(SEASON)
+    fixtures = [("PSG", "Marseille"), ("Lens", "Lille"), ("Nice", "Lyon"), ("Marseille", "PSG")]
+    runs = [
+        simulate_season(data, n_sims=4_000, fixtures=fixtures, seed=7, chunk_size=1_000, max_workers=workers)
+        for workers in (1, 1, 2)
+    ]
+    pdt.assert_frame_equal(runs[0], runs[1])
+    pdt.assert_frame_equal(runs[0], runs[2])
+    other = simulate_season(data, n_sims=4_000, fixtures=fixtures, seed=8, chunk_size=1_000, max_workers=1)
+    assert not runs[0]["exp_PTS"].equals(other["exp_PTS"])
+
+def test_positions_are_distributions():
+    data = pd.read_csv(SEASON)
+    table = simulate_season(data, n_sims=2_000, seed=1, max_workers=1, model="strength")
+    positions = table[list(range(1, len(data) + 1))].to_numpy()
+    np.testing.assert_allclose(positions.sum(axis=0), 1.0)
+    np.testing.assert_allclose(positions.sum(axis=1), 1.0)
+    assert (table["exp_PTS"] >= table["Team"].map(data.set_index("Team")["PTS"])).all()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from cache import DiskTTLCache
+from standings_client import FetchError, StandingsClient
+
+TABLE = [{"strTeam": "Lyon", "intRank": 1}, {"strTeam": "Nice", "intRank": 2}]
+
+def run_with_server(responses, scenario, **client_options):
+    """
+    Lance un serveur local qui répond successivement avec responses
+    (statut, en-têtes), la dernière étant répétée, puis exécute
+    scenario(client, requests) ; requests reçoit l'instant de chaque requête.
+    """
+    requests = []
+
+    async def lookuptable(request):
+        requests.append(time.monotonic())
+        status, headers = responses[min(len(requests), len(responses)) - 1]
+        if status != 200:
+            return web.Response(status=status, headers=headers)
+        return web.json_response({"table": TABLE})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/lookuptable.php", lookuptable)
+        async with TestServer(app) as server:
+            options = {"retries": 3, "backoff": 0.01, **client_options}
+            providers = {"thesportsdb": {"base_url": str(server.make_url("")), **options.pop("provider", {})}}
+            async with StandingsClient(providers=providers, **options) as client:
+                return await scenario(client, requests)
+
+    return asyncio.run(main())
+
+def download(client, requests):
+    return client.download_standings("thesportsdb", "4334", "2024-2025")
+
+def test_transient_errors_are_retried():
+    async def scenario(client, requests):
+        return await download(client, requests), len(requests)
+
+    table, attempts = run_with_server(
+        [(503, {}), (500, {}), (200, {})], scenario, provider={"rate": 1000, "burst": 10},
+    )
+    assert table == TABLE
+    assert attempts == 3
+
+def test_gives_up_after_retries():
+    async def scenario(client, requests):
+        with pytest.raises(FetchError):
+            await download(client, requests)
+        return len(requests)
+
+    attempts = run_with_server([(502, {})], scenario, retries=2, provider={"rate": 1000, "burst": 10})
+    assert attempts == 3
+
+def test_client_errors_are_not_retried():
+    async def scenario(client, requests):
+        with pytest.raises(FetchError):
+            await download(client, requests)
+        return len(requests)
+
+    assert run_with_server([(404, {})], scenario, provider={"rate": 1000, "burst": 10}) == 1
+
+def test_retry_after_is_honoured():
+    async def scenario(client, requests):
+        await download(client, requests)
+        return requests
+
+    requests = run_with_server([(429, {"Retry-After": "1"}), (200, {})], scenario, provider={"rate": 1000, "burst": 10})
+    assert len(requests) == 2
+    assert requests[1] - requests[0] >= 0.95
+
+def test_rate_limit_spaces_requests():
+    async def scenario(client, requests):
+        start = time.monotonic()
+        await asyncio.gather(*(download(client, requests) for _ in range(5)))
+        return requests, time.monotonic() - start
+
+    requests, elapsed = run_with_server([(200, {})], scenario, provider={"rate": 20, "burst": 1})
+    assert len(requests) == 5
+    # burst de 1 puis un jeton toutes les 50 ms ; mesuré côté client, l'arrivée
+    # de la première requête au serveur est retardée par l'ouverture de la connexion
+    assert elapsed >= 4 * 0.05 * 0.9
+
+def test_ttl_cache(tmp_path):
+    cache = DiskTTLCache(str(tmp_path), ttl=3600)
+
+    async def scenario(client, requests):
+        first = await client.fetch_standings("thesportsdb", "4334", "2024-2025")
+        second = await client.fetch_standings("thesportsdb", "4334", "2024-2025")
+        fresh = len(requests)
+        await client.fetch_standings("thesportsdb", "4334", "2024-2025", use_cache=False)
+        cache.ttl = 0
+        await client.fetch_standings("thesportsdb", "4334", "2024-2025")
+        return first, second, fresh, len(requests)
+
+    first, second, fresh, total = run_with_server([(200, {})], scenario, cache=cache, provider={"rate": 1000, "burst": 10})
+    assert first == second == TABLE
+    assert fresh == 1  # deuxième appel servi par le cache
+    assert total == 3  # use_cache=False puis entrée périmée : deux téléchargements
@@ -0,0 +1,51 @@
+import os
+
+from core import RECORD_COLUMNS
+from standings_history import _INDEX, StandingsHistory
+
+def table(points, played=10):
+    """Lignes de classement : une équipe par entrée de points, les autres colonnes fixées par played."""
+    return [
+        {"Team": f"Team {i}", "Number": i + 1, "M": played, "W": played // 3, "D": 1, "L": played - played // 3 - 1,
+         "G": played + 2, "GA": played + 5, "PTS": p}
+        for i, p in enumerate(points)
+    ]
+
+def log_lines(history):
+    with open(os.path.join(history.directory, "l-s.log"), encoding="utf-8") as f:
+        return f.read().splitlines()
+
+def test_small_updates_are_deltas_until_keyframe_every(tmp_path):
+    history = StandingsHistory(str(tmp_path), keyframe_every=4)
+    for version in range(6):
+        history.record("l", "s", table([10 + version] + [10] * 17), 1000 + version)
+    keyframes = ['"key":true' in line for line in log_lines(history)]
+    assert keyframes == [True, False, False, False, True, False]
+    assert history.latest("l", "s").team("Team 0").PTS == 15
+    assert history.as_of("l", "s", 1002).team("Team 0").PTS == 12
+
+def test_keyframe_when_not_longer_than_the_delta(tmp_path):
+    history = StandingsHistory(str(tmp_path))
+    history.record("l", "s", table([10] * 18), 1000)
+    history.record("l", "s", table(range(11, 29), played=11), 1001)  # journée complète : toutes les lignes changent
+    lines = log_lines(history)
+    assert '"key":true' in lines[1]
+    assert [record.PTS for record in history.latest("l", "s")] == list(range(11, 29))
+
+def test_interrupted_write_is_discarded(tmp_path):
+    history = StandingsHistory(str(tmp_path))
+    history.record("l", "s", table([10] * 18), 1000)
+    log_path, index_path = history._paths("l", "s")
+    with open(log_path, "ab") as f:
+        f.write(b'{"t":1001,"set":{"Team 0":{"PT')
+    with open(index_path, "ab") as f:
+        f.write(_INDEX.pack(1001, 0, 0)[:5])
+
+    # Nouvel écrivain : la fin interrompue est écartée avant l'ajout
+    history = StandingsHistory(str(tmp_path))
+    assert history.record("l", "s", table([11] + [10] * 17), 1002)
+    assert os.path.getsize(index_path) == 2 * _INDEX.size
+    assert history.timeline("l", "s") == [1000, 1002]
+    record = history.latest("l", "s").team("Team 0")
+    assert [record[name] for name in RECORD_COLUMNS[:3]] == [1, 10, 3]
+    assert record.PTS == 11
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+from teams import TeamRegistry, canonical_team_key, normalize_team_name
+
+def test_aliases_resolve_to_the_season_name():
+    registry = TeamRegistry(["Paris Saint Germain", "Marseille", "Saint-Etienne"])
+    assert registry.id("PSG") == registry.id("Paris Saint-Germain") == 0
+    assert registry.id("olympique de marseille") == 1
+    assert registry.name(registry.id("AS Saint-Étienne")) == "Saint-Etienne"
+    assert canonical_team_key("Paris SG") == canonical_team_key("paris saint germain")
+    assert normalize_team_name("  St. Étienne ") == "st etienne"
+
+def test_unknown_team_raises():
+    registry = TeamRegistry(["Lens", "Lille"])
+    assert registry.get("Nantes") is None
+    assert "Nantes" not in registry
+    with pytest.raises(ValueError, match="Nantes"):
+        registry.id("Nantes")
+
+def test_exact_names_win_over_aliases():
+    # "Clermont" est un alias de "Clermont Foot" mais aussi le nom exact d'une ligne
+    registry = TeamRegistry(["Clermont Foot", "Clermont"])
+    assert registry.id("Clermont") == 1
+
+def test_for_frame_is_reused_and_rebuilt_after_an_in_place_sort():
+    frame = pd.DataFrame({"Team": ["Lens", "Lille", "PSG"], "PTS": [3, 9, 6]})
+    registry = TeamRegistry.for_frame(frame)
+    assert TeamRegistry.for_frame(frame) is registry
+    frame.sort_values("PTS", inplace=True, ignore_index=True)
+    assert TeamRegistry.for_frame(frame).id("Lille") == 2
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from transfers import TransferBook
+
+HEADER = "player,club_in,club_out,date,impact\n"
+
+def test_refresh_reads_only_appended_rows(tmp_path):
+    path = tmp_path / "transfers.csv"
+    path.write_text(HEADER + "A,PSG,Lens,2024-07-01,0.2\n", encoding="utf-8")
+    book = TransferBook.load(str(path))
+    assert len(book) == 1
+    assert book.refresh() == 0
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("B,Lens,,2024-08-01,0.1\nC,Nice,Lens,2024-08")  # dernière ligne en cours d'écriture
+    assert book.refresh() == 1
+    assert book.players == ["A", "B"]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("-15,0.05\n")
+    assert book.refresh() == 1
+    assert book.players == ["A", "B", "C"]
+    np.testing.assert_allclose(book.deltas(["Paris Saint Germain", "Lens", "Nice", "Lyon"]), [0.2, -0.15, 0.05, 0.0])
+
+def test_deltas_as_of_a_date():
+    book = TransferBook()
+    book.add("Nice", "Lens", "2024-08-15", impact=0.05)
+    book.add("PSG", "Lens", "2024-07-01", impact=0.2)  # ajouté hors de l'ordre des dates
+    teams = ["PSG", "Lens", "Nice"]
+    np.testing.assert_allclose(book.deltas(teams, as_of="2024-06-30"), [0, 0, 0])
+    np.testing.assert_allclose(book.deltas(teams, as_of="2024-07-31"), [0.2, -0.2, 0])
+    np.testing.assert_allclose(book.deltas(teams), [0.2, -0.25, 0.05])
+    assert book.factors(["Lens"])[0] == pytest.approx(0.75)
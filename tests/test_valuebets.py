@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from batch_odds import FixturePricer
+from season_store import SeasonStore
+from valuebets import OPPORTUNITY_COLUMNS, ValueScanner, write_opportunities
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    shutil.copytree(DATA_DIR, tmp_path / "data", ignore=shutil.ignore_patterns(".*"))
+    monkeypatch.chdir(tmp_path)
+
+    def make(min_edge=-1.0):
+        return ValueScanner(min_edge=min_edge, pricer=FixturePricer(store=SeasonStore("data")))
+    return make
+
+def snapshots():
+    rows = []
+    for bookmaker, odds in (("b1", (1.5, 4.2, 6.0)), ("b2", (1.6, 4.0, 5.5))):
+        for fixture in (("PSG", "Lyon"), ("Nice", "Lens")):
+            for selection, price in zip("1X2", odds):
+                rows.append({"timestamp": "2025-03-01", "bookmaker": bookmaker, "home": fixture[0],
+                             "away": fixture[1], "selection": selection, "odds": price})
+    return pd.DataFrame(rows)
+
+def chunks(frame, size):
+    return [frame.iloc[i:i + size].reset_index(drop=True) for i in range(0, len(frame), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 5])
+def test_markets_straddling_chunks(scanner, size):
+    frame = snapshots()
+    expected = pd.concat(list(scanner().scan([frame])), ignore_index=True)
+    result = pd.concat(list(scanner().scan(chunks(frame, size))), ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected)
+    assert expected["overround"].iloc[0] == pytest.approx(1 / 1.5 + 1 / 4.2 + 1 / 6.0)
+
+def test_parquet_schema_does_not_depend_on_the_first_chunk(scanner, tmp_path):
+    frame = snapshots()
+    # Seule la cote extérieure de b1 sur Nice - Lens atteint l'edge : les premiers lots sont vides
+    opportunities = scanner(min_edge=0.5).scan(chunks(frame, 1))
+    count = write_opportunities(opportunities, str(tmp_path / "value.parquet"), "parquet")
+    written = pd.read_parquet(tmp_path / "value.parquet")
+    assert list(written.columns) == OPPORTUNITY_COLUMNS
+    assert len(written) == count > 0
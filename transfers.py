@@ -0,0 +1,235 @@
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+from core import TRANSFERS_FILE
+from results import parse_date
+from teams import canonical_team_key
+
+# En-têtes acceptés pour les fichiers de transferts (une ligne par joueur transféré)
+TRANSFER_COLUMNS = {
+    "player": ("player", "Player", "joueur"),
+    "club_in": ("club_in", "to", "To", "team_in", "nouveau_club"),
+    "club_out": ("club_out", "from", "From", "team_out", "ancien_club"),
+    "date": ("date", "Date"),
+    "goals": ("goals", "Goals", "G", "buts"),
+    "assists": ("assists", "Assists", "A", "passes_decisives"),
+    "minutes": ("minutes", "Minutes", "Min"),
+}
+
+# Impact d'un joueur sur la force de son équipe (fraction, 0.3 = +30 %)
+ASSIST_WEIGHT = 0.5
+GOAL_IMPACT = 0.5  # poids des buts + passes rapportés à REFERENCE_TEAM_GOALS
+REFERENCE_TEAM_GOALS = 50.0  # buts d'une équipe moyenne sur une saison
+PLAYING_TIME_IMPACT = 0.05  # titulaire indiscutable sans statistique offensive
+SEASON_MINUTES = 34 * 90
+
+def player_impact(goals, assists, minutes):
+    """
+    Impact d'un ou plusieurs joueurs (scalaires ou tableaux) à partir de
+    leur saison précédente : contribution offensive rapportée aux buts d'une
+    équipe moyenne, plus un terme de temps de jeu.
+    Un attaquant à 25 buts et 5 passes titulaire vaut environ 0.33.
+    """
+    goals = np.asarray(goals, dtype=float)
+    assists = np.asarray(assists, dtype=float)
+    minutes = np.asarray(minutes, dtype=float)
+    offensive = GOAL_IMPACT * (goals + ASSIST_WEIGHT * assists) / REFERENCE_TEAM_GOALS
+    return offensive + PLAYING_TIME_IMPACT * np.minimum(minutes / SEASON_MINUTES, 1.0)
+
+def _column_map(header):
+    mapping = {}
+    for name, candidates in TRANSFER_COLUMNS.items():
+        for candidate in candidates:
+            if candidate in header:
+                mapping[name] = candidate
+                break
+    for name in ("club_in", "club_out", "date"):
+        if name not in mapping:
+            raise ValueError(f"Missing column for '{name}' (expected one of {TRANSFER_COLUMNS[name]}).")
+    return mapping
+
+def _number(value):
+    return float(value) if value not in (None, "") else 0.0
+
+class TransferBook:
+    """
+    Transferts de joueurs et variation nette de force de chaque club.
+
+    Les clubs sont indexés une fois (noms canoniques de teams.py) ; les
+    totaux « à ce jour » sont tenus à jour en O(1) par transfert ajouté, et
+    la variation à une date passée est un bincount sur les transferts
+    antérieurs (triés par date).
+
+    Colonnes d'un fichier : player, club_in, club_out, date et, pour
+    calculer l'impact, goals, assists, minutes (saison précédente du joueur) ;
+    une colonne impact explicite est utilisée telle quelle si présente.
+    """
+
+    def __init__(self):
+        self._clubs = {}
+        self._names = []
+        self._dates = []
+        self._club_in = []
+        self._club_out = []
+        self._impact = []
+        self.players = []
+        self._totals = np.zeros(0)
+        self._sorted = True
+        self._arrays = None
+        self._path = None
+        self._offset = 0
+        self._header = None
+
+    def __len__(self):
+        return len(self._impact)
+
+    def _club(self, name):
+        if not name:
+            return -1
+        key = canonical_team_key(name)
+        idx = self._clubs.get(key)
+        if idx is None:
+            idx = self._clubs[key] = len(self._names)
+            self._names.append(name)
+            self._totals = np.append(self._totals, 0.0)
+        return idx
+
+    def add(self, club_in, club_out, date, impact=None, goals=0, assists=0, minutes=0, player=None):
+        """
+        Ajoute un transfert (club_in ou club_out peut être vide : joueur
+        libre, retraite...). Retourne l'impact retenu.
+        """
+        if impact is None:
+            impact = float(player_impact(goals, assists, minutes))
+        if not isinstance(date, datetime):
+            date = parse_date(str(date))
+        i, o = self._club(club_in), self._club(club_out)
+
+        if self._dates and date < self._dates[-1]:
+            self._sorted = False
+        self._dates.append(date)
+        self._club_in.append(i)
+        self._club_out.append(o)
+        self._impact.append(impact)
+        self.players.append(player)
+        if i >= 0:
+            self._totals[i] += impact
+        if o >= 0:
+            self._totals[o] -= impact
+        self._arrays = None
+        return impact
+
+    def add_row(self, row, mapping):
+        impact = row.get("impact")
+        return self.add(
+            row[mapping["club_in"]].strip(),
+            row[mapping["club_out"]].strip(),
+            row[mapping["date"]],
+            float(impact) if impact not in (None, "") else None,
+            _number(row.get(mapping.get("goals"))),
+            _number(row.get(mapping.get("assists"))),
+            _number(row.get(mapping.get("minutes"))),
+            row.get(mapping.get("player")),
+        )
+
+    @classmethod
+    def load(cls, path=TRANSFERS_FILE):
+        """Charge un fichier de transferts ; refresh() lira ensuite les lignes ajoutées."""
+        book = cls()
+        book._path = path
+        book.refresh()
+        return book
+
+    def refresh(self):
+        """
+        Lit uniquement les lignes ajoutées au fichier depuis le dernier
+        chargement. Retourne le nombre de transferts ajoutés.
+        """
+        if self._path is None or not os.path.exists(self._path):
+            return 0
+        added = 0
+        with open(self._path, newline="", encoding="utf-8") as f:
+            if self._header is None:
+                header = f.readline()
+                self._header = next(csv.reader([header]))
+                self._offset = f.tell()
+            mapping = _column_map(self._header)
+            f.seek(self._offset)
+            while True:
+                line = f.readline()
+                if not line.endswith("\n"):
+                    # Ligne incomplète (écriture en cours) : relue au prochain appel
+                    break
+                self._offset = f.tell()
+                if line.strip():
+                    row = dict(zip(self._header, next(csv.reader([line]))))
+                    self.add_row(row, mapping)
+                    added += 1
+        return added
+
+    def _sorted_arrays(self):
+        if self._arrays is None:
+            dates = np.array(self._dates, dtype="datetime64[s]")
+            order = np.argsort(dates, kind="stable") if not self._sorted else np.arange(len(dates))
+            self._arrays = (
+                dates[order],
+                np.asarray(self._club_in, dtype=np.intp)[order],
+                np.asarray(self._club_out, dtype=np.intp)[order],
+                np.asarray(self._impact, dtype=float)[order],
+            )
+        return self._arrays
+
+    def club_deltas(self, as_of=None):
+        """Variation nette de chaque club indexé (ordre d'apparition), à la date as_of incluse."""
+        if as_of is None or not self._dates:
+            return self._totals.copy()
+        dates, club_in, club_out, impact = self._sorted_arrays()
+        as_of = np.datetime64(parse_date(as_of) if isinstance(as_of, str) else as_of, "s")
+        k = np.searchsorted(dates, as_of, side="right")
+        if k == len(dates):
+            return self._totals.copy()
+        n_clubs = len(self._names)
+        delta = np.zeros(n_clubs)
+        # Les -1 (club vide) sont décalés hors des clubs indexés puis ignorés
+        delta += np.bincount(club_in[:k] % (n_clubs + 1), impact[:k], n_clubs + 1)[:n_clubs]
+        delta -= np.bincount(club_out[:k] % (n_clubs + 1), impact[:k], n_clubs + 1)[:n_clubs]
+        return delta
+
+    def deltas(self, teams, as_of=None):
+        """Variation nette alignée sur teams (0 pour un club sans transfert)."""
+        index = np.array([self._clubs.get(canonical_team_key(team), -1) for team in teams], dtype=np.intp)
+        club_deltas = np.append(self.club_deltas(as_of), 0.0)
+        return club_deltas[index]
+
+    def factors(self, teams, as_of=None):
+        """Facteurs multiplicatifs 1 + variation (au moins 0) alignés sur teams."""
+        return np.maximum(1 + self.deltas(teams, as_of), 0.0)
+
+    def apply(self, strengths, teams, as_of=None):
+        """Applique les transferts à des forces quelconques (tableau aligné sur teams)."""
+        return np.asarray(strengths, dtype=float) * self.factors(teams, as_of)
+
+    def adjust_season(self, season_data, as_of=None):
+        """
+        Copie du classement avec W et D ajustés par les transferts (version
+        vectorisée de adjust_team_stats_for_transfer, sans modifier season_data).
+        """
+        factors = self.factors(season_data["Team"].tolist(), as_of)
+        return season_data.assign(
+            W=np.maximum(season_data["W"].to_numpy(dtype=float) * factors, 0),
+            D=np.maximum(season_data["D"].to_numpy(dtype=float) * factors, 0),
+            M=np.maximum(season_data["M"].to_numpy(dtype=float), 1),
+        )
+
+_default_book = None
+
+def default_transfers():
+    """Transferts de data/transfers.csv (vide si le fichier n'existe pas), relus si le fichier a grandi."""
+    global _default_book
+    if _default_book is None:
+        _default_book = TransferBook.load(TRANSFERS_FILE)
+    else:
+        _default_book.refresh()
+    return _default_book
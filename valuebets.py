@@ -0,0 +1,291 @@
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+from batch_odds import FixturePricer
+from results import RESULT_COLUMNS
+
+# En-têtes acceptés pour les cotes du marché
+MARKET_COLUMNS = {
+    "home": RESULT_COLUMNS["home"],
+    "away": RESULT_COLUMNS["away"],
+    "league": ("league", "League", "Div"),
+    "season": ("season", "Season"),
+    "bookmaker": ("bookmaker", "Bookmaker", "book"),
+    "timestamp": ("timestamp", "time", "Date", "date"),
+    "selection": ("selection", "outcome", "Selection"),
+    "odds": ("odds", "price", "Odds"),
+}
+
+# Format large : une colonne de cote par issue
+WIDE_COLUMNS = {"1": ("1", "odds1", "home_odds"), "X": ("X", "oddsX", "draw_odds"), "2": ("2", "odds2", "away_odds")}
+
+SELECTIONS = {"1": 0, "X": 1, "2": 2, "H": 0, "D": 1, "A": 2, "home": 0, "draw": 1, "away": 2}
+SELECTION_NAMES = np.array(["1", "X", "2"], dtype=object)
+
+OPPORTUNITY_COLUMNS = [
+    "timestamp", "bookmaker", "league", "season", "home", "away", "selection",
+    "odds", "overround", "market_prob", "model_prob", "fair_odds", "edge", "kelly",
+]
+TEXT_COLUMNS = ("timestamp", "bookmaker", "league", "season", "home", "away", "selection")
+
+# Colonnes identifiant un marché (un bookmaker, une rencontre, un instantané)
+MARKET_KEYS = ["timestamp", "bookmaker", "league", "season", "home", "away"]
+
+def opportunity_schema():
+    """Schéma pyarrow des opportunités (fixé : un lot vide ne type pas les colonnes)."""
+    import pyarrow as pa
+
+    return pa.schema([(name, pa.string() if name in TEXT_COLUMNS else pa.float64()) for name in OPPORTUNITY_COLUMNS])
+
+def _normalize_columns(frame):
+    """Renomme les colonnes reconnues et passe le format large (1, X, 2) en une ligne par issue."""
+    rename = {}
+    for name, candidates in {**MARKET_COLUMNS, **WIDE_COLUMNS}.items():
+        for candidate in candidates:
+            if candidate in frame.columns:
+                rename[candidate] = name
+                break
+    frame = frame.rename(columns=rename)
+    if "selection" not in frame.columns and set(WIDE_COLUMNS) <= set(frame.columns):
+        keys = [c for c in frame.columns if c not in WIDE_COLUMNS]
+        frame = frame.melt(id_vars=keys, value_vars=list(WIDE_COLUMNS), var_name="selection", value_name="odds")
+    missing = {"home", "away", "selection", "odds"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"Missing market columns: {', '.join(sorted(missing))}.")
+    return frame
+
+def read_market_chunks(path, chunk_size=200_000, fmt=None):
+    """
+    Lit des instantanés de cotes (CSV ou JSONL, '-' = entrée standard) par
+    lots de chunk_size lignes : une ligne par (bookmaker, rencontre, issue)
+    avec les colonnes selection / odds, ou une ligne par (bookmaker,
+    rencontre) avec les colonnes 1, X, 2. Produit des DataFrame normalisés.
+    """
+    source = sys.stdin if path == "-" else path
+    if fmt is None:
+        fmt = "jsonl" if str(path).lower().endswith((".jsonl", ".json")) else "csv"
+    if fmt == "jsonl":
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        reader = pd.read_csv(source, chunksize=chunk_size, dtype={"season": str, "selection": str})
+    with reader:
+        for chunk in reader:
+            yield _normalize_columns(chunk)
+
+class ValueScanner:
+    """
+    Compare des cotes du marché aux probabilités d'un modèle (server.build_models
+    via batch_odds.FixturePricer) et classe les écarts.
+
+    Pour chaque ligne : edge = p_modèle x cote - 1 et mise de Kelly
+    fraction x edge / (cote - 1) (part de la bankroll, 0 si edge <= 0).
+    Les lots sont traités en colonnes : les noms d'équipes et les
+    rencontres distinctes d'un lot sont résolus une seule fois.
+    """
+
+    def __init__(self, league="ligue1", season="2024-2025", model="3", min_edge=0.0,
+                 kelly_fraction=0.25, top=50, pricer=None):
+        self.pricer = pricer or FixturePricer(league, season, model)
+        self.min_edge = min_edge
+        self.kelly_fraction = kelly_fraction
+        self.top = top
+        self.rows = 0
+        self.unpriced = 0
+        self._best = None
+
+    def _model_probs(self, frame):
+        """Probabilités du modèle (NaN si la rencontre est inconnue) et noms canoniques."""
+        probs = np.full((len(frame), 3), np.nan)
+        home = frame["home"].to_numpy(dtype=object).copy()
+        away = frame["away"].to_numpy(dtype=object).copy()
+        groups = frame.groupby(["league", "season"], sort=False).indices
+        for (league, season), positions in groups.items():
+            home_codes, home_names = pd.factorize(home[positions])
+            away_codes, away_names = pd.factorize(away[positions])
+            pairs, unique_pairs = pd.factorize(home_codes * len(away_names) + away_codes)
+            homes = home_names[unique_pairs // len(away_names)].tolist()
+            aways = away_names[unique_pairs % len(away_names)].tolist()
+            try:
+                models = self.pricer.models(league, season)
+                rows, h, a, fixture_probs, _ = models.gather(self.pricer.model, homes, aways)
+            except (FileNotFoundError, ValueError):
+                continue
+            teams = np.asarray(models.teams(self.pricer.model), dtype=object)
+            unique_probs = np.full((len(homes), 3), np.nan)
+            unique_probs[rows] = fixture_probs
+            unique_home = np.array(homes, dtype=object)
+            unique_away = np.array(aways, dtype=object)
+            unique_home[rows], unique_away[rows] = teams[h], teams[a]
+            probs[positions] = unique_probs[pairs]
+            home[positions], away[positions] = unique_home[pairs], unique_away[pairs]
+        return probs, home, away
+
+    def scan_chunk(self, frame):
+        """
+        Opportunités d'un lot (DataFrame normalisé) dont l'edge atteint min_edge.
+
+        L'overround d'un bookmaker est la somme des 1/cote de la rencontre
+        au même instantané dans le lot : les issues d'un même instantané
+        doivent être consécutives dans le fichier (toujours le cas en format
+        large) ; scan reporte le dernier marché d'un lot au lot suivant.
+        """
+        frame = frame.copy()
+        for name, default in (("league", self.pricer.league), ("season", self.pricer.season)):
+            if name not in frame.columns:
+                frame[name] = default
+            else:
+                frame[name] = frame[name].fillna(default).astype(str)
+        for name in ("bookmaker", "timestamp"):
+            if name not in frame.columns:
+                frame[name] = ""
+            else:
+                frame[name] = frame[name].fillna("").astype(str)
+        self.rows += len(frame)
+
+        probs, frame["home"], frame["away"] = self._model_probs(frame)
+        selection = frame["selection"].astype(str).map(SELECTIONS).to_numpy(dtype=float)
+        odds = pd.to_numeric(frame["odds"], errors="coerce").to_numpy(dtype=float)
+        valid = ~np.isnan(selection) & (odds > 1)
+        sel = np.where(valid, selection, 0).astype(np.intp)
+        model_prob = np.where(valid, probs[np.arange(len(frame)), sel], np.nan)
+        self.unpriced += int(np.count_nonzero(np.isnan(model_prob)))
+
+        # Overround du bookmaker sur la rencontre (somme des 1/cote du même instantané)
+        implied = np.where(valid, 1 / np.where(valid, odds, 1.0), np.nan)
+        frame["_implied"] = implied
+        overround = frame.groupby(MARKET_KEYS, sort=False, dropna=False)["_implied"].transform("sum").to_numpy()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            edge = model_prob * odds - 1
+            kelly = np.maximum(edge, 0) / (odds - 1) * self.kelly_fraction
+            fair_odds = 1 / model_prob
+        keep = edge >= self.min_edge
+        result = pd.DataFrame({
+            "timestamp": frame["timestamp"].to_numpy()[keep],
+            "bookmaker": frame["bookmaker"].to_numpy()[keep],
+            "league": frame["league"].to_numpy()[keep],
+            "season": frame["season"].to_numpy()[keep],
+            "home": frame["home"].to_numpy()[keep],
+            "away": frame["away"].to_numpy()[keep],
+            "selection": SELECTION_NAMES[sel[keep]],
+            "odds": odds[keep],
+            "overround": overround[keep],
+            "market_prob": (implied / overround)[keep],
+            "model_prob": model_prob[keep],
+            "fair_odds": fair_odds[keep],
+            "edge": edge[keep],
+            "kelly": kelly[keep],
+        })
+        self._keep_best(result)
+        return result
+
+    def _keep_best(self, opportunities):
+        """Garde les top meilleures opportunités vues jusqu'ici (mémoire bornée)."""
+        if not self.top or opportunities.empty:
+            return
+        candidates = opportunities.nlargest(self.top, "edge")
+        if self._best is not None:
+            candidates = pd.concat([self._best, candidates], ignore_index=True).nlargest(self.top, "edge")
+        self._best = candidates.reset_index(drop=True)
+
+    def scan(self, chunks):
+        """
+        Produit les opportunités de chaque lot au fil de la lecture. Les
+        lignes du dernier marché d'un lot sont reportées au lot suivant :
+        un marché à cheval sur deux lots est évalué sur toutes ses issues.
+        """
+        carry = None
+        for chunk in chunks:
+            if carry is not None:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            chunk, carry = _split_last_market(chunk)
+            if len(chunk):
+                yield self.scan_chunk(chunk)
+        if carry is not None and len(carry):
+            yield self.scan_chunk(carry)
+
+    def best(self):
+        """Meilleures opportunités (edge décroissant) parmi tous les lots traités."""
+        if self._best is None:
+            return pd.DataFrame(columns=OPPORTUNITY_COLUMNS)
+        return self._best
+
+def _split_last_market(frame):
+    """(lignes avant le dernier marché du lot, lignes du dernier marché)."""
+    keys = [name for name in MARKET_KEYS if name in frame.columns]
+    if not len(frame) or not keys:
+        return frame, None
+    values = frame[keys].astype(str).to_numpy()
+    changed = (values[1:] != values[:-1]).any(axis=1)
+    start = int(np.flatnonzero(changed)[-1]) + 1 if changed.any() else 0
+    return frame.iloc[:start], frame.iloc[start:]
+
+def write_opportunities(chunks, path, fmt="csv"):
+    """
+    Écrit les opportunités lot par lot (CSV, JSONL ou Parquet) ; retourne
+    le nombre de lignes. CSV et Parquet passent par pyarrow quand il est
+    installé (le formatage des flottants de pandas domine sinon le temps).
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        if fmt == "parquet":
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow).")
+        pa = None
+
+    count = 0
+    if pa is not None and fmt in ("csv", "parquet"):
+        schema = opportunity_schema()
+        writer = pq.ParquetWriter(path, schema) if fmt == "parquet" else pa_csv.CSVWriter(path, schema)
+        try:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk[OPPORTUNITY_COLUMNS], schema=schema, preserve_index=False))
+                count += len(chunk)
+        finally:
+            writer.close()
+        return count
+
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        for chunk in chunks:
+            if fmt == "jsonl":
+                if len(chunk):
+                    chunk.to_json(out, orient="records", lines=True, force_ascii=False)
+            else:
+                chunk.to_csv(out, header=out.tell() == 0, index=False)
+            count += len(chunk)
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche de value bets : cotes du marché contre probabilités du modèle.")
+    parser.add_argument("snapshots", nargs="+", help="Fichiers de cotes (CSV ou JSONL, '-' = entrée standard)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), default=None)
+    parser.add_argument("--league", default="ligue1", help="Ligue par défaut")
+    parser.add_argument("--season", default="2024-2025", help="Saison par défaut")
+    parser.add_argument("--model", default="3", help="Modèle : 1, 2, 3, weighted, strength, poisson")
+    parser.add_argument("--min-edge", type=float, default=0.02, help="Edge minimal retenu (0.02 = 2 %%)")
+    parser.add_argument("--kelly-fraction", type=float, default=0.25, help="Fraction de Kelly appliquée aux mises")
+    parser.add_argument("--top", type=int, default=20, help="Nombre d'opportunités affichées")
+    parser.add_argument("--chunk-size", type=int, default=200_000)
+    parser.add_argument("-o", "--output", help="Toutes les opportunités (CSV, JSONL ou Parquet selon l'extension)")
+    args = parser.parse_args(argv)
+
+    scanner = ValueScanner(args.league, args.season, args.model, args.min_edge, args.kelly_fraction, args.top)
+    chunks = (chunk for path in args.snapshots for chunk in read_market_chunks(path, args.chunk_size, args.input_format))
+    opportunities = scanner.scan(chunks)
+    if args.output:
+        extension = args.output.rsplit(".", 1)[-1].lower()
+        fmt = extension if extension in ("jsonl", "parquet") else "csv"
+        count = write_opportunities(opportunities, args.output, fmt)
+    else:
+        count = sum(len(chunk) for chunk in opportunities)
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(scanner.best().round(4).to_string(index=False))
+    print(f"{scanner.rows} cotes lues, {scanner.unpriced} sans probabilité du modèle, {count} opportunités.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()